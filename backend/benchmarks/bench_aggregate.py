@@ -0,0 +1,125 @@
+"""
+Compare aggregate_data_for_visualization against the version that took modes with per-group lambdas.
+
+Before timing, both versions are checked for identical output on the
+benchmark datasets and on small frames built to have tied modes and groups
+whose values are all missing.
+
+Usage:
+    python benchmarks/bench_aggregate.py [--repeat N]
+"""
+import argparse
+import logging
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from main import aggregate_data_for_visualization, get_column_type, preprocess_data  # noqa: E402
+from benchmarks.datasets import PRODUCTS, REGIONS, tall_dataset  # noqa: E402
+
+def legacy_aggregate_data_for_visualization(df: pd.DataFrame, max_points: int = 50) -> pd.DataFrame:
+    """The time and categorical strategies as they were, with lambda mode aggregators."""
+    categorical_cols = [col for col in df.columns if get_column_type(df[col]) == "categorical" and df[col].nunique() <= 20]
+    date_cols = [col for col in df.columns if get_column_type(df[col]) == "date"]
+    numeric_cols = [col for col in df.columns if get_column_type(df[col]) == "numeric"]
+
+    if date_cols and numeric_cols:
+        date_col = date_cols[0]
+        df_copy = df.copy()
+        df_copy[date_col] = pd.to_datetime(df_copy[date_col])
+        date_range = (df_copy[date_col].max() - df_copy[date_col].min()).days
+        if date_range > 365:
+            df_copy['period'] = df_copy[date_col].dt.to_period('M')
+        elif date_range > 90:
+            df_copy['period'] = df_copy[date_col].dt.to_period('W')
+        else:
+            df_copy['period'] = df_copy[date_col].dt.to_period('D')
+        agg_dict = {col: 'mean' for col in numeric_cols}
+        if categorical_cols:
+            agg_dict.update({col: lambda x: x.mode().iloc[0] if not x.mode().empty else x.iloc[0] for col in categorical_cols})
+        aggregated = df_copy.groupby('period').agg(agg_dict).reset_index()
+        aggregated[date_col] = aggregated['period'].dt.start_time
+        return aggregated.drop('period', axis=1)
+
+    cat_col = categorical_cols[0]
+    agg_dict = {col: 'mean' for col in numeric_cols}
+    for col in categorical_cols[1:]:
+        agg_dict[col] = lambda x: x.mode().iloc[0] if not x.mode().empty else x.iloc[0]
+    return df.groupby(cat_col).agg(agg_dict).reset_index()
+
+def daily_frame(days: int, seed: int = 42) -> pd.DataFrame:
+    """A cleaned-looking daily series long enough to span thousands of months."""
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "date": pd.date_range("1800-01-01", periods=days, freq="D"),
+        "region": pd.Categorical(rng.choice(REGIONS, days)),
+        "product": pd.Categorical(rng.choice(PRODUCTS, days)),
+        "sales": rng.normal(1000, 250, days),
+        "units": rng.integers(1, 100, days),
+    })
+
+def tie_frames(seed: int = 7):
+    """Small frames where most groups have tied modes, some values missing and one group all missing."""
+    rng = np.random.default_rng(seed)
+    rows = 400
+    letters = np.array(["b", "a", "c", "d"])
+    frame = pd.DataFrame({
+        "date": pd.date_range("2020-01-01", periods=rows, freq="D"),
+        "group": pd.Categorical(rng.choice(["g1", "g2", "g3"], rows)),
+        "label": rng.choice(letters, rows).astype(object),
+        "kind": pd.Categorical(rng.choice(letters[:2], rows), categories=["b", "a"]),
+        "value": rng.normal(size=rows),
+    })
+    frame.loc[rng.random(rows) < 0.2, "label"] = None
+    frame.loc[frame["date"].dt.month == 3, "kind"] = np.nan
+    # Two rows per period with different labels: every period is a tie
+    paired = frame.iloc[:60].copy()
+    paired["date"] = np.repeat(pd.date_range("2019-01-01", periods=30, freq="MS"), 2)
+    paired["label"] = ["z", "y"] * 30
+    return [frame, frame.drop(columns=["date"]), paired, paired.drop(columns=["date"])]
+
+def check_equivalence(frames) -> None:
+    for frame in frames:
+        pd.testing.assert_frame_equal(
+            aggregate_data_for_visualization(frame, max_points=1),
+            legacy_aggregate_data_for_visualization(frame, max_points=1),
+        )
+
+def time_call(func, df, repeat):
+    """Return the best wall-clock time over `repeat` runs."""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(df)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    logging.disable(logging.INFO)
+
+    tall = preprocess_data(tall_dataset(200_000))
+    cases = [
+        ("tall 200k, by month", tall),
+        ("tall 200k, by region", tall.drop(columns=["date"])),
+        ("daily 100k, by month", daily_frame(100_000)),
+    ]
+    check_equivalence(tie_frames() + [frame for _, frame in cases])
+    print("Output identical to the lambda version on all frames")
+
+    print(f"{'dataset':<24}{'groups':>8}{'lambda (s)':>12}{'current (s)':>13}{'speedup':>9}")
+    for name, df in cases:
+        legacy = time_call(legacy_aggregate_data_for_visualization, df, args.repeat)
+        current = time_call(aggregate_data_for_visualization, df, args.repeat)
+        groups = len(aggregate_data_for_visualization(df))
+        print(f"{name:<24}{groups:>8}{legacy:>12.3f}{current:>13.3f}{legacy / current:>8.1f}x")
+
+if __name__ == "__main__":
+    main()
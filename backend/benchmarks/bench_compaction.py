@@ -0,0 +1,54 @@
+"""
+Report the memory of cleaned DataFrames before and after compaction.
+
+Each dataset is cleaned with compaction turned off and then compacted, so
+the numbers isolate the compaction stage. The "object text" rows convert
+string columns to object dtype first, which is how pandas < 3 stores them.
+
+Usage:
+    python benchmarks/bench_compaction.py [--rows 100000 1000000]
+"""
+import argparse
+import logging
+import os
+import sys
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import main as backend  # noqa: E402
+from compaction import compact_frame  # noqa: E402
+from benchmarks.datasets import categorical_dataset, tall_dataset, wide_dataset  # noqa: E402
+
+def with_object_text(df: pd.DataFrame) -> pd.DataFrame:
+    """Store string columns as Python objects, as pandas < 3 does."""
+    return df.astype({col: object for col in df.columns if isinstance(df[col].dtype, pd.StringDtype)})
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, nargs="+", default=[100_000, 1_000_000])
+    args = parser.parse_args()
+    logging.disable(logging.INFO)
+    backend.COMPACT_DATAFRAMES = False
+
+    print(f"{'dataset':<30}{'before (MB)':>13}{'after (MB)':>12}{'saved':>8}{'time (s)':>10}  changed columns")
+    for rows in args.rows:
+        for name, make in (("tall", tall_dataset), ("wide x 60", wide_dataset), ("categorical", categorical_dataset)):
+            if name == "wide x 60" and rows > 100_000:
+                continue
+            cleaned = backend.preprocess_data(make(rows))
+            for variant, df in (("", cleaned), (", object text", with_object_text(cleaned))):
+                start = time.perf_counter()
+                _, report = compact_frame(df)
+                elapsed = time.perf_counter() - start
+                kinds = sorted({new for _, new in report.changes.values()}, key=str)
+                print(
+                    f"{f'{name} {rows}{variant}':<30}{report.bytes_before / 2**20:>13.1f}"
+                    f"{report.bytes_after / 2**20:>12.1f}{report.saved_ratio:>8.0%}{elapsed:>10.3f}"
+                    f"  {len(report.changes)} -> {', '.join(kinds) or '-'}"
+                )
+
+if __name__ == "__main__":
+    main()
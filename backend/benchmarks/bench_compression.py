@@ -0,0 +1,74 @@
+"""
+Measure time to first byte, total time and bytes on the wire for large optimize responses.
+
+Runs the app under uvicorn on a local port and requests the same row payload
+as one JSON document and as NDJSON (?stream=true), each uncompressed, gzip
+and (when the brotli package is installed) brotli.
+
+Usage:
+    python benchmarks/bench_compression.py [--rows 20000 200000] [--repeat N]
+"""
+import argparse
+import logging
+import os
+import socket
+import sys
+import threading
+import time
+
+import httpx
+import uvicorn
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from main import app  # noqa: E402
+from compression import brotli  # noqa: E402
+from benchmarks.datasets import tall_dataset  # noqa: E402
+
+def start_server() -> str:
+    """Serve the app from a background thread and return its base URL."""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+    return f"http://127.0.0.1:{port}"
+
+def measure(client: httpx.Client, url: str, body: dict, encoding: str, repeat: int):
+    """Best time to first byte and total time over `repeat` requests, and the compressed size."""
+    best_first, best_total, wire = float('inf'), float('inf'), 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        first, wire = None, 0
+        with client.stream("POST", url, json=body, headers={"Accept-Encoding": encoding}) as response:
+            for chunk in response.iter_raw():
+                first = first or time.perf_counter()
+                wire += len(chunk)
+        best_first = min(best_first, first - start)
+        best_total = min(best_total, time.perf_counter() - start)
+    return best_first, best_total, wire
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, nargs="+", default=[20_000, 200_000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    logging.disable(logging.INFO)
+
+    encodings = ["identity", "gzip"] + (["br"] if brotli is not None else [])
+    base = start_server()
+    print(f"{'rows':>8}  {'mode':<8}{'encoding':<10}{'TTFB (s)':>10}{'total (s)':>11}{'wire (MB)':>11}")
+    with httpx.Client(base_url=base, timeout=600) as client:
+        for rows in args.rows:
+            dataset_id = client.post("/api/datasets", json={"data": tall_dataset(rows)}).json()["datasetId"]
+            # Downsampling to the full row count returns every row: the largest payload the endpoint builds
+            body = {"chartType": "line", "yAxis": ["sales"], "maxPoints": rows}
+            for mode, query in (("json", ""), ("ndjson", "?stream=true")):
+                for encoding in encodings:
+                    first, total, wire = measure(client, f"/api/datasets/{dataset_id}/optimize{query}", body, encoding, args.repeat)
+                    print(f"{rows:>8}  {mode:<8}{encoding:<10}{first:>10.3f}{total:>11.3f}{wire / 2**20:>11.2f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""
+Latency of small requests while large uploads are being processed.
+
+Large /api/data/optimize requests (distinct data each, so nothing is cached)
+run concurrently with a steady stream of health checks and small optimize
+requests. The app is driven in-process through httpx's ASGI transport.
+Run with --inline to execute the pandas stages on the event loop, as the
+endpoints did before the worker pool, for comparison.
+
+Usage:
+    python benchmarks/bench_concurrency.py [--large-rows N] [--large-requests N] [--inline]
+"""
+import argparse
+import asyncio
+import logging
+import os
+import sys
+import time
+from typing import Optional
+
+import httpx
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import main  # noqa: E402
+from benchmarks.datasets import tall_dataset  # noqa: E402
+
+async def run_inline(func, *args, **kwargs):
+    """Stand-in for WorkerPool.run that blocks the event loop."""
+    return func(*args, **kwargs)
+
+async def scheduled(client: httpx.AsyncClient, due: float, method: str, url: str, **kwargs) -> Optional[float]:
+    """
+    Send a request and return its latency measured from when it was due to be sent.
+
+    Returns None when the server shed the request with a 503.
+    """
+    response = await client.request(method, url, **kwargs)
+    if response.status_code == 503:
+        return None
+    response.raise_for_status()
+    return time.perf_counter() - due
+
+async def small_requests(client, stop: asyncio.Event, interval: float):
+    """
+    Open-loop stream of health checks and small optimize requests.
+
+    Requests are due at fixed intervals and latency counts from the due time,
+    so time spent waiting for a blocked event loop is included.
+    """
+    health, small = [], []
+    start = time.perf_counter()
+    i = 0
+    while not stop.is_set():
+        due = start + i * interval
+        await asyncio.sleep(max(0.0, due - time.perf_counter()))
+        if i % 2:
+            health.append(asyncio.create_task(scheduled(client, due, "GET", "/")))
+        else:
+            body = {"data": tall_dataset(100, seed=i)}
+            small.append(asyncio.create_task(scheduled(client, due, "POST", "/api/data/optimize", json=body)))
+        i += 1
+    return await asyncio.gather(*health), await asyncio.gather(*small)
+
+async def large_request(client: httpx.AsyncClient, body) -> float:
+    start = time.perf_counter()
+    return await scheduled(client, start, "POST", "/api/data/optimize", json=body)
+
+def summarize(name: str, results) -> str:
+    latencies_ms = np.array([r for r in results if r is not None]) * 1000
+    rejected = len(results) - len(latencies_ms)
+    if not len(latencies_ms):
+        return f"{name:<14}{len(results):>6}{rejected:>6}"
+    return (f"{name:<14}{len(results):>6}{rejected:>6}{np.percentile(latencies_ms, 50):>10.1f}"
+            f"{np.percentile(latencies_ms, 99):>10.1f}{latencies_ms.max():>10.1f}")
+
+async def run(args):
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        large_bodies = [{"data": tall_dataset(args.large_rows, seed=1000 + i)} for i in range(args.large_requests)]
+        stop = asyncio.Event()
+        small = asyncio.create_task(small_requests(client, stop, args.interval))
+
+        start = time.perf_counter()
+        large = await asyncio.gather(*(large_request(client, body) for body in large_bodies))
+        elapsed = time.perf_counter() - start
+        stop.set()
+        health, small_uploads = await small
+
+    mode = "inline (event loop)" if args.inline else f"{main.cpu_pool.kind} pool x{main.cpu_pool.max_workers}"
+    print(f"mode: {mode}")
+    print(f"large requests: {len(large)} x {args.large_rows} rows in {elapsed:.2f} s "
+          f"({sum(r is None for r in large)} rejected)")
+    print(f"{'request':<14}{'count':>6}{'503':>6}{'p50 ms':>10}{'p99 ms':>10}{'max ms':>10}")
+    print(summarize("health check", health))
+    print(summarize("small upload", small_uploads))
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--large-rows", type=int, default=100_000)
+    parser.add_argument("--large-requests", type=int, default=4)
+    parser.add_argument("--interval", type=float, default=0.02, help="seconds between small requests")
+    parser.add_argument("--inline", action="store_true", help="run pandas stages on the event loop")
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)
+
+    if args.inline:
+        main.run_cpu = run_inline
+    asyncio.run(run(args))
+
+if __name__ == "__main__":
+    main_cli()
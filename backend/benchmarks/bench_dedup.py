@@ -0,0 +1,80 @@
+"""
+Compare DataFrame.drop_duplicates with the 64-bit row hash deduplicator.
+
+Each cleaned dataset gets a fifth of its rows appended again, so every run
+has duplicates to find. The deduplicator runs over the whole frame, over the
+same frame split into chunks (as streaming ingestion does) and over a column
+subset; each duplicate count is checked against drop_duplicates.
+
+Usage:
+    python benchmarks/bench_dedup.py [--rows 100000 1000000] [--chunk-rows 50000]
+"""
+import argparse
+import logging
+import os
+import sys
+import time
+import tracemalloc
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import main as backend  # noqa: E402
+from streaming import RowHashDeduplicator  # noqa: E402
+from benchmarks.datasets import categorical_dataset, tall_dataset, wide_dataset  # noqa: E402
+
+SUBSETS = {"tall": ["date", "region", "product"], "wide x 60": ["col_2", "col_3"], "categorical": ["order_date", "store", "sku"]}
+
+def with_duplicates(df: pd.DataFrame, share: float = 0.2) -> pd.DataFrame:
+    return pd.concat([df, df.sample(frac=share, random_state=0)], ignore_index=True)
+
+def measure(func):
+    """Wall-clock time of one run, peak traced memory of a second run and the duplicate count."""
+    start = time.perf_counter()
+    duplicates = func()
+    elapsed = time.perf_counter() - start
+    # Traced separately: tracemalloc slows down code that allocates Python objects
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak, duplicates
+
+def hash_dedup(df: pd.DataFrame, subset=None, chunk_rows=None) -> int:
+    deduplicator = RowHashDeduplicator(subset)
+    step = chunk_rows or len(df)
+    for start in range(0, len(df), step):
+        deduplicator.filter(df.iloc[start:start + step])
+    return deduplicator.duplicates
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, nargs="+", default=[100_000, 1_000_000])
+    parser.add_argument("--chunk-rows", type=int, default=50_000)
+    args = parser.parse_args()
+    logging.disable(logging.INFO)
+
+    print(f"{'dataset':<22}{'method':<26}{'time (s)':>10}{'peak (MB)':>11}{'duplicates':>12}")
+    for rows in args.rows:
+        for name, make in (("tall", tall_dataset), ("wide x 60", wide_dataset), ("categorical", categorical_dataset)):
+            if name == "wide x 60" and rows > 100_000:
+                continue
+            df = with_duplicates(backend.preprocess_data(make(rows)))
+            subset = SUBSETS[name]
+            runs = {
+                "drop_duplicates": lambda: len(df) - len(df.drop_duplicates()),
+                "row hash": lambda: hash_dedup(df),
+                f"row hash, {args.chunk_rows} chunks": lambda: hash_dedup(df, chunk_rows=args.chunk_rows),
+                "drop_duplicates subset": lambda: len(df) - len(df.drop_duplicates(subset)),
+                "row hash subset": lambda: hash_dedup(df, subset),
+            }
+            results = {method: measure(run) for method, run in runs.items()}
+            for method, (elapsed, peak, duplicates) in results.items():
+                expected = results["drop_duplicates subset" if "subset" in method else "drop_duplicates"][2]
+                if duplicates != expected:
+                    raise SystemExit(f"{name} {rows} {method}: found {duplicates} duplicates, expected {expected}")
+                print(f"{f'{name} {len(df)}':<22}{method:<26}{elapsed:>10.3f}{peak / 2**20:>11.1f}{duplicates:>12}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+"""
+Exercise GeminiClient against the fake model: coalescing, concurrency limit and retries.
+
+Usage:
+    python benchmarks/bench_gemini.py [--latency S] [--callers N] [--max-concurrency N]
+"""
+import argparse
+import asyncio
+import logging
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from gemini_client import GeminiClient, GeminiError  # noqa: E402
+from benchmarks.fake_gemini import FakeGenerativeModel  # noqa: E402
+
+async def scenario(name: str, model: FakeGenerativeModel, prompts, max_concurrency: int):
+    client = GeminiClient(lambda: model, max_concurrency=max_concurrency, base_delay=0.05, max_delay=0.5)
+    start = time.perf_counter()
+    results = await asyncio.gather(*(client.generate(p) for p in prompts), return_exceptions=True)
+    elapsed = time.perf_counter() - start
+    errors = sum(isinstance(r, GeminiError) for r in results)
+    print(f"{name:<26}{len(prompts):>8}{model.calls:>10}{model.max_concurrent:>9}"
+          f"{client.retries:>9}{errors:>8}{elapsed:>10.2f}")
+
+async def run(args):
+    print(f"{'scenario':<26}{'callers':>8}{'upstream':>10}{'peak':>9}{'retries':>9}{'errors':>8}{'time (s)':>10}")
+    await scenario("identical prompts", FakeGenerativeModel(args.latency),
+                   ["same prompt"] * args.callers, args.max_concurrency)
+    await scenario("distinct prompts", FakeGenerativeModel(args.latency),
+                   [f"prompt {i}" for i in range(args.callers)], args.max_concurrency)
+    await scenario("distinct, 30% failures", FakeGenerativeModel(args.latency, failure_rate=0.3, seed=1),
+                   [f"prompt {i}" for i in range(args.callers)], args.max_concurrency)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--latency", type=float, default=0.2)
+    parser.add_argument("--callers", type=int, default=32)
+    parser.add_argument("--max-concurrency", type=int, default=8)
+    args = parser.parse_args()
+    logging.disable(logging.CRITICAL)
+    asyncio.run(run(args))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Compare parse latency and peak memory of the upload formats.
+
+The baseline is the JSON rows path: the body is decoded, validated row by row
+by the DataRequest model and rebuilt column-wise by pd.DataFrame. The other
+formats go through ingest.read_upload.
+
+Usage:
+    python benchmarks/bench_ingest.py [--rows N] [--repeat N]
+"""
+import argparse
+import io
+import json
+import logging
+import os
+import sys
+import time
+import tracemalloc
+
+import pandas as pd
+import pyarrow as pa
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from main import DataRequest  # noqa: E402
+from ingest import read_upload  # noqa: E402
+from benchmarks.datasets import tall_dataset  # noqa: E402
+
+def rows_path(body: bytes) -> pd.DataFrame:
+    """The DataRequest path used by the JSON endpoints."""
+    request = DataRequest(**json.loads(body))
+    return pd.DataFrame(request.data)
+
+def encode_bodies(records):
+    """Encode the same dataset in every supported format."""
+    df = pd.DataFrame(records)
+    bodies = {
+        "json rows": (json.dumps({"data": records}, default=str).encode(), None),
+        "json columns": (json.dumps(df.astype(object).where(df.notna(), None).to_dict('list'), default=str).encode(), "application/json"),
+        "csv": (df.to_csv(index=False).encode(), "text/csv"),
+    }
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    bodies["arrow stream"] = (sink.getvalue().to_pybytes(), "application/vnd.apache.arrow.stream")
+    buffer = io.BytesIO()
+    df.to_parquet(buffer, index=False)
+    bodies["parquet"] = (buffer.getvalue(), "application/vnd.apache.parquet")
+    return bodies
+
+def measure(body: bytes, content_type, repeat: int):
+    """Best latency over `repeat` runs and peak Python + Arrow memory of one run."""
+    parse = rows_path if content_type is None else (lambda raw: read_upload(raw, content_type))
+
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        parse(body)
+        best = min(best, time.perf_counter() - start)
+
+    pool = pa.default_memory_pool()
+    arrow_before = pool.bytes_allocated()
+    tracemalloc.start()
+    df = parse(body)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    arrow_peak = max(pool.max_memory() - arrow_before, 0)
+    return best, peak + arrow_peak, len(df)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    logging.disable(logging.INFO)
+
+    bodies = encode_bodies(tall_dataset(args.rows))
+    print(f"{'format':<14}{'body (MB)':>11}{'parse (s)':>11}{'peak (MB)':>11}")
+    for name, (body, content_type) in bodies.items():
+        seconds, peak, rows = measure(body, content_type, args.repeat)
+        assert rows == args.rows
+        print(f"{name:<14}{len(body) / 1e6:>11.1f}{seconds:>11.3f}{peak / 1e6:>11.1f}")
+
+if __name__ == "__main__":
+    main()
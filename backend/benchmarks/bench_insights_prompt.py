@@ -0,0 +1,57 @@
+"""
+Compare insights prompt size and build time for the digest against the full-dataset dump.
+
+Usage:
+    python benchmarks/bench_insights_prompt.py [--rows 1000 10000 100000] [--repeat N]
+"""
+import argparse
+import logging
+import os
+import sys
+import time
+import warnings
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from main import create_insights_prompt, preprocess_data  # noqa: E402
+from benchmarks.datasets import tall_dataset, wide_dataset  # noqa: E402
+
+def legacy_create_insights_prompt(df: pd.DataFrame) -> str:
+    """The prompt create_insights_prompt used to build: every row serialized as JSON."""
+    with warnings.catch_warnings():
+        # The old code relied on the deprecated default epoch date format
+        warnings.simplefilter("ignore")
+        data_json = df.to_json(orient='records', default_handler=str)
+    return f"You are a world-class data analyst.\n\nDataset:\n{data_json}"
+
+def time_call(func, df, repeat):
+    """Return the best wall-clock time over `repeat` runs and the last result."""
+    best, result = float('inf'), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(df)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    logging.disable(logging.INFO)
+
+    print(f"{'dataset':<18}{'dump (KB)':>11}{'dump (s)':>10}{'digest (KB)':>13}{'digest (s)':>12}{'~tokens':>9}")
+    for rows in args.rows:
+        for name, make in (("tall", tall_dataset), ("wide x 60", wide_dataset)):
+            df = preprocess_data(make(rows))
+            dump_time, dump = time_call(legacy_create_insights_prompt, df, args.repeat)
+            digest_time, digest = time_call(create_insights_prompt, df, args.repeat)
+            print(
+                f"{f'{name} {rows}':<18}{len(dump.encode()) / 1024:>11.0f}{dump_time:>10.3f}"
+                f"{len(digest.encode()) / 1024:>13.1f}{digest_time:>12.3f}{len(digest) // 4:>9}"
+            )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+Compare response serialization of a cleaned DataFrame through FastAPI.
+
+The legacy route converts the frame with to_dict('records') and returns
+OptimizedDataResponse, which FastAPI validates and serializes against the
+response model. The current routes return frame_response() for row objects
+and for column arrays. Each request is timed end to end through the ASGI
+app, with peak Python memory from tracemalloc, and the bodies of the legacy
+and records routes are checked to decode to the same JSON.
+
+Usage:
+    python benchmarks/bench_serialization.py [--rows 10000 100000] [--repeat N]
+"""
+import argparse
+import logging
+import os
+import sys
+import time
+import tracemalloc
+
+import pandas as pd
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from main import OptimizedDataResponse, frame_response, preprocess_data  # noqa: E402
+from benchmarks.datasets import tall_dataset, wide_dataset  # noqa: E402
+
+def build_app(df: pd.DataFrame) -> FastAPI:
+    """Routes serving the same frame the old way and the new way."""
+    app = FastAPI()
+
+    def body(data):
+        return {
+            "data": data,
+            "originalRowCount": len(df),
+            "optimizedRowCount": len(df),
+            "aggregationMethod": "none",
+            "datasetId": None,
+        }
+
+    @app.post("/legacy", response_model=OptimizedDataResponse)
+    def legacy():
+        return OptimizedDataResponse(**body(df.to_dict('records')))
+
+    @app.post("/records", response_model=OptimizedDataResponse)
+    async def records():
+        return await frame_response(body(df), "records")
+
+    @app.post("/columns", response_model=OptimizedDataResponse)
+    async def columns():
+        return await frame_response(body(df), "columns")
+
+    return app
+
+def measure(client: TestClient, path: str, repeat: int):
+    """Best wall-clock time over `repeat` requests, peak traced memory of one request and body size."""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        response = client.post(path)
+        best = min(best, time.perf_counter() - start)
+    tracemalloc.start()
+    response = client.post(path)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return best, peak, response
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    logging.disable(logging.INFO)
+
+    print(f"{'dataset':<18}{'route':<10}{'time (s)':>10}{'peak (MB)':>11}{'body (MB)':>11}{'speedup':>9}")
+    for rows in args.rows:
+        for name, make in (("tall", tall_dataset), ("wide x 60", wide_dataset)):
+            df = preprocess_data(make(rows))
+            with TestClient(build_app(df)) as client:
+                results = {path: measure(client, f"/{path}", args.repeat) for path in ("legacy", "records", "columns")}
+            if results["legacy"][2].json() != results["records"][2].json():
+                raise SystemExit(f"{name} {rows}: records body differs from the legacy body")
+            legacy_time = results["legacy"][0]
+            for path, (elapsed, peak, response) in results.items():
+                print(
+                    f"{f'{name} {rows}':<18}{path:<10}{elapsed:>10.3f}{peak / 2**20:>11.1f}"
+                    f"{len(response.content) / 2**20:>11.1f}{legacy_time / elapsed:>8.1f}x"
+                )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""Seeded synthetic dataset generators for backend benchmarks."""
+from typing import Any, Dict, List
+
+import numpy as np
+import pandas as pd
+
+REGIONS = ["North", "South", "East", "West", "Central"]
+PRODUCTS = ["Widget", "Gadget", "Gizmo", "Doohickey", "Thingamajig", "Whatsit"]
+
+def tall_dataset(rows: int, seed: int = 42) -> List[Dict[str, Any]]:
+    """Few columns, many rows: dates, categories, numbers and scattered nulls."""
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        "date": pd.date_range("2020-01-01", periods=rows, freq="h").strftime("%Y-%m-%d %H:%M:%S"),
+        "region": rng.choice(REGIONS, rows),
+        "product": rng.choice(PRODUCTS, rows),
+        "sales": rng.normal(1000, 250, rows).round(2),
+        "units": rng.integers(1, 100, rows),
+        "customer": [f"cust-{i}" for i in rng.integers(0, rows, rows)],
+    })
+    df.loc[rng.random(rows) < 0.05, "sales"] = None
+    df.loc[rng.random(rows) < 0.05, "region"] = None
+    return df.astype(object).where(df.notna(), None).to_dict('records')
+
+def wide_dataset(rows: int, columns: int = 60, seed: int = 42) -> List[Dict[str, Any]]:
+    """Many mixed-type columns with nulls and numbers stored as strings."""
+    rng = np.random.default_rng(seed)
+    data = {}
+    for i in range(columns):
+        kind = i % 5
+        if kind == 0:
+            values = rng.normal(0, 1, rows).round(3)
+        elif kind == 1:
+            values = rng.integers(0, 1000, rows).astype(str)
+        elif kind == 2:
+            values = rng.choice(REGIONS, rows)
+        elif kind == 3:
+            values = pd.date_range("2021-01-01", periods=rows, freq="min").strftime("%Y-%m-%d")
+        else:
+            values = np.char.add("id-", rng.integers(0, rows, rows).astype(str))
+        data[f"col_{i}"] = values
+    df = pd.DataFrame(data).astype(object)
+    df = df.mask(rng.random(df.shape) < 0.03)
+    return df.where(df.notna(), None).to_dict('records')
+
+def categorical_dataset(rows: int, seed: int = 42) -> List[Dict[str, Any]]:
+    """Text columns with hundreds to thousands of repeated values, as in order or event logs."""
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        "order_date": pd.Timestamp("2022-01-01") + pd.to_timedelta(rng.integers(0, 730, rows), unit="D"),
+        "city": np.char.add("city-", rng.zipf(1.3, rows).clip(max=2000).astype(str)),
+        "store": np.char.add("store-", rng.integers(0, 500, rows).astype(str)),
+        "sku": np.char.add("SKU-", rng.integers(0, 5000, rows).astype(str)),
+        "channel": rng.choice(["web", "app", "phone", "store"], rows),
+        "region": rng.choice(REGIONS, rows),
+        "quantity": rng.integers(1, 20, rows),
+        "price": rng.choice([4.99, 9.99, 19.99, 49.99, 99.0], rows),
+    })
+    df["order_date"] = df["order_date"].dt.strftime("%Y-%m-%d")
+    return df.to_dict('records')
+
+def time_series_dataset(rows: int, seed: int = 42) -> List[Dict[str, Any]]:
+    """Minute-level metrics from a few hosts with a daily cycle, a slow trend and noise."""
+    rng = np.random.default_rng(seed)
+    minutes = np.arange(rows)
+    daily = np.sin(2 * np.pi * minutes / 1440)
+    df = pd.DataFrame({
+        "timestamp": pd.date_range("2023-01-01", periods=rows, freq="min").strftime("%Y-%m-%dT%H:%M:%S"),
+        "host": rng.choice(["web-1", "web-2", "web-3", "db-1"], rows),
+        "requests": rng.poisson(200 + 120 * daily + minutes / 2000),
+        "latency_ms": (80 + 30 * daily + rng.gamma(2.0, 10.0, rows)).round(1),
+        "cpu": (0.4 + 0.25 * daily + rng.normal(0, 0.05, rows)).clip(0, 1).round(3),
+    })
+    return df.to_dict('records')
+
+def messy_dataset(rows: int, seed: int = 42) -> List[Dict[str, Any]]:
+    """
+    Export-style data: numbers and dates as strings, placeholder values, heavy nulls and repeated rows.
+
+    One column is mostly empty (dropped by cleaning) and about 5% of the rows
+    repeat an earlier row.
+    """
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        "order_date": pd.Timestamp("2021-01-01") + pd.to_timedelta(rng.integers(0, 1000, rows), unit="D"),
+        "customer": np.char.add("Customer ", rng.integers(0, max(rows // 20, 1), rows).astype(str)),
+        "region": rng.choice(REGIONS + [r.upper() for r in REGIONS] + [f" {r} " for r in REGIONS], rows),
+        "revenue": rng.lognormal(5, 1, rows).round(2).astype(str),
+        "units": rng.integers(1, 50, rows).astype(str),
+        "discount": rng.choice(["0", "0.05", "0.1", "N/A", ""], rows),
+        "status": rng.choice(["shipped", "pending", "returned", None], rows, p=[0.6, 0.2, 0.1, 0.1]),
+        "notes": rng.choice(["gift", "expedite", None], rows, p=[0.05, 0.05, 0.9]),
+    })
+    df["order_date"] = df["order_date"].dt.strftime("%m/%d/%Y")
+    df = df.astype(object)
+    df = df.mask(rng.random(df.shape) < 0.15)
+    repeats = rng.random(rows) < 0.05
+    df.iloc[repeats] = df.iloc[rng.integers(0, rows, int(repeats.sum()))].to_numpy()
+    return df.where(df.notna(), None).to_dict('records')
+
+def mixed_dataset(rows: int, seed: int = 42) -> List[Dict[str, Any]]:
+    """Columns whose values mix Python types: ints with numeric strings, booleans, codes that are sometimes numbers."""
+    rng = np.random.default_rng(seed)
+    amounts = rng.normal(100, 40, rows).round(2)
+    df = pd.DataFrame({
+        "id": np.arange(rows),
+        "created": pd.date_range("2022-06-01", periods=rows, freq="15min").strftime("%Y-%m-%d %H:%M"),
+        "amount": np.where(rng.random(rows) < 0.3, amounts.astype(str), amounts.astype(object)),
+        "quantity": np.where(rng.random(rows) < 0.2, rng.integers(1, 10, rows).astype(str), rng.integers(1, 10, rows).astype(object)),
+        "active": rng.choice([True, False], rows),
+        "code": np.where(rng.random(rows) < 0.5, rng.integers(100, 999, rows).astype(object), np.char.add("X", rng.integers(0, 50, rows).astype(str))),
+        "segment": rng.choice(["consumer", "corporate", "home office"], rows),
+    })
+    df = df.astype(object).mask(rng.random(df.shape) < 0.02)
+    return df.where(df.notna(), None).to_dict('records')
+
+# Every generator the benchmark suite can run, by name
+GENERATORS = {
+    "timeseries": time_series_dataset,
+    "categorical": categorical_dataset,
+    "wide": wide_dataset,
+    "messy": messy_dataset,
+    "mixed": mixed_dataset,
+}
@@ -0,0 +1,66 @@
+"""Local stand-in for google.generativeai.GenerativeModel with configurable latency."""
+import asyncio
+import json
+import random
+import re
+from dataclasses import dataclass
+
+@dataclass
+class FakeResponse:
+    text: str
+
+class FakeGenerativeModel:
+    """
+    Answers prompts after a simulated network delay.
+
+    Chart prompts get suggestions built from the schema in the prompt; any
+    other prompt gets a short Markdown insight.
+
+    Args:
+        latency: Seconds each call takes
+        jitter: Extra random delay of up to this many seconds
+        failure_rate: Probability that a call raises instead of answering
+        seed: Seed for the jitter and failure draws
+    """
+
+    def __init__(self, latency: float = 0.5, jitter: float = 0.0, failure_rate: float = 0.0, seed: int = 0):
+        self.latency = latency
+        self.jitter = jitter
+        self.failure_rate = failure_rate
+        self.calls = 0
+        self.concurrent = 0
+        self.max_concurrent = 0
+        self._random = random.Random(seed)
+
+    async def generate_content_async(self, prompt: str) -> FakeResponse:
+        self.calls += 1
+        self.concurrent += 1
+        self.max_concurrent = max(self.max_concurrent, self.concurrent)
+        try:
+            await asyncio.sleep(self.latency + self._random.uniform(0, self.jitter))
+            if self._random.random() < self.failure_rate:
+                raise RuntimeError("Simulated upstream failure")
+            return FakeResponse(text=self._answer(prompt))
+        finally:
+            self.concurrent -= 1
+
+    def _answer(self, prompt: str) -> str:
+        match = re.search(r"Dataset Schema:\n(.*?)\n\nSample Data", prompt, re.S)
+        if not match:
+            return "- **Trend**: values are stable.\n- **Action**: keep monitoring."
+        schema = json.loads(match.group(1))
+        by_type = {}
+        for column in schema:
+            by_type.setdefault(column["type"], []).append(column["name"])
+        numeric = by_type.get("numeric", [schema[0]["name"]])
+        x_axis = (by_type.get("date") or by_type.get("categorical") or [schema[0]["name"]])[0]
+        suggestions = [{
+            "chartType": "line", "xAxis": x_axis, "yAxis": numeric[:1],
+            "title": f"{numeric[0]} by {x_axis}", "description": "Fake suggestion", "aggregated": True,
+        }]
+        if by_type.get("categorical"):
+            suggestions.append({
+                "chartType": "pie", "nameKey": by_type["categorical"][0], "valueKey": numeric[0],
+                "title": f"{numeric[0]} share", "description": "Fake suggestion", "aggregated": True,
+            })
+        return json.dumps({"suggestions": suggestions})
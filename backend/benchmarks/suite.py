@@ -0,0 +1,283 @@
+"""
+Reproducible benchmark suite for the backend pipeline.
+
+For every seeded dataset (see benchmarks/datasets.py GENERATORS) and row
+count, each pipeline stage is timed on its own and every endpoint is timed
+end to end through the app in-process (httpx ASGI transport), with Gemini
+replaced by the fake model. Caches are cleared before each cold run, so a
+repeat measures the same work as the first run. Endpoint results also carry
+the per-stage breakdown from the Server-Timing header.
+
+Results are written as JSON with the git commit and library versions, so
+runs from different commits can be compared with --compare.
+
+Usage:
+    python benchmarks/suite.py [--datasets timeseries messy] [--rows 1000 10000 100000] [--repeat 3]
+                               [--output results.json]
+    python benchmarks/suite.py --rows 1000000 --datasets timeseries categorical
+    python benchmarks/suite.py --compare base.json new.json [--threshold 1.2]
+
+The wide dataset (60 columns) is capped at --max-wide-rows rows.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List
+
+# Stage timings of each endpoint request come back in a Server-Timing header
+os.environ["SERVER_TIMING"] = "true"
+
+import httpx
+import numpy as np
+import orjson
+import pandas as pd
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+import main  # noqa: E402
+from filter_cube import FilterCube  # noqa: E402
+from inference import datetime_format_cache  # noqa: E402
+from serialization import dumps  # noqa: E402
+from benchmarks.datasets import GENERATORS  # noqa: E402
+from benchmarks.fake_gemini import FakeGenerativeModel  # noqa: E402
+
+def summarize(samples: List[float]) -> Dict[str, float]:
+    return {
+        "min": min(samples),
+        "median": statistics.median(samples),
+        "mean": statistics.fmean(samples),
+        "max": max(samples),
+    }
+
+def clear_caches() -> None:
+    """Forget cleaned datasets, model answers and detected date formats, so the next run is cold."""
+    main.dataset_cache.clear()
+    main.llm_cache.clear()
+    datetime_format_cache.clear()
+
+def time_call(func: Callable[[], Any], repeat: int, cold: bool = True):
+    """Seconds for each of `repeat` calls, and the last result."""
+    samples, result = [], None
+    for _ in range(repeat):
+        if cold:
+            clear_caches()
+        start = time.perf_counter()
+        result = func()
+        samples.append(time.perf_counter() - start)
+    return samples, result
+
+def fake_suggestions(df: pd.DataFrame, viz_df: pd.DataFrame) -> List[Dict[str, Any]]:
+    """The suggestions the fake model answers for this dataset's chart prompt."""
+    prompt = main.render_chart_prompt(main.chart_prompt_inputs(df, viz_df))
+    return json.loads(FakeGenerativeModel()._answer(prompt))["suggestions"]
+
+def stage_results(records: List[Dict[str, Any]], repeat: int) -> List[Dict[str, Any]]:
+    """Time each pipeline stage on its own, feeding it the previous stage's output."""
+    results = []
+
+    def record(stage: str, samples: List[float], **extra):
+        results.append({"kind": "stage", "name": stage, "seconds": summarize(samples), **extra})
+
+    samples, df = time_call(lambda: main.preprocess_data(records), repeat)
+    record("preprocess_data", samples, outputRows=len(df), outputBytes=int(df.memory_usage(deep=True).sum()))
+
+    samples, viz_df = time_call(lambda: main.aggregate_data_for_visualization(df), repeat)
+    record("aggregate_data_for_visualization", samples, outputRows=len(viz_df))
+
+    samples, _ = time_call(lambda: main.chart_prompt_inputs(df, viz_df), repeat)
+    record("chart_prompt_inputs", samples)
+
+    suggestions = fake_suggestions(df, viz_df)
+    samples, _ = time_call(lambda: main.attach_chart_series(df, suggestions), repeat)
+    record("attach_chart_series", samples, charts=len(suggestions))
+
+    samples, _ = time_call(lambda: main.create_insights_prompt(df), repeat)
+    record("create_insights_prompt", samples)
+
+    samples, body = time_call(lambda: dumps({"data": df}, "records"), repeat)
+    record("serialize_records", samples, outputBytes=len(body))
+
+    samples, body = time_call(lambda: dumps({"data": df}, "columns"), repeat)
+    record("serialize_columns", samples, outputBytes=len(body))
+
+    samples, _ = time_call(lambda: FilterCube(df), repeat)
+    record("filter_cube", samples)
+    return results
+
+def first_filter(column_info: List[Dict[str, str]], records: List[Dict[str, Any]]) -> Dict[str, str]:
+    """Filter on the first categorical column's first value, as a dashboard click would."""
+    for column in column_info:
+        if column["type"] == "categorical":
+            for row in records:
+                if row.get(column["name"]) is not None:
+                    return {column["name"]: str(row[column["name"]]).strip()}
+    return {}
+
+async def endpoint_results(records: List[Dict[str, Any]], repeat: int) -> List[Dict[str, Any]]:
+    """Time every endpoint through the ASGI app with the fake model answering."""
+    results = []
+    # Encoded once so the client's JSON encoding is not part of the measurement
+    upload = orjson.dumps({"data": records}, default=str)
+    headers = {"Content-Type": "application/json"}
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+
+        async def measure(name: str, method: str, url: str, cold: bool, **kwargs) -> httpx.Response:
+            samples, stages = [], []
+            response = None
+            for _ in range(repeat):
+                if cold:
+                    clear_caches()
+                start = time.perf_counter()
+                response = await client.request(method, url, **kwargs)
+                samples.append(time.perf_counter() - start)
+                response.raise_for_status()
+                stages.append(parse_server_timing(response.headers.get("Server-Timing", "")))
+            results.append({
+                "kind": "endpoint",
+                "name": name,
+                "cold": cold,
+                "seconds": summarize(samples),
+                "responseBytes": len(response.content),
+                "stagesMs": {stage: round(statistics.median(run.get(stage, 0.0) for run in stages), 3) for stage in stages[-1]},
+            })
+            return response
+
+        await measure("POST /api/datasets", "POST", "/api/datasets", True, content=upload, headers=headers)
+        await measure("POST /api/charts/suggestions", "POST", "/api/charts/suggestions", True, content=upload, headers=headers)
+
+        # Upload once and reuse the dataset id, as the dashboard does
+        dataset = (await client.post("/api/datasets", content=upload, headers=headers)).json()
+        dataset_id = dataset["datasetId"]
+        charts = await measure(
+            "POST /api/datasets/{id}/suggestions", "POST", f"/api/datasets/{dataset_id}/suggestions", False)
+        await measure(
+            "POST /api/datasets/{id}/optimize", "POST", f"/api/datasets/{dataset_id}/optimize", False,
+            json={"chartType": "line", "maxPoints": 500})
+        await measure("POST /api/datasets/{id}/insights", "POST", f"/api/datasets/{dataset_id}/insights", False)
+        await measure(
+            "POST /api/datasets/{id}/query", "POST", f"/api/datasets/{dataset_id}/query", False,
+            json={"filters": first_filter(dataset["columnInfo"], records), "suggestions": charts.json()["suggestions"]})
+    return results
+
+def parse_server_timing(value: str) -> Dict[str, float]:
+    """Milliseconds per stage from a Server-Timing header value."""
+    stages = {}
+    for entry in value.split(","):
+        name, _, params = entry.strip().partition(";")
+        if name and params.startswith("dur="):
+            stages[name] = float(params[4:])
+    return stages
+
+def environment(args: argparse.Namespace) -> Dict[str, Any]:
+    """Commit, library versions and settings the results depend on."""
+    def git(*command):
+        try:
+            return subprocess.run(["git", *command], cwd=BACKEND_DIR, capture_output=True, text=True, check=True).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
+
+    import pyarrow
+    return {
+        "commit": git("rev-parse", "HEAD"),
+        "dirty": bool(git("status", "--porcelain", "--untracked-files=no")),
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpuCount": os.cpu_count(),
+        "pandas": pd.__version__,
+        "numpy": np.__version__,
+        "pyarrow": pyarrow.__version__,
+        "workerPool": main.cpu_pool.stats()["kind"],
+        "compactDataframes": main.COMPACT_DATAFRAMES,
+        "seed": args.seed,
+        "repeat": args.repeat,
+    }
+
+def run(args: argparse.Namespace) -> Dict[str, Any]:
+    main.GEMINI_API_KEY = main.GEMINI_API_KEY or "benchmark"
+    main.gemini_client.model_factory = lambda: FakeGenerativeModel(latency=args.gemini_latency)
+
+    results = []
+    for name in args.datasets:
+        for rows in args.rows:
+            if name == "wide" and rows > args.max_wide_rows:
+                print(f"{name:<12}{rows:>9}  skipped (above --max-wide-rows)")
+                continue
+            records = GENERATORS[name](rows, seed=args.seed)
+            entries = []
+            if not args.endpoints_only:
+                entries += stage_results(records, args.repeat)
+            if not args.stages_only:
+                entries += asyncio.run(endpoint_results(records, args.repeat))
+            for entry in entries:
+                entry.update(dataset=name, rows=rows)
+                print(f"{name:<12}{rows:>9}  {entry['kind']:<9}{entry['name']:<40}{entry['seconds']['median']:>10.4f} s")
+            results.extend(entries)
+            del records
+    return {"environment": environment(args), "results": results}
+
+def result_key(entry: Dict[str, Any]):
+    return entry["dataset"], entry["rows"], entry["kind"], entry["name"]
+
+def compare(base_path: str, new_path: str, threshold: float) -> int:
+    """Print median time ratios of two result files; return 1 when anything slowed down past the threshold."""
+    with open(base_path) as f:
+        base = json.load(f)
+    with open(new_path) as f:
+        new = json.load(f)
+    base_results = {result_key(entry): entry for entry in base["results"]}
+    print(f"base {base['environment']['commit']}  new {new['environment']['commit']}")
+    print(f"{'dataset':<12}{'rows':>9}  {'benchmark':<40}{'base (s)':>10}{'new (s)':>10}{'ratio':>8}")
+    regressions = 0
+    for entry in new["results"]:
+        previous = base_results.get(result_key(entry))
+        if previous is None:
+            continue
+        before, after = previous["seconds"]["median"], entry["seconds"]["median"]
+        ratio = after / before if before else float('inf')
+        flag = "  slower" if ratio > threshold else ""
+        regressions += ratio > threshold
+        print(f"{entry['dataset']:<12}{entry['rows']:>9}  {entry['name']:<40}{before:>10.4f}{after:>10.4f}{ratio:>7.2f}x{flag}")
+    return 1 if regressions else 0
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--datasets", nargs="+", choices=sorted(GENERATORS), default=list(GENERATORS))
+    parser.add_argument("--rows", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--max-wide-rows", type=int, default=100_000)
+    parser.add_argument("--gemini-latency", type=float, default=0.0, help="seconds each fake model call takes")
+    parser.add_argument("--stages-only", action="store_true")
+    parser.add_argument("--endpoints-only", action="store_true")
+    parser.add_argument("--output", help="JSON results file (default: benchmarks/results/<commit>-<time>.json)")
+    parser.add_argument("--compare", nargs=2, metavar=("BASE", "NEW"), help="compare two results files and exit")
+    parser.add_argument("--threshold", type=float, default=1.2, help="ratio above which --compare reports a slowdown")
+    args = parser.parse_args()
+
+    if args.compare:
+        sys.exit(compare(*args.compare, args.threshold))
+
+    logging.disable(logging.WARNING)
+    report = run(args)
+    output = args.output
+    if not output:
+        commit = (report["environment"]["commit"] or "unknown")[:10]
+        output = os.path.join(BACKEND_DIR, "benchmarks", "results", f"{commit}-{time.strftime('%Y%m%d-%H%M%S')}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {output}")
+
+if __name__ == "__main__":
+    main_cli()
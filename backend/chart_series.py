@@ -0,0 +1,196 @@
+import logging
+import math
+from typing import Any, Dict, List, Optional
+
+import pandas as pd
+
+from downsample import CHART_METHODS, downsample
+
+logger = logging.getLogger(__name__)
+
+SERIES_MAX_POINTS = 200   # points per line/area series and cells per binned scatter
+MAX_SLICES = 6            # pie slices, the smallest merged into "Other" (matches the pie component)
+MAX_BARS = 20             # bars per bar chart
+MAX_RADAR_ITEMS = 7       # categories per radar chart (matches the radar component)
+PERIOD_DAYS = (('D', 1), ('W', 7), ('M', 30.4), ('Q', 91.3), ('Y', 365.25))
+
+def _records(frame: pd.DataFrame) -> List[Dict[str, Any]]:
+    """Rows as dicts with missing values as None so the JSON stays valid."""
+    return frame.astype(object).where(frame.notna(), None).to_dict('records')
+
+def _is_numeric(series: pd.Series) -> bool:
+    return pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series)
+
+def _periods(dates: pd.Series, max_points: int) -> pd.Series:
+    """Start of the finest calendar period (day to year) that splits the dates into at most max_points groups."""
+    span_days = max((dates.max() - dates.min()).days, 1)
+    freq = next((f for f, days in PERIOD_DAYS if span_days / days <= max_points), 'Y')
+    return dates.dt.to_period(freq).dt.start_time
+
+def trend_keys(dates: pd.Series, max_points: int = SERIES_MAX_POINTS) -> pd.Series:
+    """The dates themselves when there are few distinct ones, otherwise their calendar periods."""
+    if dates.nunique() > max_points:
+        return _periods(dates, max_points)
+    return dates
+
+def pie_series(df: pd.DataFrame, name_key: str, value_key: str) -> Dict[str, Any]:
+    """Sum of value_key per name_key, largest first, with the tail merged into "Other"."""
+    return pie_from_totals(name_key, value_key, df.groupby(name_key, observed=True)[value_key].sum())
+
+def pie_from_totals(name_key: str, value_key: str, totals: pd.Series) -> Dict[str, Any]:
+    """Pie rows from the value_key total of every name_key group."""
+    totals = totals.sort_values(ascending=False, kind='stable')
+    frame = pd.DataFrame({name_key: totals.index.astype(object), value_key: totals.to_numpy()})
+    if len(frame) > MAX_SLICES:
+        other = pd.DataFrame({name_key: ["Other"], value_key: [frame[value_key].iloc[MAX_SLICES - 1:].sum()]})
+        frame = pd.concat([frame.iloc[:MAX_SLICES - 1], other], ignore_index=True)
+    return {"data": _records(frame), "aggregation": "sum"}
+
+def bar_series(df: pd.DataFrame, x: str, y: List[str]) -> Dict[str, Any]:
+    """
+    Sum of each y column per bar.
+
+    Categories beyond MAX_BARS keep the largest by the first y column; dates
+    are grouped into calendar periods and numbers into equal-width bins.
+    """
+    keys = df[x]
+    if keys.nunique() > MAX_BARS:
+        if pd.api.types.is_datetime64_any_dtype(keys):
+            keys = _periods(keys, MAX_BARS)
+        elif _is_numeric(keys):
+            keys = pd.cut(keys, MAX_BARS)
+    return bar_from_sums(df[y].groupby(keys.rename(x), observed=True).sum(), y)
+
+def bar_from_sums(sums: pd.DataFrame, y: List[str]) -> Dict[str, Any]:
+    """Bar rows from the y column sums of every bar, indexed by bar key."""
+    if len(sums) > MAX_BARS:
+        sums = sums.sort_values(y[0], ascending=False, kind='stable').iloc[:MAX_BARS]
+    if isinstance(sums.index, pd.IntervalIndex) or isinstance(sums.index.dtype, pd.CategoricalDtype):
+        # Bin labels such as "(0.9, 5.9]", still in bin order
+        sums.index = sums.index.astype(str)
+    return {"data": _records(sums.reset_index()), "aggregation": "sum"}
+
+def trend_series(df: pd.DataFrame, x: str, y: List[str], method: str,
+                 max_points: int = SERIES_MAX_POINTS) -> Dict[str, Any]:
+    """
+    Mean of each y column per x value, in x order, with at most max_points points.
+
+    Dates with too many distinct values are averaged per calendar period;
+    numeric x values are averaged per value and then downsampled with the
+    chart type's shape-preserving method.
+    """
+    keys = df[x]
+    is_date = pd.api.types.is_datetime64_any_dtype(keys)
+    periods = is_date and keys.nunique() > max_points
+    if periods:
+        keys = _periods(keys, max_points)
+    sort = is_date or _is_numeric(keys)
+    means = df[y].groupby(keys.rename(x), observed=True, sort=sort).mean()
+    return trend_from_means(means, x, y, method, max_points, periods=periods)
+
+def trend_from_means(means: pd.DataFrame, x: str, y: List[str], method: str,
+                     max_points: int = SERIES_MAX_POINTS, periods: bool = False) -> Dict[str, Any]:
+    """Line/area rows from the y column means per x value, indexed (and ordered) by x."""
+    aggregation = "period_mean" if periods else "mean"
+    sort = pd.api.types.is_datetime64_any_dtype(means.index) or _is_numeric(means.index.to_series())
+    means = means.reset_index()
+    if len(means) > max_points:
+        if sort:
+            means = downsample(means, x, y, max_points, method)
+            aggregation = f"mean_{method}"
+        else:
+            means = means.iloc[:max_points]
+    return {"data": _records(means), "aggregation": aggregation}
+
+def scatter_series(df: pd.DataFrame, x: str, y: List[str], max_points: int = SERIES_MAX_POINTS) -> Dict[str, Any]:
+    """
+    The raw points when there are few, otherwise the mean point of each cell of a 2-D grid.
+
+    Binned rows carry a count column with the number of rows in the cell.
+    """
+    points = df[[x] + y].dropna()
+    if len(points) <= max_points:
+        return {"data": _records(points), "aggregation": "none"}
+
+    bins = max(1, int(math.sqrt(max_points)))
+    cells = [pd.cut(points[x], bins, labels=False), pd.cut(points[y[0]], bins, labels=False)]
+    grouped = points.groupby(cells, observed=True)
+    binned = grouped.mean().reset_index(drop=True)
+    binned["count"] = grouped.size().to_numpy()
+    return {"data": _records(binned), "aggregation": "binned_mean"}
+
+def radar_series(df: pd.DataFrame, category_key: str, y: List[str]) -> Dict[str, Any]:
+    """Mean of each y column per category, keeping the categories with the largest first mean."""
+    return radar_from_means(df[y].groupby(df[category_key], observed=True).mean(), y)
+
+def radar_from_means(means: pd.DataFrame, y: List[str]) -> Dict[str, Any]:
+    """Radar rows from the y column means of every category, indexed by category."""
+    means = means.sort_values(y[0], ascending=False, kind='stable').iloc[:MAX_RADAR_ITEMS]
+    return {"data": _records(means.reset_index()), "aggregation": "mean"}
+
+def suggestion_columns(suggestion: Dict[str, Any]) -> List[Any]:
+    """Every column a chart configuration refers to."""
+    y = suggestion.get("yAxis") or []
+    y = [y] if isinstance(y, str) else list(y)
+    keys = [suggestion.get(key) for key in ("xAxis", "nameKey", "valueKey", "categoryKey")]
+    return [col for col in keys if col is not None] + y
+
+def build_chart_series(df: pd.DataFrame, suggestion: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """
+    Compute the rows one suggested chart needs from the cleaned dataset.
+
+    Args:
+        df: Cleaned DataFrame
+        suggestion: Chart configuration from the model (chartType plus its keys)
+
+    Returns:
+        Dict with the chart rows (keyed by the original column names) and the
+        aggregation applied, or None if the configuration does not match the data
+    """
+    chart_type = suggestion.get("chartType")
+    y = suggestion.get("yAxis") or []
+    y = [y] if isinstance(y, str) else list(y)
+
+    def usable(keys: List[Any], numeric: List[Any]) -> bool:
+        return (
+            all(isinstance(k, str) and k in df.columns for k in keys + numeric)
+            and all(_is_numeric(df[k]) for k in numeric)
+        )
+
+    if chart_type == "pie":
+        name_key, value_key = suggestion.get("nameKey"), suggestion.get("valueKey")
+        if usable([name_key], [value_key]):
+            return pie_series(df, name_key, value_key)
+    elif chart_type == "radar":
+        category_key = suggestion.get("categoryKey")
+        if y and usable([category_key], y):
+            return radar_series(df, category_key, y)
+    elif chart_type in ("line", "area", "bar", "scatter"):
+        x = suggestion.get("xAxis")
+        if y and usable([x], y):
+            if chart_type == "bar":
+                return bar_series(df, x, y)
+            if chart_type == "scatter" and _is_numeric(df[x]):
+                return scatter_series(df, x, y)
+            return trend_series(df, x, y, CHART_METHODS.get(chart_type, "lttb"))
+    return None
+
+def attach_chart_series(df: pd.DataFrame, suggestions: List[Any]) -> List[Any]:
+    """
+    Add "data" and "aggregation" to every suggestion whose configuration matches the dataset.
+
+    Suggestions that cannot be computed are returned unchanged, so the
+    client can still fall back to processedData.
+    """
+    result = []
+    for suggestion in suggestions:
+        if not isinstance(suggestion, dict):
+            result.append(suggestion)
+            continue
+        try:
+            series = build_chart_series(df, suggestion)
+        except Exception as e:
+            logger.warning(f"Could not build series for {suggestion.get('chartType')} chart: {str(e)}")
+            series = None
+        result.append({**suggestion, **series} if series else suggestion)
+    return result
@@ -0,0 +1,180 @@
+import logging
+import zlib
+from typing import Optional
+
+import anyio.to_thread
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; gzip is used instead
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+# Bodies that are already compressed, or must reach the client unbuffered
+EXCLUDED_CONTENT_TYPES = ("text/event-stream", "application/zip", "application/gzip", "image/", "video/", "audio/")
+
+def accepted_encodings(header_value: Optional[str]) -> set:
+    """Content codings an Accept-Encoding header allows, ignoring those refused with q=0."""
+    accepted = set()
+    for part in (header_value or "").lower().split(","):
+        coding, _, params = part.partition(";")
+        quality = params.strip().removeprefix("q=")
+        try:
+            refused = bool(params.strip()) and float(quality) == 0
+        except ValueError:
+            refused = False
+        if coding.strip() and not refused:
+            accepted.add(coding.strip())
+    return accepted
+
+class GzipEncoder:
+    """Incremental gzip stream; each chunk is sync-flushed so the client can decode it at once."""
+    content_encoding = "gzip"
+
+    def __init__(self, level: int = 6):
+        self.level = level
+        self._compressor = None
+
+    def compress(self, body: bytes, more_body: bool) -> bytes:
+        if self._compressor is None:
+            self._compressor = zlib.compressobj(self.level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+        return self._compressor.compress(body) + self._compressor.flush(zlib.Z_SYNC_FLUSH if more_body else zlib.Z_FINISH)
+
+class BrotliEncoder:
+    """Incremental brotli stream, flushed after every chunk like GzipEncoder."""
+    content_encoding = "br"
+
+    def __init__(self, quality: int = 4):
+        self.quality = quality
+        self._compressor = None
+
+    def compress(self, body: bytes, more_body: bool) -> bytes:
+        if self._compressor is None:
+            self._compressor = brotli.Compressor(quality=self.quality)
+        if more_body:
+            return self._compressor.process(body) + self._compressor.flush()
+        return self._compressor.process(body) + self._compressor.finish()
+
+class CompressionResponder:
+    """
+    Compress one response with the given encoder, or only mark it as varying by
+    Accept-Encoding when encoder is None.
+
+    The start message is held back until the first body chunk shows whether
+    the response is worth compressing. Responses that already have a
+    Content-Encoding, partial content and excluded content types pass through.
+    """
+
+    def __init__(self, app: ASGIApp, encoder, minimum_size: int, thread_minimum_size: int):
+        self.app = app
+        self.encoder = encoder
+        self.minimum_size = minimum_size
+        self.thread_minimum_size = thread_minimum_size
+        self.send: Optional[Send] = None
+        self.start: Optional[Message] = None
+        self.passthrough = False
+        self.compressing = False
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        self.send = send
+        await self.app(scope, receive, self.send_compressed)
+
+    async def send_compressed(self, message: Message) -> None:
+        kind = message["type"]
+        if kind == "http.response.start":
+            headers = Headers(raw=message["headers"])
+            content_type = headers.get("content-type", "").partition(";")[0].strip().lower()
+            self.passthrough = (
+                "content-encoding" in headers
+                or message["status"] == 206
+                or content_type.startswith(EXCLUDED_CONTENT_TYPES)
+            )
+            if self.passthrough:
+                await self.send(message)
+            else:
+                self.start = message
+        elif kind != "http.response.body" or self.passthrough:
+            if self.start is not None:
+                # pathsend and other extensions are never compressed
+                await self.send(self.start)
+                self.start = None
+            await self.send(message)
+        elif self.start is not None:
+            await self.send_first_body(message)
+        elif self.compressing:
+            message["body"] = await self.compress(message.get("body", b""), message.get("more_body", False))
+            await self.send(message)
+        else:
+            await self.send(message)
+
+    async def send_first_body(self, message: Message) -> None:
+        start, self.start = self.start, None
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+        if len(body) < self.minimum_size and not more_body:
+            await self.send(start)
+            await self.send(message)
+            return
+
+        headers = MutableHeaders(raw=start["headers"])
+        headers.add_vary_header("Accept-Encoding")
+        if self.encoder is not None:
+            self.compressing = True
+            message["body"] = await self.compress(body, more_body)
+            headers["Content-Encoding"] = self.encoder.content_encoding
+            if more_body or start.get("trailers", False):
+                del headers["Content-Length"]
+            else:
+                headers["Content-Length"] = str(len(message["body"]))
+        await self.send(start)
+        await self.send(message)
+
+    async def compress(self, body: bytes, more_body: bool) -> bytes:
+        if len(body) >= self.thread_minimum_size:
+            # Compressing large chunks inline would block the event loop
+            return await anyio.to_thread.run_sync(self.encoder.compress, body, more_body)
+        return self.encoder.compress(body, more_body)
+
+class CompressionMiddleware:
+    """
+    Compress responses above minimum_size with brotli or gzip, whichever the client accepts.
+
+    Brotli is preferred when the brotli package is installed. Streamed
+    responses (such as NDJSON) are compressed and flushed per chunk, so rows
+    still reach the client as they are produced. Built on the plain ASGI
+    interface, so it does not depend on Starlette's GZip internals.
+
+    Args:
+        app: ASGI application
+        minimum_size: Smallest body in bytes worth compressing
+        gzip_level: zlib level 1-9; the middle levels trade little size for much less CPU
+        brotli_quality: Brotli quality 0-11; 4-5 suits dynamic responses
+        thread_minimum_size: Chunks at least this large are compressed on a worker thread
+    """
+
+    def __init__(self, app: ASGIApp, minimum_size: int = 1024, gzip_level: int = 6, brotli_quality: int = 4,
+                 thread_minimum_size: int = 128 * 1024):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.thread_minimum_size = thread_minimum_size
+        if brotli is None:
+            logger.info("brotli is not installed; compressing responses with gzip only")
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encodings = accepted_encodings(Headers(scope=scope).get("Accept-Encoding"))
+        if brotli is not None and "br" in encodings:
+            encoder = BrotliEncoder(self.brotli_quality)
+        elif "gzip" in encodings:
+            encoder = GzipEncoder(self.gzip_level)
+        else:
+            encoder = None
+        await CompressionResponder(self.app, encoder, self.minimum_size, self.thread_minimum_size)(scope, receive, send)
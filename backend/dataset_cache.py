@@ -0,0 +1,173 @@
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+import pandas as pd
+
+from inference import ColumnProfile
+
+class DatasetTooLargeError(ValueError):
+    """Raised when a cleaned dataset is larger than the whole cache budget."""
+
+def fingerprint_records(data: List[Dict[str, Any]]) -> str:
+    """
+    Hash an uploaded list of records into a content-addressed dataset id.
+
+    Record keys are sorted so the same values hash the same, but the columns
+    in order of first appearance are hashed too: they set the column order of
+    the cleaned frame, so uploads that differ only in it are different datasets.
+    """
+    columns = list(dict.fromkeys(key for record in data for key in record))
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(json.dumps(columns, separators=(',', ':'), default=str).encode())
+    digest.update(json.dumps(data, sort_keys=True, separators=(',', ':'), default=str).encode())
+    return digest.hexdigest()
+
+def scoped_dataset_id(dataset_id: str, dedup_columns: Optional[List[str]] = None) -> str:
+    """
+    Id for a dataset cleaned with non-default options.
+
+    The same upload deduplicated by a column subset is a different dataset;
+    without options the content id is returned unchanged.
+    """
+    if not dedup_columns:
+        return dataset_id
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(dataset_id.encode())
+    digest.update(json.dumps({"dedupColumns": dedup_columns}, separators=(',', ':')).encode())
+    return digest.hexdigest()
+
+def frame_nbytes(df: Optional[pd.DataFrame]) -> int:
+    """Memory footprint of a DataFrame including object column contents."""
+    if df is None:
+        return 0
+    return int(df.memory_usage(deep=True).sum())
+
+@dataclass
+class CachedDataset:
+    """A cleaned dataset and everything derived from it that endpoints reuse."""
+    dataset_id: str
+    df: pd.DataFrame
+    # Column profiles from cleaning; empty for datasets restored from disk
+    profiles: Dict[str, ColumnProfile]
+    viz_df: pd.DataFrame
+    # Group-level partial aggregates for filter queries, built on first use
+    filter_cube: Optional[Any] = None
+    # Rows dropped as duplicates while cleaning; unknown (0) for datasets restored from disk
+    duplicate_rows: int = 0
+    created_at: float = field(default_factory=time.monotonic)
+    nbytes: int = 0
+
+    def __post_init__(self):
+        if not self.nbytes:
+            self.nbytes = frame_nbytes(self.df) + frame_nbytes(self.viz_df) + getattr(self.filter_cube, 'nbytes', 0)
+
+class DatasetCache:
+    """
+    Thread-safe LRU cache of cleaned datasets.
+
+    Entries are evicted when they are older than ttl_seconds, when more than
+    max_entries are held, or when their combined size exceeds max_bytes
+    (least recently used first).
+    """
+
+    def __init__(self, max_entries: int = 32, max_bytes: int = 512 * 1024 * 1024, ttl_seconds: float = 3600):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: "OrderedDict[str, CachedDataset]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, dataset_id: str) -> Optional[CachedDataset]:
+        """Return a cached dataset, or None if it is missing or expired."""
+        with self._lock:
+            entry = self._entries.get(dataset_id)
+            if entry is not None and self._is_expired(entry):
+                self._remove(dataset_id)
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(dataset_id)
+            self.hits += 1
+            return entry
+
+    def put(self, entry: CachedDataset) -> None:
+        """
+        Insert a dataset and evict whatever no longer fits.
+
+        Raises:
+            DatasetTooLargeError: If the dataset alone exceeds max_bytes; the cache is left intact
+        """
+        if entry.nbytes > self.max_bytes:
+            raise DatasetTooLargeError(
+                f"Dataset needs {entry.nbytes / 2**20:.1f} MB in memory, "
+                f"more than the {self.max_bytes / 2**20:.1f} MB dataset cache limit"
+            )
+        with self._lock:
+            if entry.dataset_id in self._entries:
+                self._remove(entry.dataset_id)
+            self._entries[entry.dataset_id] = entry
+            self._bytes += entry.nbytes
+            self._evict()
+
+    def attach_filter_cube(self, entry: CachedDataset, cube: Any) -> None:
+        """
+        Keep a filter cube built for a cached dataset, counting its memory against max_bytes.
+
+        A cube that would push the dataset past max_bytes is not kept; it is
+        rebuilt for the next query instead of evicting the dataset itself.
+        """
+        with self._lock:
+            if entry.filter_cube is not None or entry.nbytes + cube.nbytes > self.max_bytes:
+                return
+            entry.filter_cube = cube
+            entry.nbytes += cube.nbytes
+            if self._entries.get(entry.dataset_id) is entry:
+                self._bytes += cube.nbytes
+                self._evict()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Counters and current occupancy."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "maxEntries": self.max_entries,
+                "maxBytes": self.max_bytes,
+                "ttlSeconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hitRate": self.hits / lookups if lookups else 0.0,
+            }
+
+    def _is_expired(self, entry: CachedDataset) -> bool:
+        return time.monotonic() - entry.created_at > self.ttl_seconds
+
+    def _remove(self, dataset_id: str) -> None:
+        entry = self._entries.pop(dataset_id)
+        self._bytes -= entry.nbytes
+
+    def _evict(self) -> None:
+        for dataset_id in [key for key, entry in self._entries.items() if self._is_expired(entry)]:
+            self._remove(dataset_id)
+            self.evictions += 1
+        while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+            dataset_id = next(iter(self._entries))
+            self._remove(dataset_id)
+            self.evictions += 1
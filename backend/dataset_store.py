@@ -0,0 +1,82 @@
+import logging
+import os
+import re
+from typing import Optional
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+_DATASET_ID = re.compile(r'^[0-9a-f]{32}$')
+
+class ParquetDatasetStore:
+    """
+    On-disk copy of uploaded datasets, stored as Parquet files named by dataset id.
+
+    Lets dataset handles outlive the in-memory cache: when a cleaned frame has
+    been evicted it is read back from disk instead of asking the client to
+    upload it again.
+    """
+
+    def __init__(self, directory: str, max_bytes: int = 2 * 1024 * 1024 * 1024):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, dataset_id: str) -> Optional[str]:
+        if not _DATASET_ID.match(dataset_id):
+            return None
+        return os.path.join(self.directory, f"{dataset_id}.parquet")
+
+    def save(self, dataset_id: str, df: pd.DataFrame) -> bool:
+        """Write a cleaned DataFrame to disk. Returns False if it could not be stored."""
+        path = self._path(dataset_id)
+        if path is None:
+            return False
+        if os.path.exists(path):
+            os.utime(path)
+            return True
+
+        # Parquet needs one type per column; mixed object columns are stored as text
+        frame = df.copy()
+        for col in frame.columns:
+            if frame[col].dtype == object:
+                frame[col] = frame[col].astype(str)
+
+        try:
+            tmp_path = f"{path}.tmp"
+            frame.to_parquet(tmp_path, index=False)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            logger.warning(f"Could not persist dataset {dataset_id}: {str(e)}")
+            return False
+
+        self._enforce_size_limit()
+        return True
+
+    def load(self, dataset_id: str) -> Optional[pd.DataFrame]:
+        """Read a stored DataFrame back, or None if it is not on disk."""
+        path = self._path(dataset_id)
+        if path is None or not os.path.exists(path):
+            return None
+        try:
+            df = pd.read_parquet(path)
+        except Exception as e:
+            logger.warning(f"Could not read stored dataset {dataset_id}: {str(e)}")
+            return None
+        os.utime(path)
+        return df
+
+    def _enforce_size_limit(self) -> None:
+        """Delete the least recently used files until the directory fits in max_bytes."""
+        files = []
+        for name in os.listdir(self.directory):
+            if name.endswith('.parquet'):
+                stat = os.stat(os.path.join(self.directory, name))
+                files.append((stat.st_mtime, stat.st_size, name))
+        total = sum(size for _, size, _ in files)
+        for _, size, name in sorted(files):
+            if total <= self.max_bytes:
+                break
+            os.remove(os.path.join(self.directory, name))
+            total -= size
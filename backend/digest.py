@@ -0,0 +1,235 @@
+import json
+import math
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+DIGEST_BUDGET_BYTES = 16000   # roughly 4k tokens of digest in the insights prompt
+OUTLIER_ZSCORE = 3.0          # rows with any numeric value this many std devs out are outliers
+MAX_VALUE_CHARS = 80          # longer category values are truncated
+TREND_PERIODS = ('D', 'W', 'M', 'Q', 'Y')
+
+@dataclass(frozen=True)
+class DigestLimits:
+    """How much of each section a digest keeps."""
+    max_columns: int
+    top_k: int
+    correlations: int
+    trend_points: int
+    outliers: int
+
+# Tried in order until the rendered digest fits the byte budget
+DIGEST_LEVELS = (
+    DigestLimits(max_columns=40, top_k=8, correlations=10, trend_points=24, outliers=5),
+    DigestLimits(max_columns=25, top_k=5, correlations=6, trend_points=12, outliers=3),
+    DigestLimits(max_columns=15, top_k=3, correlations=3, trend_points=8, outliers=2),
+    DigestLimits(max_columns=8, top_k=2, correlations=0, trend_points=4, outliers=0),
+)
+
+def _number(value: Any) -> Optional[float]:
+    """Round to 4 significant digits so the digest stays compact."""
+    if value is None or (isinstance(value, float) and not math.isfinite(value)):
+        return None
+    value = float(value)
+    return float(f"{value:.4g}") if math.isfinite(value) else None
+
+def _value(value: Any) -> Any:
+    """JSON-friendly, bounded-length representation of a cell value."""
+    if value is None or (isinstance(value, float) and math.isnan(value)):
+        return None
+    if isinstance(value, (pd.Timestamp, np.datetime64)):
+        return str(pd.Timestamp(value))
+    if isinstance(value, (bool, np.bool_)):
+        return bool(value)
+    if isinstance(value, (int, float, np.integer, np.floating)):
+        return _number(value)
+    text = str(value)
+    return text if len(text) <= MAX_VALUE_CHARS else text[:MAX_VALUE_CHARS] + "..."
+
+def _split_columns(df: pd.DataFrame):
+    numeric, datetime, categorical = [], [], []
+    for col in df.columns:
+        series = df[col]
+        if pd.api.types.is_datetime64_any_dtype(series):
+            datetime.append(col)
+        elif pd.api.types.is_numeric_dtype(series):
+            numeric.append(col)
+        else:
+            categorical.append(col)
+    return numeric, datetime, categorical
+
+class DatasetDigest:
+    """
+    Bounded statistical summary of a cleaned DataFrame for the insights prompt.
+
+    Everything that scans the rows is computed once, vectorized, at the
+    largest limits: per-column summary statistics, top-k category counts,
+    the correlation matrix, z-score outliers and the time index. render()
+    then trims those results to a DigestLimits level, so trying smaller
+    levels until a byte budget is met costs no further passes over the data.
+    """
+
+    def __init__(self, df: pd.DataFrame):
+        limits = DIGEST_LEVELS[0]
+        self.rows = len(df)
+        self.column_count = len(df.columns)
+        self.df = df.iloc[:, :limits.max_columns]
+        self.numeric, self.datetime, self.categorical = _split_columns(self.df)
+        numeric_df = self.df[self.numeric].astype('float64')
+
+        self.numeric_stats = self._numeric_stats(numeric_df)
+        self.top_values = {
+            col: self.df[col].value_counts(dropna=True).head(limits.top_k)
+            for col in self.categorical
+        }
+        self.unique_counts = {col: int(self.df[col].nunique()) for col in self.categorical}
+        self.datetime_ranges = {
+            col: (self.df[col].min(), self.df[col].max()) for col in self.datetime
+        }
+        self.correlations = self._correlations(numeric_df)
+        self.outlier_rows = self._outliers(numeric_df, limits.outliers)
+        self._period_means: Dict[str, pd.DataFrame] = {}
+
+    @staticmethod
+    def _numeric_stats(numeric_df: pd.DataFrame) -> pd.DataFrame:
+        if numeric_df.empty:
+            return pd.DataFrame()
+        return numeric_df.describe(percentiles=[0.25, 0.5, 0.75]).T
+
+    @staticmethod
+    def _correlations(numeric_df: pd.DataFrame) -> List[List[Any]]:
+        """Column pairs ordered by absolute Pearson correlation, strongest first."""
+        if numeric_df.shape[1] < 2:
+            return []
+        corr = numeric_df.corr().to_numpy()
+        i, j = np.triu_indices_from(corr, k=1)
+        values = corr[i, j]
+        keep = np.isfinite(values)
+        i, j, values = i[keep], j[keep], values[keep]
+        order = np.argsort(-np.abs(values))
+        columns = numeric_df.columns
+        return [[columns[i[k]], columns[j[k]], _number(values[k])] for k in order]
+
+    def _outliers(self, numeric_df: pd.DataFrame, limit: int) -> List[Dict[str, Any]]:
+        """Rows whose largest absolute z-score exceeds OUTLIER_ZSCORE, most extreme first."""
+        if numeric_df.empty or not limit:
+            return []
+        std = numeric_df.std().replace(0, np.nan)
+        zscores = ((numeric_df - numeric_df.mean()) / std).abs().max(axis=1, skipna=True)
+        extreme = zscores[zscores > OUTLIER_ZSCORE].nlargest(limit)
+        rows = []
+        for index, zscore in extreme.items():
+            row = {col: _value(v) for col, v in self.df.loc[index].items()}
+            row["zscore"] = _number(zscore)
+            rows.append(row)
+        return rows
+
+    def _trend(self, max_points: int) -> Optional[Dict[str, Any]]:
+        """Numeric means per time period of the first datetime column, at most max_points periods."""
+        if not self.datetime or not self.numeric or not max_points:
+            return None
+        date_col = self.datetime[0]
+        start, end = self.datetime_ranges[date_col]
+        if pd.isna(start) or pd.isna(end):
+            return None
+        span_days = max((end - start).days, 1)
+        period_days = {'D': 1, 'W': 7, 'M': 30.4, 'Q': 91.3, 'Y': 365.25}
+        freq = next((f for f in TREND_PERIODS if span_days / period_days[f] <= max_points), 'Y')
+
+        if freq not in self._period_means:
+            periods = self.df[date_col].dt.to_period(freq)
+            self._period_means[freq] = self.df[self.numeric].groupby(periods).mean()
+        grouped = self._period_means[freq].iloc[-max_points:]
+        points = [
+            {"period": str(period), **{col: _number(v) for col, v in row.items()}}
+            for period, row in zip(grouped.index, grouped.to_dict('records'))
+        ]
+        change = {}
+        if len(grouped) > 1:
+            first, last = grouped.iloc[0], grouped.iloc[-1]
+            for col in self.numeric:
+                if first[col] and np.isfinite(first[col]) and np.isfinite(last[col]):
+                    change[col] = _number((last[col] - first[col]) / abs(first[col]) * 100)
+        return {"dateColumn": date_col, "period": freq, "points": points, "percentChange": change}
+
+    def to_dict(self, limits: DigestLimits) -> Dict[str, Any]:
+        """The digest trimmed to one level of limits."""
+        columns = set(self.df.columns[:limits.max_columns])
+        digest: Dict[str, Any] = {
+            "rows": self.rows,
+            "columns": self.column_count,
+        }
+        if self.column_count > len(columns):
+            digest["omittedColumns"] = self.column_count - len(columns)
+
+        digest["numeric"] = [
+            {
+                "name": col,
+                "mean": _number(stats["mean"]),
+                "std": _number(stats["std"]),
+                "min": _number(stats["min"]),
+                "p25": _number(stats["25%"]),
+                "median": _number(stats["50%"]),
+                "p75": _number(stats["75%"]),
+                "max": _number(stats["max"]),
+            }
+            for col, stats in self.numeric_stats.iterrows() if col in columns
+        ]
+        digest["categorical"] = [
+            {
+                "name": col,
+                "unique": self.unique_counts[col],
+                "top": [
+                    [_value(value), int(count), _number(count / self.rows)]
+                    for value, count in self.top_values[col].head(limits.top_k).items()
+                ],
+            }
+            for col in self.categorical if col in columns
+        ]
+        digest["datetime"] = [
+            {"name": col, "min": _value(start), "max": _value(end)}
+            for col, (start, end) in self.datetime_ranges.items() if col in columns
+        ]
+        digest["correlations"] = [
+            pair for pair in self.correlations if pair[0] in columns and pair[1] in columns
+        ][:limits.correlations]
+        digest["trend"] = self._trend(limits.trend_points)
+        digest["outliers"] = [
+            {k: v for k, v in row.items() if k in columns or k == "zscore"}
+            for row in self.outlier_rows[:limits.outliers]
+        ]
+        return digest
+
+    def render(self, budget_bytes: int = DIGEST_BUDGET_BYTES) -> str:
+        """
+        Render the largest digest level that fits in budget_bytes.
+
+        Returns:
+            One "name: compact JSON" line per section; the smallest level is
+            returned even if it exceeds the budget
+        """
+        text = ""
+        for limits in DIGEST_LEVELS:
+            digest = self.to_dict(limits)
+            text = "\n".join(
+                f"{name}: {json.dumps(value, separators=(',', ':'), default=str)}"
+                for name, value in digest.items() if value not in (None, [])
+            )
+            if len(text.encode()) <= budget_bytes:
+                break
+        return text
+
+def build_digest(df: pd.DataFrame, budget_bytes: int = DIGEST_BUDGET_BYTES) -> str:
+    """
+    Summarize a cleaned DataFrame as a digest whose size does not grow with row count.
+
+    Args:
+        df: Cleaned DataFrame
+        budget_bytes: Target size of the rendered digest
+
+    Returns:
+        Rendered digest text for the insights prompt
+    """
+    return DatasetDigest(df).render(budget_bytes)
@@ -0,0 +1,143 @@
+from typing import List, Optional
+
+import numpy as np
+import pandas as pd
+
+METHODS = ('lttb', 'minmax')
+
+# Default downsampling method per chart type; other chart types are aggregated instead
+CHART_METHODS = {
+    'line': 'lttb',
+    'area': 'minmax',
+    'scatter': 'minmax',
+}
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+    """
+    Largest-Triangle-Three-Buckets selection of n_out points.
+
+    The first and last points are always kept. The points in between are
+    split into n_out - 2 buckets and from each bucket the point forming the
+    largest triangle with the previously selected point and the average of
+    the next bucket is kept, which preserves peaks and troughs.
+
+    Args:
+        x: Sorted x values as floats
+        y: y values as floats, without NaN
+        n_out: Number of points to keep
+
+    Returns:
+        Sorted positions of the selected points
+    """
+    n = len(x)
+    if n_out >= n:
+        return np.arange(n)
+    if n_out < 3:
+        return np.array([0, n - 1][:max(n_out, 1)])
+
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    counts = np.diff(edges)
+    # Average of every bucket, plus the last point standing in for the bucket after the last
+    avg_x = np.append(np.add.reduceat(x[1:n - 1], edges[:-1] - 1) / counts, x[n - 1])
+    avg_y = np.append(np.add.reduceat(y[1:n - 1], edges[:-1] - 1) / counts, y[n - 1])
+
+    selected = np.empty(n_out, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        start, end = edges[i], edges[i + 1]
+        bucket_x, bucket_y = x[start:end], y[start:end]
+        area = np.abs((x[a] - avg_x[i + 1]) * (bucket_y - y[a]) - (x[a] - bucket_x) * (avg_y[i + 1] - y[a]))
+        a = start + int(np.argmax(area))
+        selected[i + 1] = a
+    return selected
+
+def minmax_indices(y: np.ndarray, n_buckets: int) -> np.ndarray:
+    """
+    Positions of the minimum and maximum of y in each of n_buckets equal-width buckets.
+
+    Together with the first and last points this keeps every spike and the
+    overall envelope of the series.
+
+    Args:
+        y: y values as floats, without NaN
+        n_buckets: Number of buckets to split the points into
+
+    Returns:
+        Sorted, unique positions of the selected points
+    """
+    n = len(y)
+    if 2 * n_buckets + 2 >= n:
+        return np.arange(n)
+
+    edges = np.linspace(0, n, n_buckets + 1).astype(np.int64)
+    bucket = np.repeat(np.arange(n_buckets), np.diff(edges))
+    # Sort by bucket, then value: the first and last entry of each bucket are its min and max
+    order = np.lexsort((y, bucket))
+    return np.unique(np.concatenate([[0, n - 1], order[edges[:-1]], order[edges[1:] - 1]]))
+
+def _as_float(series: pd.Series) -> np.ndarray:
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return series.astype('int64').to_numpy(dtype='float64')
+    return pd.to_numeric(series, errors='coerce').to_numpy(dtype='float64')
+
+def downsample(df: pd.DataFrame, x: Optional[str], y: List[str], max_points: int, method: str = 'lttb') -> pd.DataFrame:
+    """
+    Reduce a series to at most max_points rows while keeping its visual shape.
+
+    Rows are ordered by x when it is numeric or a date and kept in their
+    original order otherwise (or when x is None). Rows with a missing x or
+    first y value are dropped. LTTB selects points by the first y column;
+    min/max keeps the extremes of the y columns, splitting the point budget
+    between them. Each column needs two points of the budget, so with more
+    than (max_points - 2) // 2 columns only the first ones are used.
+
+    Args:
+        df: Input DataFrame
+        x: Column for the horizontal axis, or None to use row order
+        y: Numeric columns plotted against x
+        max_points: Maximum number of rows to return
+        method: 'lttb' or 'minmax'
+
+    Returns:
+        The selected rows with all columns, in x order
+    """
+    if method not in METHODS:
+        raise ValueError(f"Unknown downsampling method '{method}'. Supported: {', '.join(METHODS)}")
+    if not y:
+        raise ValueError("Downsampling needs at least one numeric y column")
+    missing = [col for col in ([x] if x else []) + list(y) if col not in df.columns]
+    if missing:
+        raise ValueError(f"Unknown columns: {missing}")
+
+    values = {col: _as_float(df[col]) for col in y}
+    if all(np.isnan(v).all() for v in values.values()):
+        raise ValueError(f"Columns {list(y)} have no numeric values")
+
+    sortable_x = x is not None and (
+        pd.api.types.is_numeric_dtype(df[x]) or pd.api.types.is_datetime64_any_dtype(df[x])
+    )
+    if sortable_x:
+        x_values = _as_float(df[x])
+        keep = ~np.isnan(x_values) & ~np.isnan(values[y[0]])
+        order = np.flatnonzero(keep)[np.argsort(x_values[keep], kind='stable')]
+        x_values = x_values[order]
+    else:
+        order = np.flatnonzero(~np.isnan(values[y[0]]))
+        x_values = np.arange(len(order), dtype='float64')
+
+    if len(order) <= max_points:
+        positions = np.arange(len(order))
+    elif method == 'lttb':
+        positions = lttb_indices(x_values, values[y[0]][order], max_points)
+    else:
+        columns = y[:max(1, (max_points - 2) // 2)]
+        n_buckets = max(1, (max_points - 2) // (2 * len(columns)))
+        positions = np.unique(np.concatenate([
+            minmax_indices(np.nan_to_num(values[col][order], nan=np.nanmean(values[col])), n_buckets)
+            for col in columns
+        ]))
+        if len(positions) > max_points:
+            # Only possible for max_points < 4; thin evenly, keeping the first and last point
+            positions = positions[np.linspace(0, len(positions) - 1, max_points).astype(np.int64)]
+    return df.iloc[order[positions]].reset_index(drop=True)
@@ -0,0 +1,262 @@
+import logging
+from typing import Any, Dict, List, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+from chart_series import (
+    SERIES_MAX_POINTS,
+    attach_chart_series,
+    bar_from_sums,
+    pie_from_totals,
+    radar_from_means,
+    trend_from_means,
+    trend_keys,
+)
+from downsample import CHART_METHODS
+
+logger = logging.getLogger(__name__)
+
+MAX_FILTER_VALUES = 20      # columns with at most this many values become filter dimensions
+MAX_PARTIAL_RATIO = 0.5     # partials are only kept if they have at most this share of the rows
+STATS = ('sum', 'count', 'min', 'max')
+
+Filters = Dict[str, Union[str, List[str]]]
+
+def raw_form(value: Any) -> str:
+    """A cleaned value as the dashboard lists it: JavaScript's String() of the uploaded JSON value."""
+    if isinstance(value, (bool, np.bool_)):
+        return "true" if value else "false"
+    if isinstance(value, (float, np.floating)) and float(value).is_integer():
+        return str(int(value))
+    return str(value)
+
+def column_mask(series: pd.Series, values: List[str]) -> np.ndarray:
+    """
+    Which entries of a cleaned column equal one of the filter values.
+
+    Values match the cleaned value as a string or its raw form, so the
+    dashboard can filter by the values it read from the upload: numbers by
+    value ("1" matches 1.0) and booleans as "true" and "false".
+    """
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        matched = column_mask(pd.Series(series.cat.categories), values)
+        # Missing values have code -1, which picks the appended False
+        return np.append(matched, False)[series.cat.codes.to_numpy()]
+    mask = series.astype(str).isin(values).to_numpy()
+    if pd.api.types.is_bool_dtype(series) or series.dtype == object:
+        mask = mask | series.map(raw_form).isin(values).to_numpy()
+    elif pd.api.types.is_numeric_dtype(series):
+        mask = mask | series.isin(pd.to_numeric(pd.Series(values), errors='coerce').dropna()).to_numpy()
+    return mask
+
+class FilterCube:
+    """
+    Group-level partial aggregates of a cleaned dataset for answering dashboard filters.
+
+    The rows are grouped once by every low-cardinality categorical column
+    (the dashboard's filter dimensions) plus the time buckets of the first
+    date column, keeping the row count and the sum, count, min and max of
+    every numeric column per group. A filter then selects groups instead of
+    rows, and pie, bar, radar, line and area series keyed on a dimension are
+    re-aggregated from the selected partials. When the time buckets would
+    leave too little to aggregate, the groups are built from the categorical
+    columns alone and only the trend charts go to the rows. Anything the
+    partials cannot answer falls back to filtering the rows.
+    """
+
+    def __init__(self, df: pd.DataFrame):
+        self.df = df
+        self.measures = [
+            col for col in df.columns
+            if pd.api.types.is_numeric_dtype(df[col]) and not pd.api.types.is_bool_dtype(df[col])
+        ]
+        self.dims = [
+            col for col in df.columns
+            if col not in self.measures
+            and not pd.api.types.is_datetime64_any_dtype(df[col])
+            and df[col].nunique() <= MAX_FILTER_VALUES
+        ]
+        date_cols = [col for col in df.columns if pd.api.types.is_datetime64_any_dtype(df[col])]
+        self.date_dim = date_cols[0] if date_cols else None
+        self.date_periods = False
+        self.keys: Optional[pd.DataFrame] = None
+        self.partials: Optional[Dict[str, pd.DataFrame]] = None
+        self.rows: Optional[np.ndarray] = None
+
+        if not self.measures:
+            return
+        grouped = stats = None
+        if self.date_dim:
+            self.date_periods = df[self.date_dim].nunique() > SERIES_MAX_POINTS
+            grouped, stats = self._group([df[col] for col in self.dims] + [trend_keys(df[self.date_dim]).rename(self.date_dim)])
+            if stats is None:
+                self.date_dim = None
+        if stats is None and self.dims:
+            grouped, stats = self._group([df[col] for col in self.dims])
+        if stats is None:
+            return
+        self.rows = grouped.size().to_numpy()
+        self.keys = stats.index.to_frame(index=False)
+        # One frame of measure columns per statistic; flat columns keep selection cheap
+        self.partials = {stat: stats.xs(stat, axis=1, level=1).reset_index(drop=True) for stat in STATS}
+        logger.info(f"Built filter partials: {len(stats)} groups over {self.dims + [self.date_dim or '']}")
+
+    def _group(self, group_keys: List[pd.Series]):
+        """The groupby over group_keys and its statistics, or (None, None) when there are too many groups."""
+        grouped = self.df[self.measures].groupby(group_keys, observed=True, dropna=False)
+        stats = grouped.agg(list(STATS))
+        if len(stats) > len(self.df) * MAX_PARTIAL_RATIO:
+            logger.info(f"Skipping filter partials by {[key.name for key in group_keys]}: {len(stats)} groups for {len(self.df)} rows")
+            return None, None
+        return grouped, stats
+
+    @property
+    def available(self) -> bool:
+        return self.partials is not None
+
+    @property
+    def nbytes(self) -> int:
+        """Memory held by the partials; the dataset's rows are shared and not counted."""
+        if not self.available:
+            return 0
+        frames = [self.keys] + list(self.partials.values())
+        return int(sum(frame.memory_usage(deep=True).sum() for frame in frames)) + self.rows.nbytes
+
+    def can_filter(self, filters: Dict[str, List[str]]) -> bool:
+        return self.available and all(col in self.dims for col in filters)
+
+    def group_mask(self, filters: Dict[str, List[str]]) -> np.ndarray:
+        """Which partial groups match every filter."""
+        mask = np.ones(len(self.keys), dtype=bool)
+        for col, values in filters.items():
+            mask &= column_mask(self.keys[col], values)
+        return mask
+
+    def row_mask(self, filters: Dict[str, List[str]]) -> np.ndarray:
+        """Which rows of the dataset match every filter."""
+        mask = np.ones(len(self.df), dtype=bool)
+        for col, values in filters.items():
+            mask &= column_mask(self.df[col], values)
+        return mask
+
+    def series(self, suggestion: Dict[str, Any], mask: np.ndarray) -> Optional[Dict[str, Any]]:
+        """
+        A suggestion's chart series from the partials of the selected groups.
+
+        Returns:
+            Series in the same shape build_chart_series gives, or None when the
+            chart is not keyed on a dimension over numeric columns
+        """
+        if not isinstance(suggestion, dict):
+            return None
+        chart_type = suggestion.get("chartType")
+        y = suggestion.get("yAxis") or []
+        y = [y] if isinstance(y, str) else list(y)
+        keys = self.keys[mask]
+
+        def grouped(key: Any, columns: List[Any], stat: str) -> Optional[pd.DataFrame]:
+            if key not in keys.columns or not columns or not all(col in self.measures for col in columns):
+                return None
+            return self.partials[stat].loc[mask, columns].groupby(keys[key], observed=True).sum()
+
+        def means(key: Any, columns: List[Any]) -> Optional[pd.DataFrame]:
+            sums, counts = grouped(key, columns, 'sum'), grouped(key, columns, 'count')
+            return None if sums is None else sums / counts
+
+        if chart_type == "pie":
+            totals = grouped(suggestion.get("nameKey"), [suggestion.get("valueKey")], 'sum')
+            if totals is not None:
+                return pie_from_totals(suggestion["nameKey"], suggestion["valueKey"], totals.iloc[:, 0])
+        elif chart_type == "radar":
+            result = means(suggestion.get("categoryKey"), y)
+            if result is not None:
+                return radar_from_means(result, y)
+        elif chart_type == "bar" and suggestion.get("xAxis") in self.dims:
+            sums = grouped(suggestion["xAxis"], y, 'sum')
+            if sums is not None:
+                return bar_from_sums(sums, y)
+        elif chart_type in ("line", "area") and suggestion.get("xAxis") == self.date_dim:
+            result = means(self.date_dim, y)
+            if result is not None:
+                return trend_from_means(result, self.date_dim, y, CHART_METHODS[chart_type], periods=self.date_periods)
+        return None
+
+    def column_stats(self, mask: np.ndarray) -> Dict[str, Dict[str, Any]]:
+        """Sum, count, min and max of every numeric column over the selected groups."""
+        selected = {stat: frame[mask] for stat, frame in self.partials.items()}
+        result = {}
+        for col in self.measures:
+            # Reduced per column: a frame-wide reduction upcasts integers to float when any measure is float
+            count = int(selected['count'][col].sum())
+            result[col] = {
+                "sum": _scalar(selected['sum'][col].sum()),
+                "count": count,
+                "min": _scalar(selected['min'][col].min()) if count else None,
+                "max": _scalar(selected['max'][col].max()) if count else None,
+            }
+        return result
+
+def _scalar(value: Any) -> Any:
+    value = value.item() if isinstance(value, np.generic) else value
+    return None if isinstance(value, float) and np.isnan(value) else value
+
+def rows_column_stats(df: pd.DataFrame, measures: List[str]) -> Dict[str, Dict[str, Any]]:
+    """column_stats computed directly from rows."""
+    return {
+        col: {
+            "sum": _scalar(df[col].sum()),
+            "count": int(df[col].count()),
+            "min": _scalar(df[col].min()) if df[col].count() else None,
+            "max": _scalar(df[col].max()) if df[col].count() else None,
+        }
+        for col in measures
+    }
+
+def normalize_filters(filters: Filters) -> Dict[str, List[str]]:
+    """Accept a single value or a list of values per column, compared as strings (see column_mask)."""
+    return {
+        col: [str(v) for v in (values if isinstance(values, list) else [values])]
+        for col, values in filters.items()
+    }
+
+def query_filtered(cube: FilterCube, filters: Filters, suggestions: List[Any]) -> Dict[str, Any]:
+    """
+    Answer a dashboard filter from the partials where possible, otherwise from the rows.
+
+    Args:
+        cube: Partials of the cleaned dataset
+        filters: Column -> value or list of values to keep
+        suggestions: Chart configurations to compute series for
+
+    Returns:
+        Dict with the matching row count, per-column statistics, the
+        suggestions with their series and whether the partials ("partials"),
+        the rows ("rows") or both ("mixed") answered the query
+    """
+    filters = normalize_filters(filters)
+    unknown = [col for col in filters if col not in cube.df.columns]
+    if unknown:
+        raise ValueError(f"Unknown filter columns: {unknown}")
+
+    use_partials = cube.can_filter(filters)
+    answered: List[Any] = [None] * len(suggestions)
+    if use_partials:
+        mask = cube.group_mask(filters)
+        result = {"rowCount": int(cube.rows[mask].sum()), "columnStats": cube.column_stats(mask)}
+        for i, suggestion in enumerate(suggestions):
+            series = cube.series(suggestion, mask)
+            if series is not None:
+                answered[i] = {**suggestion, **series}
+
+    pending = [i for i, suggestion in enumerate(answered) if suggestion is None]
+    if not use_partials or pending:
+        filtered = cube.df[cube.row_mask(filters)]
+        if not use_partials:
+            result = {"rowCount": len(filtered), "columnStats": rows_column_stats(filtered, cube.measures)}
+        for i, suggestion in zip(pending, attach_chart_series(filtered, [suggestions[i] for i in pending])):
+            answered[i] = suggestion
+
+    result["suggestions"] = answered
+    result["source"] = "rows" if not use_partials else "mixed" if pending else "partials"
+    return result
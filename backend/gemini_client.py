@@ -0,0 +1,115 @@
+import asyncio
+import hashlib
+import logging
+import random
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+class GeminiError(Exception):
+    """Raised when the model gives no usable response after every retry."""
+
+class GeminiClient:
+    """
+    Shared asynchronous client for Gemini text generation.
+
+    One model object is reused for every call. Upstream calls are limited to
+    max_concurrency at a time, failed attempts are retried with exponential
+    backoff and full jitter, and identical prompts that are already in flight
+    share a single upstream call (single-flight).
+
+    Args:
+        model_factory: Returns an object with an async generate_content_async(prompt)
+            method whose result has a .text attribute
+        max_concurrency: Maximum simultaneous upstream calls
+        base_delay: Backoff base in seconds; attempt n waits up to base_delay * 2**n
+        max_delay: Upper bound for a single backoff wait in seconds
+        timeout: Seconds before a single attempt is abandoned
+    """
+
+    def __init__(self, model_factory: Callable[[], Any], max_concurrency: int = 8,
+                 base_delay: float = 0.5, max_delay: float = 8.0, timeout: float = 120.0):
+        self.model_factory = model_factory
+        self.max_concurrency = max_concurrency
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.timeout = timeout
+        self.calls = 0
+        self.coalesced = 0
+        self.retries = 0
+        self.failures = 0
+        self._model = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._in_flight: Dict[str, asyncio.Future] = {}
+
+    def _get_model(self):
+        if self._model is None:
+            self._model = self.model_factory()
+        return self._model
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._semaphore
+
+    async def generate(self, prompt: str, max_retries: int = 2) -> str:
+        """
+        Generate text for a prompt, joining an identical in-flight request if there is one.
+
+        Args:
+            prompt: Full prompt text
+            max_retries: Retries after the first failed attempt
+
+        Returns:
+            Stripped response text
+
+        Raises:
+            GeminiError: If every attempt failed or returned an empty response
+        """
+        key = hashlib.sha256(prompt.encode()).hexdigest()
+        shared = self._in_flight.get(key)
+        if shared is not None:
+            self.coalesced += 1
+            return await asyncio.shield(shared)
+
+        task = asyncio.ensure_future(self._generate_with_retries(prompt, max_retries))
+        self._in_flight[key] = task
+        task.add_done_callback(lambda _: self._in_flight.pop(key, None))
+        # Shield so one caller disconnecting does not cancel the call for the others
+        return await asyncio.shield(task)
+
+    async def _generate_with_retries(self, prompt: str, max_retries: int) -> str:
+        for attempt in range(max_retries + 1):
+            try:
+                async with self._get_semaphore():
+                    self.calls += 1
+                    logger.info(f"Calling Gemini API (attempt {attempt + 1}/{max_retries + 1})")
+                    response = await asyncio.wait_for(
+                        self._get_model().generate_content_async(prompt),
+                        timeout=self.timeout
+                    )
+                if response.text:
+                    return response.text.strip()
+                raise GeminiError("Empty response from Gemini API")
+
+            except Exception as e:
+                logger.error(f"Gemini API call failed (attempt {attempt + 1}): {str(e)}")
+                if attempt == max_retries:
+                    self.failures += 1
+                    raise GeminiError(
+                        f"Failed to get response from AI service after {max_retries + 1} attempts: {str(e)}"
+                    ) from e
+                self.retries += 1
+                await asyncio.sleep(random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt)))
+
+        raise GeminiError("Unexpected error in AI service call")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "maxConcurrency": self.max_concurrency,
+            "inFlight": len(self._in_flight),
+            "calls": self.calls,
+            "coalesced": self.coalesced,
+            "retries": self.retries,
+            "failures": self.failures,
+        }
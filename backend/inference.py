@@ -0,0 +1,378 @@
+import hashlib
+import json
+import threading
+import warnings
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+try:
+    from pandas.tseries.api import guess_datetime_format
+except ImportError:  # pandas < 2.2
+    from pandas._libs.tslibs.parsing import guess_datetime_format
+
+# Thresholds used by the cleaning pipeline
+MISSING_NUMERIC_RATIO = 0.7   # share of non-null values that must parse as numbers to impute with the mean
+NUMERIC_RATIO = 0.9           # share of all values that must parse as numbers to coerce to numeric
+DATETIME_RATIO = 0.7          # share of all values that must parse as dates to coerce to datetime
+CATEGORY_UNIQUE_RATIO = 0.1   # maximum unique/rows ratio for a categorical column
+CATEGORY_MAX_UNIQUE = 50      # maximum unique values for a categorical column
+
+# Datetime detection settings
+DATETIME_SAMPLE_SIZE = 200    # non-null values inspected before committing to a format
+DATETIME_GUESS_VALUES = 5     # sample values handed to pandas' format guesser
+DATETIME_FORMATS = [
+    '%Y-%m-%d',
+    '%Y-%m-%d %H:%M:%S',
+    '%Y-%m-%d %H:%M',
+    '%Y-%m-%dT%H:%M:%S',
+    '%Y/%m/%d',
+    '%m/%d/%Y',
+    '%d/%m/%Y',
+    '%m/%d/%Y %H:%M',
+    '%d/%m/%Y %H:%M',
+    '%m-%d-%Y',
+    '%d-%m-%Y',
+    '%d.%m.%Y',
+    '%Y-%m',
+    '%b %d, %Y',
+    '%d %b %Y',
+    '%B %d, %Y',
+    '%d %B %Y',
+    'ISO8601',
+]
+
+@dataclass
+class ColumnProfile:
+    """Everything the cleaning pipeline needs to know about a single column."""
+    name: str
+    kind: str                       # numeric, integer, datetime, categorical or text
+    null_count: int
+    numeric_count: int
+    unique_count: int
+    fill_strategy: Optional[str] = None   # mean, mode, constant or None when nothing is missing
+    fill_value: Any = None
+    datetime_format: Optional[str] = None
+
+def parse_numeric(series: pd.Series) -> pd.Series:
+    """Parse a column as numbers, skipping the work when it already has a numeric dtype."""
+    if pd.api.types.is_datetime64_any_dtype(series):
+        # Typed dates (e.g. from Arrow or Parquet uploads) are never numbers
+        return pd.Series(np.nan, index=series.index)
+    if pd.api.types.is_bool_dtype(series):
+        return series.astype(float)
+    if pd.api.types.is_numeric_dtype(series):
+        return series
+    return pd.to_numeric(series, errors='coerce')
+
+class DatetimeFormatCache:
+    """
+    Thread-safe LRU cache of detected datetime formats.
+
+    Entries are keyed by schema fingerprint and column name, so repeat uploads
+    of the same report shape skip detection. The fingerprint only covers names
+    and raw dtypes, so callers check a cached format against the new values
+    before trusting it. Only detected formats are stored, never "no dates".
+    """
+
+    def __init__(self, max_entries: int = 4096):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple[str, str], Optional[str]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def lookup(self, fingerprint: str, column: str) -> Tuple[bool, Optional[str]]:
+        """Return (found, format) for a column of a schema."""
+        key = (fingerprint, column)
+        with self._lock:
+            if key not in self._entries:
+                return False, None
+            self._entries.move_to_end(key)
+            return True, self._entries[key]
+
+    def store(self, fingerprint: str, column: str, fmt: Optional[str]) -> None:
+        """Remember the detected format for a column of a schema."""
+        with self._lock:
+            self._entries[(fingerprint, column)] = fmt
+            self._entries.move_to_end((fingerprint, column))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def discard(self, fingerprint: str, column: str) -> None:
+        """Forget the format of a column whose values no longer match it."""
+        with self._lock:
+            self._entries.pop((fingerprint, column), None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+datetime_format_cache = DatetimeFormatCache()
+
+def schema_fingerprint(df: pd.DataFrame) -> str:
+    """Hash the column names and raw dtypes of a DataFrame."""
+    schema = [[str(col), str(dtype)] for col, dtype in df.dtypes.items()]
+    return hashlib.sha1(json.dumps(schema).encode()).hexdigest()
+
+def _datetime_sample(series: pd.Series) -> pd.Series:
+    """Pick an evenly spaced sample of the non-null values of a column."""
+    values = series.dropna()
+    if len(values) > DATETIME_SAMPLE_SIZE:
+        positions = np.linspace(0, len(values) - 1, DATETIME_SAMPLE_SIZE).astype(int)
+        values = values.iloc[positions]
+    return values
+
+def detect_datetime_format(series: pd.Series) -> Optional[str]:
+    """
+    Detect an explicit datetime format from a bounded sample of a column.
+
+    Formats guessed by pandas from the first sample values are tried before
+    the common formats in DATETIME_FORMATS. The format that parses the most
+    sample values wins.
+
+    Args:
+        series: Raw column values
+
+    Returns:
+        A format accepted by pd.to_datetime, or None if the sample does not
+        look like dates
+    """
+    sample = _datetime_sample(series)
+    strings = sample[sample.map(lambda value: isinstance(value, str))]
+    if strings.empty or len(strings) / len(sample) <= DATETIME_RATIO:
+        return None
+
+    candidates: List[str] = []
+    for value in strings.head(DATETIME_GUESS_VALUES):
+        with warnings.catch_warnings():
+            # The guesser warns about day-first formats; the sample decides instead
+            warnings.simplefilter('ignore')
+            guessed = guess_datetime_format(value)
+        if guessed and guessed not in candidates:
+            candidates.append(guessed)
+    candidates.extend(fmt for fmt in DATETIME_FORMATS if fmt not in candidates)
+
+    best_format, best_count = None, 0
+    for fmt in candidates:
+        parsed_count = int(parse_datetime(sample, fmt).notna().sum())
+        if parsed_count > best_count:
+            best_format, best_count = fmt, parsed_count
+            if parsed_count == len(sample):
+                break
+
+    if best_count / len(sample) > DATETIME_RATIO:
+        return best_format
+    return None
+
+def parse_datetime(series: pd.Series, fmt: Optional[str]) -> pd.Series:
+    """Parse a column with a fixed datetime format, returning all-NaT when there is none."""
+    if fmt is None:
+        return pd.Series(pd.NaT, index=series.index, dtype='datetime64[ns]')
+    try:
+        return pd.to_datetime(series, format=fmt, errors='coerce')
+    except (TypeError, ValueError, OverflowError):
+        return pd.Series(pd.NaT, index=series.index, dtype='datetime64[ns]')
+
+def _format_fits(series: pd.Series, fmt: str) -> bool:
+    """Whether more than DATETIME_RATIO of a column's sample parses with fmt."""
+    sample = _datetime_sample(series)
+    if sample.empty:
+        return False
+    return parse_datetime(sample, fmt).notna().sum() / len(sample) > DATETIME_RATIO
+
+def _resolve_datetime_format(series: pd.Series, fingerprint: Optional[str]) -> Optional[str]:
+    """
+    Look up the datetime format for a column, detecting and caching it on a miss.
+
+    A cached format is only reused when the column's sample still parses with
+    it; otherwise the format is detected again and the cache entry replaced.
+    Columns without dates are not cached, so one upload whose date column is
+    empty or unparseable does not turn detection off for the schema.
+    """
+    column = str(series.name)
+    if fingerprint is not None:
+        found, fmt = datetime_format_cache.lookup(fingerprint, column)
+        if found and _format_fits(series, fmt):
+            return fmt
+    fmt = detect_datetime_format(series)
+    if fingerprint is not None:
+        if fmt is not None:
+            datetime_format_cache.store(fingerprint, column, fmt)
+        else:
+            datetime_format_cache.discard(fingerprint, column)
+    return fmt
+
+def _is_whole(values: pd.Series) -> bool:
+    """Check whether a fully populated numeric column holds only whole numbers."""
+    array = values.to_numpy(dtype=float, na_value=np.nan)
+    if not np.isfinite(array).all():
+        return False
+    return bool((np.mod(array, 1) == 0).all())
+
+def _fill_numeric(numeric: pd.Series, null_mask: pd.Series, fill_strategy: Optional[str], fill_value: Any) -> pd.Series:
+    """Impute a parsed numeric column the same way the raw column would be imputed."""
+    if fill_strategy == 'mean':
+        # Mean imputation also replaces values that failed to parse
+        return numeric.fillna(fill_value)
+    if fill_strategy == 'mode':
+        fill_number = pd.to_numeric(pd.Series([fill_value]), errors='coerce').iloc[0]
+        return numeric.mask(null_mask, fill_number)
+    return numeric
+
+def _infer_column(series: pd.Series, fingerprint: Optional[str] = None) -> Tuple[ColumnProfile, Optional[pd.Series]]:
+    """
+    Profile a column in a single pass.
+
+    Numbers are parsed once and the result is reused for imputation, type
+    coercion and the integer check. Datetime parsing is only attempted for
+    columns that did not qualify as numeric, and only with a format detected
+    from a sample (or cached for the schema).
+
+    Args:
+        series: Raw column values
+        fingerprint: Schema fingerprint used to cache the datetime format
+
+    Returns:
+        Tuple of the column profile and the already imputed numeric or
+        datetime values (None for categorical and text columns)
+    """
+    n = len(series)
+    null_mask = series.isna()
+    null_count = int(null_mask.sum())
+    non_null_count = n - null_count
+
+    numeric = parse_numeric(series)
+    numeric_count = int(numeric.notna().sum())
+    unique_count = int(series.nunique())
+
+    fill_strategy = None
+    fill_value = None
+    fill_is_numeric = False
+    if null_count > 0:
+        if non_null_count and numeric_count / non_null_count > MISSING_NUMERIC_RATIO:
+            fill_strategy = 'mean'
+            fill_value = numeric.mean()
+        else:
+            mode_value = series.mode()
+            if not mode_value.empty:
+                fill_strategy = 'mode'
+                fill_value = mode_value.iloc[0]
+                fill_is_numeric = bool(numeric[series == fill_value].notna().any())
+            else:
+                fill_strategy = 'constant'
+                fill_value = "Unknown"
+
+    def make_profile(kind: str, datetime_format: Optional[str] = None) -> ColumnProfile:
+        return ColumnProfile(
+            name=series.name,
+            kind=kind,
+            null_count=null_count,
+            numeric_count=numeric_count,
+            unique_count=unique_count,
+            fill_strategy=fill_strategy,
+            fill_value=fill_value,
+            datetime_format=datetime_format,
+        )
+
+    # Count parseable values as they will be after imputation
+    if fill_strategy == 'mean':
+        numeric_after_fill = n
+    else:
+        numeric_after_fill = numeric_count + (null_count if fill_is_numeric else 0)
+
+    if n and numeric_after_fill / n > NUMERIC_RATIO:
+        values = _fill_numeric(numeric, null_mask, fill_strategy, fill_value)
+        if numeric_after_fill == n and _is_whole(values):
+            return make_profile('integer'), values.astype(int)
+        return make_profile('numeric'), values
+
+    if pd.api.types.is_datetime64_any_dtype(series):
+        datetime_format, datetimes = None, series
+    else:
+        datetime_format = _resolve_datetime_format(series, fingerprint)
+        datetimes = parse_datetime(series, datetime_format)
+    datetime_count = int(datetimes.notna().sum())
+    if fill_strategy == 'mode':
+        fill_datetime = datetimes[series == fill_value].dropna()
+        if not fill_datetime.empty:
+            datetime_count += null_count
+            datetimes = datetimes.mask(null_mask, fill_datetime.iloc[0])
+    if n and datetime_count / n > DATETIME_RATIO:
+        return make_profile('datetime', datetime_format), datetimes
+
+    if n and unique_count / n < CATEGORY_UNIQUE_RATIO and unique_count < CATEGORY_MAX_UNIQUE:
+        return make_profile('categorical'), None
+    return make_profile('text'), None
+
+def profile_column(series: pd.Series, fingerprint: Optional[str] = None) -> ColumnProfile:
+    """Profile a single column without keeping its parsed values."""
+    return _infer_column(series, fingerprint)[0]
+
+def profile_columns(df: pd.DataFrame) -> Dict[str, ColumnProfile]:
+    """Profile every column of a DataFrame."""
+    fingerprint = schema_fingerprint(df)
+    return {col: profile_column(df[col], fingerprint) for col in df.columns}
+
+def _fill_other(series: pd.Series, profile: ColumnProfile) -> pd.Series:
+    """Impute and coerce a categorical or text column."""
+    if profile.fill_strategy is not None:
+        series = series.fillna(profile.fill_value)
+    if profile.kind == 'categorical':
+        return series.astype('category')
+    return series
+
+def clean_dataframe(df: pd.DataFrame) -> Tuple[pd.DataFrame, Dict[str, ColumnProfile]]:
+    """
+    Profile, impute and coerce every column, parsing each column only once.
+
+    Args:
+        df: Raw DataFrame
+
+    Returns:
+        Tuple of the cleaned DataFrame and the column profiles
+    """
+    fingerprint = schema_fingerprint(df)
+    profiles = {}
+    cleaned = {}
+    for col in df.columns:
+        profile, values = _infer_column(df[col], fingerprint)
+        profiles[col] = profile
+        cleaned[col] = values if values is not None else _fill_other(df[col], profile)
+    return pd.DataFrame(cleaned, index=df.index), profiles
+
+def apply_profiles(df: pd.DataFrame, profiles: Dict[str, ColumnProfile]) -> pd.DataFrame:
+    """
+    Impute and coerce every column according to a previously computed profile.
+
+    Args:
+        df: Raw DataFrame the profiles were computed from
+        profiles: Column profiles from profile_columns
+
+    Returns:
+        New DataFrame with missing values filled and types coerced
+    """
+    cleaned = {}
+    for col in df.columns:
+        profile = profiles[col]
+        series = df[col]
+        null_mask = series.isna()
+
+        if profile.kind in ('numeric', 'integer'):
+            values = _fill_numeric(parse_numeric(series), null_mask, profile.fill_strategy, profile.fill_value)
+            if profile.kind == 'integer':
+                values = values.astype(int)
+            cleaned[col] = values
+            continue
+
+        if profile.kind == 'datetime':
+            if profile.fill_strategy is not None:
+                series = series.fillna(profile.fill_value)
+            if not pd.api.types.is_datetime64_any_dtype(series):
+                series = parse_datetime(series, profile.datetime_format)
+            cleaned[col] = series
+        else:
+            cleaned[col] = _fill_other(series, profile)
+
+    return pd.DataFrame(cleaned, index=df.index)
@@ -0,0 +1,164 @@
+import hashlib
+import io
+import json
+from typing import Callable, Dict, Iterator, Union
+
+import pandas as pd
+
+# Content types accepted by the raw upload endpoint
+CSV_TYPES = ('text/csv', 'application/csv')
+JSON_TYPES = ('application/json',)
+ARROW_STREAM_TYPES = ('application/vnd.apache.arrow.stream',)
+ARROW_FILE_TYPES = ('application/vnd.apache.arrow.file',)
+PARQUET_TYPES = ('application/vnd.apache.parquet', 'application/x-parquet')
+
+# An upload body in memory, or the path of the file a large body was spooled to
+Source = Union[bytes, str]
+
+class UnsupportedFormatError(ValueError):
+    """Raised when an upload's content type has no reader."""
+
+def body_digest(content_type: str):
+    """Incremental hash of an upload body; feed it the body with update() as it arrives."""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(content_type.encode())
+    return digest
+
+def _file_like(source: Source):
+    """What pandas readers take: a buffer over the bytes, or the path itself."""
+    return io.BytesIO(source) if isinstance(source, bytes) else source
+
+def _arrow_input(source: Source):
+    """Arrow input over the bytes, or a memory map of the spooled file (paged in by the OS, not copied)."""
+    import pyarrow as pa
+    return pa.BufferReader(source) if isinstance(source, bytes) else pa.memory_map(source)
+
+def read_csv(body: Source) -> pd.DataFrame:
+    """Parse CSV text straight into a DataFrame."""
+    return pd.read_csv(_file_like(body))
+
+def read_columnar_json(body: Source) -> pd.DataFrame:
+    """Parse a column-oriented JSON object ({column: [values]}) into a DataFrame."""
+    if not isinstance(body, bytes):
+        with open(body, 'rb') as f:
+            body = f.read()
+    columns = json.loads(body)
+    if not isinstance(columns, dict) or not all(isinstance(values, list) for values in columns.values()):
+        raise ValueError("Expected a JSON object mapping column names to arrays of values")
+    lengths = {len(values) for values in columns.values()}
+    if len(lengths) > 1:
+        raise ValueError("All columns must have the same number of values")
+    return pd.DataFrame(columns)
+
+def read_arrow_stream(body: Source) -> pd.DataFrame:
+    """Parse an Arrow IPC stream into a DataFrame."""
+    import pyarrow as pa
+    return pa.ipc.open_stream(_arrow_input(body)).read_all().to_pandas()
+
+def read_arrow_file(body: Source) -> pd.DataFrame:
+    """Parse an Arrow IPC file into a DataFrame."""
+    import pyarrow as pa
+    return pa.ipc.open_file(_arrow_input(body)).read_all().to_pandas()
+
+def read_parquet(body: Source) -> pd.DataFrame:
+    """Parse a Parquet file into a DataFrame."""
+    return pd.read_parquet(_file_like(body))
+
+READERS: Dict[str, Callable[[Source], pd.DataFrame]] = {}
+for _types, _reader in (
+    (CSV_TYPES, read_csv),
+    (JSON_TYPES, read_columnar_json),
+    (ARROW_STREAM_TYPES, read_arrow_stream),
+    (ARROW_FILE_TYPES, read_arrow_file),
+    (PARQUET_TYPES, read_parquet),
+):
+    for _content_type in _types:
+        READERS[_content_type] = _reader
+
+def read_upload(body: Source, content_type: str) -> pd.DataFrame:
+    """
+    Parse a raw upload body into a DataFrame using the reader for its content type.
+
+    Args:
+        body: Raw request body, or the path of the file it was spooled to
+        content_type: Content-Type header value (parameters such as charset are ignored)
+
+    Returns:
+        DataFrame built column-wise by the matching pandas/pyarrow reader
+    """
+    media_type = content_type.split(';')[0].strip().lower()
+    reader = READERS.get(media_type)
+    if reader is None:
+        supported = ', '.join(sorted(READERS))
+        raise UnsupportedFormatError(f"Unsupported content type '{media_type}'. Supported: {supported}")
+    return reader(body)
+
+def _iter_arrow_batches(reader, chunk_rows: int) -> Iterator[pd.DataFrame]:
+    """Regroup Arrow record batches into DataFrames of about chunk_rows rows."""
+    import pyarrow as pa
+    pending, pending_rows = [], 0
+    for batch in reader:
+        pending.append(batch)
+        pending_rows += batch.num_rows
+        if pending_rows >= chunk_rows:
+            yield pa.Table.from_batches(pending).to_pandas()
+            pending, pending_rows = [], 0
+    if pending:
+        yield pa.Table.from_batches(pending).to_pandas()
+
+def iter_csv(body: Source, chunk_rows: int) -> Iterator[pd.DataFrame]:
+    """Read CSV text in chunks of chunk_rows rows."""
+    with pd.read_csv(_file_like(body), chunksize=chunk_rows) as reader:
+        for chunk in reader:
+            yield chunk
+
+def iter_arrow_stream(body: Source, chunk_rows: int) -> Iterator[pd.DataFrame]:
+    """Read an Arrow IPC stream batch by batch."""
+    import pyarrow as pa
+    yield from _iter_arrow_batches(pa.ipc.open_stream(_arrow_input(body)), chunk_rows)
+
+def iter_arrow_file(body: Source, chunk_rows: int) -> Iterator[pd.DataFrame]:
+    """Read an Arrow IPC file batch by batch."""
+    import pyarrow as pa
+    reader = pa.ipc.open_file(_arrow_input(body))
+    batches = (reader.get_batch(i) for i in range(reader.num_record_batches))
+    yield from _iter_arrow_batches(batches, chunk_rows)
+
+def iter_parquet(body: Source, chunk_rows: int) -> Iterator[pd.DataFrame]:
+    """Read a Parquet file in batches of chunk_rows rows."""
+    import pyarrow.parquet as pq
+    parquet_file = pq.ParquetFile(_arrow_input(body))
+    for batch in parquet_file.iter_batches(batch_size=chunk_rows):
+        yield batch.to_pandas()
+
+CHUNK_READERS: Dict[str, Callable[[Source, int], Iterator[pd.DataFrame]]] = {}
+for _types, _reader in (
+    (CSV_TYPES, iter_csv),
+    (ARROW_STREAM_TYPES, iter_arrow_stream),
+    (ARROW_FILE_TYPES, iter_arrow_file),
+    (PARQUET_TYPES, iter_parquet),
+):
+    for _content_type in _types:
+        CHUNK_READERS[_content_type] = _reader
+
+def supports_chunks(content_type: str) -> bool:
+    """Whether an upload format can be read incrementally."""
+    return content_type.split(';')[0].strip().lower() in CHUNK_READERS
+
+def iter_upload_chunks(body: Source, content_type: str, chunk_rows: int) -> Iterator[pd.DataFrame]:
+    """
+    Read a raw upload body as a sequence of DataFrames.
+
+    Args:
+        body: Raw request body, or the path of the file it was spooled to
+        content_type: Content-Type header value
+        chunk_rows: Target number of rows per chunk
+
+    Returns:
+        Iterator of DataFrame chunks in row order
+    """
+    media_type = content_type.split(';')[0].strip().lower()
+    reader = CHUNK_READERS.get(media_type)
+    if reader is None:
+        raise UnsupportedFormatError(f"Content type '{media_type}' cannot be read in chunks")
+    return reader(body, chunk_rows)
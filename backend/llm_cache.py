@@ -0,0 +1,205 @@
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Bump when a prompt template changes so persisted answers to the old prompt are not reused
+PROMPT_VERSION = 2
+
+def fingerprint_prompt_inputs(kind: str, model: str, inputs: Dict[str, Any]) -> str:
+    """
+    Hash the inputs a prompt is built from into a response cache key.
+
+    Inputs are serialized as canonical JSON (sorted keys, compact separators,
+    non-JSON values via str) so equal inputs map to the same key regardless
+    of dict order or formatting.
+
+    Args:
+        kind: Prompt family, e.g. "chart_suggestions"
+        model: Model name the answer comes from
+        inputs: Everything the prompt text depends on
+
+    Returns:
+        Hex digest used as the cache key
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(f"{kind}:{model}:{PROMPT_VERSION}:".encode())
+    digest.update(json.dumps(inputs, sort_keys=True, separators=(',', ':'), default=str).encode())
+    return digest.hexdigest()
+
+class SQLiteResponseStore:
+    """
+    On-disk table of model responses so answers survive restarts.
+
+    Rows older than ttl_seconds are ignored and purged, and the oldest rows
+    are deleted once more than max_entries are stored.
+    """
+
+    def __init__(self, path: str, max_entries: int = 10000, ttl_seconds: float = 7 * 24 * 3600):
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "key TEXT PRIMARY KEY, response TEXT NOT NULL, created_at REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS responses_created_at ON responses (created_at)")
+        self._conn.commit()
+
+    def get(self, key: str) -> Optional[Tuple[str, float]]:
+        """Return (response, created_at) for a fresh row, or None."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT response, created_at FROM responses WHERE key = ? AND created_at >= ?",
+                (key, time.time() - self.ttl_seconds)
+            ).fetchone()
+        return (row[0], row[1]) if row else None
+
+    def put(self, key: str, response: str, created_at: float) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, response, created_at) VALUES (?, ?, ?)",
+                (key, response, created_at)
+            )
+            self._conn.execute("DELETE FROM responses WHERE created_at < ?", (time.time() - self.ttl_seconds,))
+            self._conn.execute(
+                "DELETE FROM responses WHERE key IN ("
+                "SELECT key FROM responses ORDER BY created_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,)
+            )
+            self._conn.commit()
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+            self._conn.commit()
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+class LLMResponseCache:
+    """
+    Thread-safe LRU cache of model responses with an optional SQLite backing store.
+
+    Lookups check memory first and then the store, promoting store hits into
+    memory. Entries expire after ttl_seconds; memory is also bounded by
+    max_entries and max_bytes (least recently used first).
+    """
+
+    def __init__(self, max_entries: int = 1024, max_bytes: int = 32 * 1024 * 1024,
+                 ttl_seconds: float = 7 * 24 * 3600, store: Optional[SQLiteResponseStore] = None):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.store = store
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.bypasses = 0
+        self.evictions = 0
+        self._entries: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached response for a key, or None if it is missing or expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self._is_expired(entry[1]):
+                self._remove(key)
+                entry = None
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+
+        stored = self.store.get(key) if self.store else None
+        with self._lock:
+            if stored is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self.disk_hits += 1
+            self._insert(key, stored[0], stored[1])
+            return stored[0]
+
+    def put(self, key: str, response: str) -> None:
+        """Store a response in memory and, when configured, on disk."""
+        created_at = time.time()
+        with self._lock:
+            self._insert(key, response, created_at)
+        if self.store:
+            try:
+                self.store.put(key, response, created_at)
+            except sqlite3.Error as e:
+                logger.warning(f"Failed to persist LLM response: {str(e)}")
+
+    def invalidate(self, key: str) -> None:
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+        if self.store:
+            self.store.delete(key)
+
+    def record_bypass(self) -> None:
+        with self._lock:
+            self.bypasses += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Counters and current occupancy."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            stats = {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "maxEntries": self.max_entries,
+                "maxBytes": self.max_bytes,
+                "ttlSeconds": self.ttl_seconds,
+                "hits": self.hits,
+                "diskHits": self.disk_hits,
+                "misses": self.misses,
+                "bypasses": self.bypasses,
+                "evictions": self.evictions,
+                "hitRate": self.hits / lookups if lookups else 0.0,
+            }
+        if self.store:
+            stats["diskEntries"] = self.store.count()
+        return stats
+
+    def _is_expired(self, created_at: float) -> bool:
+        return time.time() - created_at > self.ttl_seconds
+
+    def _insert(self, key: str, response: str, created_at: float) -> None:
+        if key in self._entries:
+            self._remove(key)
+        size = len(response.encode())
+        if size > self.max_bytes:
+            return
+        self._entries[key] = (response, created_at)
+        self._bytes += size
+        while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+            self._remove(next(iter(self._entries)))
+            self.evictions += 1
+
+    def _remove(self, key: str) -> None:
+        response, _ = self._entries.pop(key)
+        self._bytes -= len(response.encode())
@@ -1,15 +1,37 @@
 import os
 import json
 import logging
-from typing import List, Dict, Any, Optional
-from fastapi import FastAPI, HTTPException
+import tempfile
+from contextlib import asynccontextmanager
+from typing import List, Dict, Any, Optional, Tuple, Union
+from fastapi import FastAPI, Header, HTTPException, Query, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from starlette.concurrency import run_in_threadpool
 from pydantic import BaseModel
 import pandas as pd
 import numpy as np
 import google.generativeai as genai
 from dotenv import load_dotenv
 import uvicorn
+
+from inference import ColumnProfile, clean_dataframe
+from chart_series import attach_chart_series, suggestion_columns
+from compaction import CompactionStats, compact_frame
+from compression import CompressionMiddleware
+from dataset_cache import CachedDataset, DatasetCache, DatasetTooLargeError, fingerprint_records, scoped_dataset_id
+from dataset_store import ParquetDatasetStore
+from filter_cube import FilterCube, query_filtered
+from ingest import Source, UnsupportedFormatError, body_digest, iter_upload_chunks, read_upload, supports_chunks
+from streaming import UnknownColumnsError, check_dedup_columns, new_deduplicator, stream_preprocess
+from workers import WorkerPool, WorkerPoolFull
+from gemini_client import GeminiClient, GeminiError
+from digest import DIGEST_BUDGET_BYTES, build_digest
+from downsample import CHART_METHODS, METHODS as DOWNSAMPLE_METHODS, downsample
+from llm_cache import LLMResponseCache, SQLiteResponseStore, fingerprint_prompt_inputs
+from metrics import PROMETHEUS_CONTENT_TYPE, MetricsMiddleware, MetricsRegistry, profiled
+from serialization import JSON_MEDIA_TYPE, NDJSON_MEDIA_TYPE, ORIENTS, dumps, ndjson_lines
+
 # Load environment variables
 load_dotenv()
 
@@ -17,11 +39,26 @@ load_dotenv()
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Pool that runs pandas work off the event loop; jobs beyond workers + queue get a 503
+cpu_pool = WorkerPool(
+    kind=os.getenv("WORKER_POOL_KIND", "thread"),
+    max_workers=int(os.getenv("WORKER_POOL_SIZE", os.cpu_count() or 4)),
+    max_queue=int(os.getenv("WORKER_QUEUE_DEPTH", 16)),
+)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    cpu_pool.shutdown()
+    if llm_cache.store:
+        llm_cache.store.close()
+
 # Initialize FastAPI app
 app = FastAPI(
     title="Chartly Backend",
     description="AI-powered data analysis and chart generation service",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # Configure CORS
@@ -33,6 +70,26 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compress responses above a size threshold: brotli when installed and accepted, otherwise gzip
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=int(os.getenv("COMPRESSION_MIN_BYTES", 1024)),
+    gzip_level=int(os.getenv("COMPRESSION_GZIP_LEVEL", 6)),
+    brotli_quality=int(os.getenv("COMPRESSION_BROTLI_QUALITY", 4)),
+)
+
+# Per-stage latency (and optionally memory) histograms served on /metrics; outermost so request time covers compression
+metrics = MetricsRegistry(
+    trace_memory=os.getenv("METRICS_TRACE_MEMORY", "false").strip().lower() in ("1", "true", "yes"),
+)
+app.add_middleware(
+    MetricsMiddleware,
+    registry=metrics,
+    server_timing=os.getenv("SERVER_TIMING", "false").strip().lower() in ("1", "true", "yes"),
+    profile_dir=os.getenv("PROFILE_DIR"),
+    profile_threshold_ms=float(os.getenv("PROFILE_SLOW_REQUEST_MS", 1000)),
+)
+
 # Configure Google Gemini AI
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
 if not GEMINI_API_KEY:
@@ -40,9 +97,71 @@ if not GEMINI_API_KEY:
 else:
     genai.configure(api_key=GEMINI_API_KEY)
 
+# Shared Gemini client: one model, bounded concurrency, backoff and request coalescing
+GEMINI_MODEL = os.getenv("GEMINI_MODEL", "gemini-2.5-flash")
+gemini_client = GeminiClient(
+    model_factory=lambda: genai.GenerativeModel(GEMINI_MODEL),
+    max_concurrency=int(os.getenv("GEMINI_MAX_CONCURRENCY", 8)),
+    timeout=float(os.getenv("GEMINI_TIMEOUT_SECONDS", 120)),
+)
+
+# Cache of model responses keyed by the inputs their prompts were built from
+LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH")
+LLM_CACHE_TTL_SECONDS = float(os.getenv("LLM_CACHE_TTL_SECONDS", 7 * 24 * 3600))
+llm_cache = LLMResponseCache(
+    max_entries=int(os.getenv("LLM_CACHE_MAX_ENTRIES", 1024)),
+    max_bytes=int(os.getenv("LLM_CACHE_MAX_BYTES", 32 * 1024 * 1024)),
+    ttl_seconds=LLM_CACHE_TTL_SECONDS,
+    store=SQLiteResponseStore(
+        LLM_CACHE_PATH,
+        max_entries=int(os.getenv("LLM_CACHE_DISK_MAX_ENTRIES", 10000)),
+        ttl_seconds=LLM_CACHE_TTL_SECONDS,
+    ) if LLM_CACHE_PATH else None,
+)
+
+# Byte budget of the statistical digest that stands in for the rows in the insights prompt
+INSIGHTS_DIGEST_BUDGET_BYTES = int(os.getenv("INSIGHTS_DIGEST_BUDGET_BYTES", DIGEST_BUDGET_BYTES))
+
+# Default number of points charts are reduced to, and the most a request may ask for
+DEFAULT_MAX_POINTS = 50
+MAX_POINTS_LIMIT = int(os.getenv("MAX_POINTS_LIMIT", 100000))
+
+# Request header that skips the response cache lookup (the fresh answer is still stored)
+LLM_CACHE_BYPASS_HEADER = "X-LLM-Cache-Bypass"
+
+# Cache of cleaned datasets keyed by a hash of the uploaded records
+dataset_cache = DatasetCache(
+    max_entries=int(os.getenv("DATASET_CACHE_MAX_ENTRIES", 32)),
+    max_bytes=int(os.getenv("DATASET_CACHE_MAX_BYTES", 512 * 1024 * 1024)),
+    ttl_seconds=float(os.getenv("DATASET_CACHE_TTL_SECONDS", 3600)),
+)
+
+# Raw uploads larger than this are cleaned chunk by chunk under a memory ceiling
+STREAMING_THRESHOLD_BYTES = int(os.getenv("STREAMING_THRESHOLD_BYTES", 64 * 1024 * 1024))
+STREAMING_MEMORY_LIMIT_BYTES = int(os.getenv("STREAMING_MEMORY_LIMIT_BYTES", 256 * 1024 * 1024))
+
+# Narrow dtypes of cleaned frames (smaller integers, arrow strings, dictionary-encoded text)
+COMPACT_DATAFRAMES = os.getenv("COMPACT_DATAFRAMES", "true").strip().lower() in ("1", "true", "yes")
+compaction_stats = CompactionStats()
+
+# DataFrame.attrs key carrying the CompactionReport back from the worker, as attrs survive pickling to the server process
+COMPACTION_REPORT_ATTR = "chartly_compaction"
+
+# Optional on-disk copy of uploaded datasets so handles survive cache eviction
+DATASET_STORE_DIR = os.getenv("DATASET_STORE_DIR")
+dataset_store = None
+if DATASET_STORE_DIR:
+    dataset_store = ParquetDatasetStore(
+        DATASET_STORE_DIR,
+        max_bytes=int(os.getenv("DATASET_STORE_MAX_BYTES", 2 * 1024 * 1024 * 1024)),
+    )
+
 # Pydantic models for request/response validation
 class DataRequest(BaseModel):
-    data: List[Dict[str, Any]]
+    data: Optional[List[Dict[str, Any]]] = None
+    datasetId: Optional[str] = None
+    # Columns that identify a duplicate row; whole rows are compared when omitted
+    dedupColumns: Optional[List[str]] = None
 
 class ChartSuggestion(BaseModel):
     chartType: str
@@ -61,12 +180,34 @@ class ColumnInfo(BaseModel):
 class ChartsResponse(BaseModel):
     suggestions: List[Dict[str, Any]]
     columnInfo: List[ColumnInfo]
-    processedData: Optional[List[Dict[str, Any]]] = None
+    processedData: Optional[Union[List[Dict[str, Any]], Dict[str, List[Any]]]] = None
     originalRowCount: int
     processedRowCount: int
+    duplicateRows: int = 0
+    datasetId: Optional[str] = None
 
 class InsightsResponse(BaseModel):
     insights: str
+    duplicateRows: int = 0
+    datasetId: Optional[str] = None
+
+class FilterQueryRequest(BaseModel):
+    filters: Dict[str, Union[str, List[str]]] = {}
+    suggestions: Optional[List[Dict[str, Any]]] = None
+
+class FilterQueryResponse(BaseModel):
+    datasetId: str
+    rowCount: int
+    columnStats: Dict[str, Dict[str, Any]]
+    suggestions: List[Dict[str, Any]]
+    source: str
+    schemaChanged: bool = False
+
+class DatasetResponse(BaseModel):
+    datasetId: str
+    rowCount: int
+    duplicateRows: int = 0
+    columnInfo: List[ColumnInfo]
 
 def preprocess_data(data: List[Dict[str, Any]]) -> pd.DataFrame:
     """
@@ -78,12 +219,47 @@ def preprocess_data(data: List[Dict[str, Any]]) -> pd.DataFrame:
     Returns:
         Cleaned and normalized Pandas DataFrame
     """
+    return preprocess_data_with_profiles(data)[0]
+
+def preprocess_data_with_profiles(
+    data: List[Dict[str, Any]],
+    dedup_columns: Optional[List[str]] = None
+) -> Tuple[pd.DataFrame, Dict[str, ColumnProfile], int]:
+    """
+    Run the preprocessing pipeline and keep the column profiles it computed.
+    
+    Args:
+        data: List of dictionaries representing raw data
+        dedup_columns: Columns that identify a duplicate row, or None to compare whole rows
+        
+    Returns:
+        Tuple of the cleaned DataFrame, its column profiles and the number of duplicate rows removed
+    """
     if not data:
         raise ValueError("Data is empty")
     
     # Convert to DataFrame
-    df = pd.DataFrame(data)
+    return preprocess_dataframe(pd.DataFrame(data), dedup_columns)
+
+def preprocess_dataframe(
+    df: pd.DataFrame,
+    dedup_columns: Optional[List[str]] = None
+) -> Tuple[pd.DataFrame, Dict[str, ColumnProfile], int]:
+    """
+    Clean a raw DataFrame that was built from any supported upload format.
+    
+    Args:
+        df: Raw DataFrame
+        dedup_columns: Columns that identify a duplicate row, or None to compare whole rows
+        
+    Returns:
+        Tuple of the cleaned DataFrame, its column profiles and the number of duplicate rows removed
+    """
+    if df.empty:
+        raise ValueError("Data is empty")
+    
     logger.info(f"Initial DataFrame shape: {df.shape}")
+    check_dedup_columns(list(df.columns), dedup_columns)
     
     # Remove columns with >60% missing values
     missing_threshold = 0.6
@@ -94,60 +270,298 @@ def preprocess_data(data: List[Dict[str, Any]]) -> pd.DataFrame:
         logger.info(f"Dropping columns with >60% missing values: {cols_to_drop}")
         df = df.drop(columns=cols_to_drop)
     
-    # Handle missing values for remaining columns
-    for col in df.columns:
-        if df[col].isnull().sum() > 0:
-            # Try to convert to numeric to check if mostly numeric
-            numeric_col = pd.to_numeric(df[col], errors='coerce')
-            numeric_ratio = numeric_col.notna().sum() / len(df[col].dropna())
-            
-            if numeric_ratio > 0.7:  # Mostly numeric
-                df[col] = numeric_col.fillna(numeric_col.mean())
-            else:
-                # Fill with mode for categorical/text data
-                mode_value = df[col].mode()
-                if not mode_value.empty:
-                    df[col] = df[col].fillna(mode_value.iloc[0])
-                else:
-                    df[col] = df[col].fillna("Unknown")
+    # Profile each column once, then impute and coerce from that profile
+    missing = df.isna()
+    df, profiles = clean_dataframe(df)
     
-    # Type inference and coercion
-    for col in df.columns:
-        # Try numeric conversion
-        numeric_col = pd.to_numeric(df[col], errors='coerce')
-        numeric_ratio = numeric_col.notna().sum() / len(df) if len(df) > 0 else 0
-        
-        if numeric_ratio > 0.9:  # >90% numeric
-            df[col] = numeric_col
-            # Convert to int if all values are whole numbers
-            if df[col].notna().all() and (df[col] == df[col].astype(int)).all():
-                df[col] = df[col].astype(int)
-        else:
-            # Try datetime conversion
-            try:
-                datetime_col = pd.to_datetime(df[col], errors='coerce', infer_datetime_format=True)
-                if datetime_col.notna().sum() / len(df) > 0.7:  # >70% valid dates
-                    df[col] = datetime_col
-                    continue
-            except:
-                pass
-            
-            # Check if should be categorical
-            unique_ratio = df[col].nunique() / len(df) if len(df) > 0 else 0
-            if unique_ratio < 0.1 and df[col].nunique() < 50:  # Low unique ratio and reasonable unique count
-                df[col] = df[col].astype('category')
+    # Remove duplicate rows by 64-bit row hash, over the subset columns that survived
+    duplicates = 0
+    deduplicator = new_deduplicator(dedup_columns, list(df.columns))
+    if deduplicator:
+        df = deduplicator.filter(df, missing)
+        duplicates = deduplicator.duplicates
+    if duplicates:
+        logger.info(f"Removed {duplicates} duplicate rows")
     
-    # Remove duplicate rows
-    initial_rows = len(df)
-    df = df.drop_duplicates()
-    if len(df) < initial_rows:
-        logger.info(f"Removed {initial_rows - len(df)} duplicate rows")
+    df = compact_cleaned(df)
     
     logger.info(f"Final DataFrame shape: {df.shape}")
     logger.info(f"Column types: {dict(df.dtypes)}")
     
+    return df, profiles, duplicates
+
+def compact_cleaned(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Last cleaning stage: shrink the frame's dtypes and log the memory saved.
+    
+    The report is attached to the frame's attrs for cache_dataset to record.
+    """
+    if not COMPACT_DATAFRAMES:
+        return df
+    df, report = compact_frame(df)
+    logger.info(f"Compacted DataFrame: {report.summary()}")
+    if report.changes:
+        logger.debug(f"Compacted columns: {report.changes}")
+    df.attrs[COMPACTION_REPORT_ATTR] = report
     return df
 
+async def run_cpu(func, *args, **kwargs):
+    """
+    Run a CPU-bound function on the worker pool, answering 503 when it is saturated.
+    
+    The call is recorded as a metrics stage named after the function, including
+    any wait for a free worker. Thread workers also run it under cProfile when
+    the request asked to be profiled.
+    """
+    stage = getattr(func, '__qualname__', getattr(func, '__name__', 'job'))
+    if cpu_pool.kind == "thread":
+        func = profiled(func)
+    try:
+        with metrics.stage(stage):
+            return await cpu_pool.run(func, *args, **kwargs)
+    except WorkerPoolFull:
+        logger.warning(f"Worker pool saturated, rejecting {getattr(func, '__name__', 'job')}")
+        raise HTTPException(
+            status_code=503,
+            detail="Server is busy processing other datasets; retry shortly",
+            headers={"Retry-After": "1"}
+        )
+
+async def cache_dataset(
+    dataset_id: str,
+    df: pd.DataFrame,
+    profiles: Dict[str, ColumnProfile],
+    duplicate_rows: int = 0
+) -> CachedDataset:
+    """
+    Aggregate a cleaned DataFrame for visualization and store the result in the dataset cache.
+    
+    Datasets that could never fit in the cache are rejected with 413, since
+    their id could not be used in later requests.
+    """
+    report = df.attrs.pop(COMPACTION_REPORT_ATTR, None)
+    if report is not None:
+        compaction_stats.record(report)
+    
+    cached = CachedDataset(
+        dataset_id=dataset_id,
+        df=df,
+        profiles=profiles,
+        viz_df=await run_cpu(aggregate_data_for_visualization, df),
+        duplicate_rows=duplicate_rows,
+    )
+    try:
+        dataset_cache.put(cached)
+    except DatasetTooLargeError as e:
+        raise HTTPException(status_code=413, detail=f"{str(e)}; raise DATASET_CACHE_MAX_BYTES or upload less data")
+    return cached
+
+async def get_dataset(dataset_id: str) -> CachedDataset:
+    """
+    Look up a previously uploaded dataset by id.
+    
+    Falls back to the on-disk store when the cleaned frame has been evicted
+    from memory.
+    
+    Args:
+        dataset_id: Id returned by an earlier upload
+        
+    Returns:
+        Cached dataset with the cleaned DataFrame, profiles and visualization data
+    """
+    cached = dataset_cache.get(dataset_id)
+    if cached is not None:
+        return cached
+    
+    df = await run_cpu(dataset_store.load, dataset_id) if dataset_store else None
+    if df is None:
+        raise HTTPException(status_code=404, detail="Dataset not found or expired; upload the data again")
+    
+    logger.info(f"Restored dataset {dataset_id} from disk")
+    return await cache_dataset(dataset_id, df, {})
+
+async def ingest_records(data: List[Dict[str, Any]], dedup_columns: Optional[List[str]] = None) -> CachedDataset:
+    """
+    Clean uploaded records, reusing the cached result for identical uploads.
+    
+    Args:
+        data: List of dictionaries representing raw data
+        dedup_columns: Columns that identify a duplicate row, or None to compare whole rows
+        
+    Returns:
+        Cached dataset with the cleaned DataFrame, profiles and visualization data
+    """
+    if not data:
+        raise HTTPException(status_code=400, detail="Data cannot be empty")
+    
+    dataset_id = scoped_dataset_id(await run_cpu(fingerprint_records, data), dedup_columns)
+    cached = dataset_cache.get(dataset_id)
+    if cached is not None:
+        logger.info(f"Dataset cache hit for {dataset_id}")
+        return cached
+    
+    try:
+        df, profiles, duplicates = await run_cpu(preprocess_data_with_profiles, data, dedup_columns)
+    except UnknownColumnsError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if df.empty:
+        raise HTTPException(status_code=400, detail="No valid data after preprocessing")
+    
+    return await cache_dataset(dataset_id, df, profiles, duplicates)
+
+def clean_upload(
+    body: Source,
+    content_type: str,
+    stream: bool,
+    dedup_columns: Optional[List[str]] = None
+) -> Tuple[pd.DataFrame, Dict[str, ColumnProfile], int]:
+    """
+    Parse and clean a raw upload body, in chunks when streaming is requested.
+    
+    Args:
+        body: Raw request body, or the path of the file it was spooled to
+        content_type: Content-Type header of the request
+        stream: Whether to clean chunk by chunk (ignored for formats that cannot be chunked)
+        dedup_columns: Columns that identify a duplicate row, or None to compare whole rows
+        
+    Returns:
+        Tuple of the cleaned DataFrame, its column profiles and the number of duplicate rows removed
+    """
+    if stream and supports_chunks(content_type):
+        df, profiles, duplicates = stream_preprocess(
+            lambda chunk_rows: iter_upload_chunks(body, content_type, chunk_rows),
+            STREAMING_MEMORY_LIMIT_BYTES,
+            dedup_columns,
+        )
+        return compact_cleaned(df), profiles, duplicates
+    return preprocess_dataframe(read_upload(body, content_type), dedup_columns)
+
+async def spool_upload(request: Request, content_type: str) -> Tuple[Source, str]:
+    """
+    Receive a raw upload body, hashing it as it arrives.
+    
+    Bodies up to STREAMING_THRESHOLD_BYTES are kept in memory. Larger ones
+    are written to a temporary file piece by piece, so the raw body is never
+    held in memory whole; the caller deletes the file.
+    
+    Args:
+        request: Incoming request whose body has not been read yet
+        content_type: Content-Type header of the request
+        
+    Returns:
+        Tuple of the body (bytes, or the path of the temporary file) and its fingerprint
+    """
+    digest = body_digest(content_type)
+    pieces: List[bytes] = []
+    size = 0
+    spool = None
+    try:
+        async for piece in request.stream():
+            digest.update(piece)
+            size += len(piece)
+            if spool is None and size > STREAMING_THRESHOLD_BYTES:
+                spool = tempfile.NamedTemporaryFile(prefix="chartly-upload-", delete=False)
+                await run_in_threadpool(spool.writelines, pieces)
+                pieces = []
+            if spool is not None:
+                await run_in_threadpool(spool.write, piece)
+            else:
+                pieces.append(piece)
+    except BaseException:
+        if spool is not None:
+            spool.close()
+            os.unlink(spool.name)
+        raise
+    
+    if spool is None:
+        return b"".join(pieces), digest.hexdigest()
+    spool.close()
+    logger.info(f"Spooled {size} byte upload to {spool.name}")
+    return spool.name, digest.hexdigest()
+
+async def ingest_body(
+    body: Source,
+    fingerprint: str,
+    content_type: str,
+    stream: Optional[bool] = None,
+    dedup_columns: Optional[List[str]] = None
+) -> CachedDataset:
+    """
+    Parse and clean a raw CSV, columnar JSON, Arrow or Parquet upload.
+    
+    Large CSV, Arrow and Parquet bodies are cleaned in streaming mode: the
+    spooled file is read one chunk at a time, so only one raw chunk and its
+    cleaning intermediates (under STREAMING_MEMORY_LIMIT_BYTES) are held
+    besides the cleaned rows. The cleaned DataFrame itself is kept whole,
+    as the dataset cache needs it.
+    
+    Args:
+        body: Raw request body, or the path of the file spool_upload wrote it to
+        fingerprint: Hash of the content type and body from spool_upload
+        content_type: Content-Type header of the request
+        stream: Force streaming on or off; None streams bodies that were spooled to disk
+        dedup_columns: Columns that identify a duplicate row, or None to compare whole rows
+        
+    Returns:
+        Cached dataset with the cleaned DataFrame, profiles and visualization data
+    """
+    if not body:
+        raise HTTPException(status_code=400, detail="Data cannot be empty")
+    
+    dataset_id = scoped_dataset_id(fingerprint, dedup_columns)
+    cached = dataset_cache.get(dataset_id)
+    if cached is not None:
+        logger.info(f"Dataset cache hit for {dataset_id}")
+        return cached
+    
+    if stream is None:
+        stream = not isinstance(body, bytes)
+    
+    try:
+        df, profiles, duplicates = await run_cpu(clean_upload, body, content_type, stream, dedup_columns)
+    except UnsupportedFormatError as e:
+        raise HTTPException(status_code=415, detail=str(e))
+    except UnknownColumnsError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except (HTTPException, MemoryError):
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Could not parse upload: {str(e)}")
+    
+    if df.empty:
+        raise HTTPException(status_code=400, detail="No valid data after preprocessing")
+    
+    return await cache_dataset(dataset_id, df, profiles, duplicates)
+
+async def store_dataset(dataset: CachedDataset) -> DatasetResponse:
+    """Persist an uploaded dataset (when a store is configured) and describe it."""
+    if dataset_store:
+        await run_cpu(dataset_store.save, dataset.dataset_id, dataset.df)
+    
+    return DatasetResponse(
+        datasetId=dataset.dataset_id,
+        rowCount=len(dataset.df),
+        duplicateRows=dataset.duplicate_rows,
+        columnInfo=build_column_info(dataset.df)
+    )
+
+async def load_dataset(request: DataRequest) -> CachedDataset:
+    """
+    Resolve the cleaned dataset for a request, reusing cached work when possible.
+    
+    Requests may refer to an earlier upload by datasetId or send the records
+    again; identical records map to the same cache entry.
+    
+    Args:
+        request: Incoming data request
+        
+    Returns:
+        Cached dataset with the cleaned DataFrame, profiles and visualization data
+    """
+    if request.datasetId and not request.data:
+        return await get_dataset(request.datasetId)
+    return await ingest_records(request.data, request.dedupColumns)
+
 def get_column_type(series: pd.Series) -> str:
     """Determine the semantic type of a pandas Series."""
     if pd.api.types.is_numeric_dtype(series):
@@ -157,7 +571,61 @@ def get_column_type(series: pd.Series) -> str:
     else:
         return "categorical"
 
-def aggregate_data_for_visualization(df: pd.DataFrame, max_points: int = 50) -> pd.DataFrame:
+def build_column_info(df: pd.DataFrame) -> List[ColumnInfo]:
+    """Describe the semantic type of every column."""
+    return [ColumnInfo(name=col, type=get_column_type(df[col])) for col in df.columns]
+
+def most_frequent_by_group(df: pd.DataFrame, keys: pd.Series, columns: List[str]) -> pd.DataFrame:
+    """
+    Most frequent value of each column within each group, without per-group Python calls.
+    
+    Counts every (group, value) pair with one groupby size, then keeps the
+    highest count per group. Ties go to the smallest value (category order
+    for categoricals), matching Series.mode().iloc[0]; groups with only
+    missing values get NaN.
+    
+    Args:
+        df: Input DataFrame
+        keys: Group key for every row of df
+        columns: Columns to take the mode of
+        
+    Returns:
+        DataFrame indexed by group key with one column per entry in columns
+    """
+    modes = {}
+    for col in columns:
+        counts = df.groupby([keys, df[col]], observed=True).size()
+        counts = counts[counts > 0]
+        pairs = pd.DataFrame({
+            "group": counts.index.get_level_values(0),
+            "value": counts.index.get_level_values(1),
+            "count": counts.to_numpy(),
+        })
+        pairs = pairs.sort_values(["group", "count", "value"], ascending=[True, False, True], kind="stable")
+        modes[col] = pairs.drop_duplicates("group").set_index("group")["value"]
+    # Aligning on every group adds the all-missing ones, which have no (group, value) pair
+    groups = df.groupby(keys, observed=True).size().index
+    return pd.DataFrame(modes, index=groups)
+
+def visualization_columns(df: pd.DataFrame) -> Tuple[List[str], List[str], List[str]]:
+    """Split columns into groupable categorical (at most 20 values), date and numeric columns."""
+    categorical_cols = [col for col in df.columns if get_column_type(df[col]) == "categorical" and df[col].nunique() <= 20]
+    date_cols = [col for col in df.columns if get_column_type(df[col]) == "date"]
+    numeric_cols = [col for col in df.columns if get_column_type(df[col]) == "numeric"]
+    return categorical_cols, date_cols, numeric_cols
+
+def aggregation_method(df: pd.DataFrame) -> str:
+    """Name of the strategy aggregate_data_for_visualization picks for df."""
+    categorical_cols, date_cols, numeric_cols = visualization_columns(df)
+    if date_cols and numeric_cols:
+        return "time_aggregation"
+    elif categorical_cols and numeric_cols:
+        return "categorical_aggregation"
+    elif numeric_cols and not categorical_cols:
+        return "minmax"
+    return "statistical_sampling"
+
+def aggregate_data_for_visualization(df: pd.DataFrame, max_points: int = DEFAULT_MAX_POINTS) -> pd.DataFrame:
     """
     Intelligently reduce data points for cleaner visualizations.
     
@@ -172,9 +640,7 @@ def aggregate_data_for_visualization(df: pd.DataFrame, max_points: int = 50) ->
         return df.copy()
     
     # Find potential grouping columns (categorical with reasonable unique count)
-    categorical_cols = [col for col in df.columns if get_column_type(df[col]) == "categorical" and df[col].nunique() <= 20]
-    date_cols = [col for col in df.columns if get_column_type(df[col]) == "date"]
-    numeric_cols = [col for col in df.columns if get_column_type(df[col]) == "numeric"]
+    categorical_cols, date_cols, numeric_cols = visualization_columns(df)
     
     # Strategy 1: If we have date columns, aggregate by time periods
     if date_cols and numeric_cols:
@@ -193,12 +659,13 @@ def aggregate_data_for_visualization(df: pd.DataFrame, max_points: int = 50) ->
             df_copy['period'] = df_copy[date_col].dt.to_period('D')
         
         # Group by period and aggregate numeric columns
-        agg_dict = {col: 'mean' for col in numeric_cols}
+        aggregated = df_copy.groupby('period')[numeric_cols].mean()
         if categorical_cols:
             # Keep the most frequent category for each period
-            agg_dict.update({col: lambda x: x.mode().iloc[0] if not x.mode().empty else x.iloc[0] for col in categorical_cols})
+            modes = most_frequent_by_group(df_copy, df_copy['period'], categorical_cols)
+            aggregated = aggregated.join(modes)
         
-        aggregated = df_copy.groupby('period').agg(agg_dict).reset_index()
+        aggregated = aggregated.reset_index()
         aggregated[date_col] = aggregated['period'].dt.start_time
         aggregated = aggregated.drop('period', axis=1)
         
@@ -207,13 +674,13 @@ def aggregate_data_for_visualization(df: pd.DataFrame, max_points: int = 50) ->
     # Strategy 2: If we have categorical columns, aggregate by categories
     elif categorical_cols and numeric_cols:
         cat_col = categorical_cols[0]
-        agg_dict = {col: 'mean' for col in numeric_cols}
+        aggregated = df.groupby(cat_col, observed=True)[numeric_cols].mean()
         
         # Add other categorical columns
-        for col in categorical_cols[1:]:
-            agg_dict[col] = lambda x: x.mode().iloc[0] if not x.mode().empty else x.iloc[0]
+        if len(categorical_cols) > 1:
+            aggregated = aggregated.join(most_frequent_by_group(df, df[cat_col], categorical_cols[1:]))
         
-        aggregated = df.groupby(cat_col).agg(agg_dict).reset_index()
+        aggregated = aggregated.reset_index()
         return aggregated
     
     # Strategy 3: Statistical sampling for other cases
@@ -227,16 +694,29 @@ def aggregate_data_for_visualization(df: pd.DataFrame, max_points: int = 50) ->
             def sample_group(group):
                 return group.sample(min(len(group), samples_per_group), random_state=42)
             
-            sampled = df.groupby(cat_col, group_keys=False).apply(sample_group)
+            sampled = df.groupby(cat_col, observed=True, group_keys=False).apply(sample_group)
             return sampled.reset_index(drop=True)
+        elif numeric_cols:
+            # Keep the minimum and maximum of each stretch of rows so spikes survive, in row order
+            return downsample(df, None, numeric_cols, max_points, 'minmax')
         else:
-            # Random sampling
-            return df.sample(n=max_points, random_state=42).reset_index(drop=True)
+            # Evenly spaced rows, in row order
+            positions = np.linspace(0, len(df) - 1, max_points).astype(int)
+            return df.iloc[positions].reset_index(drop=True)
 
-def create_chart_prompt(df: pd.DataFrame) -> str:
-    """Create a sophisticated prompt for chart generation with data reduction awareness."""
-    # First, create a visualization-optimized version of the data
-    viz_df = aggregate_data_for_visualization(df)
+def chart_prompt_inputs(df: pd.DataFrame, viz_df: Optional[pd.DataFrame] = None) -> Dict[str, Any]:
+    """
+    Collect everything the chart suggestion prompt is built from.
+    
+    Args:
+        df: Cleaned DataFrame
+        viz_df: Visualization-optimized DataFrame (aggregated from df when omitted)
+        
+    Returns:
+        Dict with the schema, sample rows and row counts
+    """
+    if viz_df is None:
+        viz_df = aggregate_data_for_visualization(df)
     
     # Analyze DataFrame schema
     schema_info = []
@@ -249,19 +729,50 @@ def create_chart_prompt(df: pd.DataFrame) -> str:
             "unique_count": unique_count
         })
     
-    # Get sample data from the optimized dataset
-    sample_data = viz_df.head(5).to_dict('records')
+    return {
+        "schema": schema_info,
+        # Get sample data from the optimized dataset
+        "sample": viz_df.head(5).to_dict('records'),
+        "originalRows": len(df),
+        "optimizedRows": len(viz_df),
+    }
+
+def chart_cache_key(inputs: Dict[str, Any]) -> str:
+    """
+    Response cache key for a chart suggestion prompt.
+    
+    Suggestions depend on the schema and sample rows, and on whether the
+    data was aggregated, but not on exact row counts, so re-uploads and
+    re-filters of the same report shape share one answer.
+    """
+    return fingerprint_prompt_inputs("chart_suggestions", GEMINI_MODEL, {
+        "schema": inputs["schema"],
+        "sample": inputs["sample"],
+        "aggregated": inputs["optimizedRows"] < inputs["originalRows"],
+    })
+
+def create_chart_prompt(df: pd.DataFrame, viz_df: Optional[pd.DataFrame] = None) -> str:
+    """Create a sophisticated prompt for chart generation with data reduction awareness."""
+    return render_chart_prompt(chart_prompt_inputs(df, viz_df))
+
+def render_chart_prompt(inputs: Dict[str, Any]) -> str:
+    """Render the chart suggestion prompt from chart_prompt_inputs()."""
+    schema_info = inputs["schema"]
+    sample_data = inputs["sample"]
+    original_rows = inputs["originalRows"]
+    optimized_rows = inputs["optimizedRows"]
+    column_count = len(schema_info)
     
     data_reduction_note = ""
-    if len(viz_df) < len(df):
-        data_reduction_note = f"\n\nNote: The original dataset has {len(df)} rows, but for cleaner visualization, it has been intelligently aggregated to {len(viz_df)} data points. Consider this when making chart recommendations."
+    if optimized_rows < original_rows:
+        data_reduction_note = f"\n\nNote: The original dataset has {original_rows} rows, but for cleaner visualization, it has been intelligently aggregated to {optimized_rows} data points. Consider this when making chart recommendations."
     
     prompt = f"""You are an expert data analyst and visualization specialist. Your task is to recommend the most insightful and visually appealing charts for a given dataset.
 
 Dataset Information:
-- Original rows: {len(df)}
-- Visualization-optimized rows: {len(viz_df)}
-- Columns: {len(df.columns)}{data_reduction_note}
+- Original rows: {original_rows}
+- Visualization-optimized rows: {optimized_rows}
+- Columns: {column_count}{data_reduction_note}
 
 Dataset Schema:
 {json.dumps(schema_info, indent=2)}
@@ -300,13 +811,19 @@ Ensure all column names referenced in your suggestions exist in the provided sch
     
     return prompt
 
-def create_insights_prompt(df: pd.DataFrame) -> str:
-    """Create a sophisticated prompt for generating insights."""
-    data_json = df.to_json(orient='records', default_handler=str)
+def create_insights_prompt(df: pd.DataFrame, budget_bytes: Optional[int] = None) -> str:
+    """
+    Create a sophisticated prompt for generating insights.
+    
+    The rows are summarized as a statistical digest (column statistics,
+    top categories, correlations, a resampled trend and outlier rows) whose
+    size stays within budget_bytes however many rows the dataset has.
+    """
+    digest = build_digest(df, budget_bytes or INSIGHTS_DIGEST_BUDGET_BYTES)
     
     prompt = f"""You are a world-class data analyst. Your insights are sharp, concise, and actionable.
 
-You will be given a dataset in JSON format. The data has been pre-cleaned. Your task is to perform a comprehensive analysis.
+You will be given a statistical digest of a dataset. The data has been pre-cleaned. The digest lists the row and column counts, summary statistics for numeric columns, the most frequent values of categorical columns with their counts and shares, date ranges, the strongest correlations between numeric columns, numeric means over time and the most extreme outlier rows with their z-scores. Your task is to perform a comprehensive analysis.
 
 Analysis Steps:
 - First, identify the primary measures and dimensions.
@@ -317,37 +834,96 @@ Analysis Steps:
 
 Your output **must** be a single string of **Markdown**. Use bullet points (`-`) and bold (`**`) for emphasis. Do not include a title or introduction.
 
-Dataset:
-{data_json}"""
+Dataset Digest:
+{digest}"""
     
     return prompt
 
 async def call_gemini_api(prompt: str, max_retries: int = 2) -> str:
-    """Call Google Gemini API with retry logic."""
+    """Call Google Gemini API through the shared client with retry logic."""
     if not GEMINI_API_KEY:
         raise HTTPException(status_code=500, detail="Gemini API key not configured")
     
-    model = genai.GenerativeModel('gemini-2.5-flash')
+    try:
+        with metrics.stage("gemini"):
+            return await gemini_client.generate(prompt, max_retries=max_retries)
+    except GeminiError as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+def check_orient(orient: str) -> None:
+    """Reject an unknown row layout before any work is done."""
+    if orient not in ORIENTS:
+        raise HTTPException(status_code=400, detail=f"Unknown orient '{orient}'. Supported: {', '.join(ORIENTS)}")
+
+def serialize(content: Dict[str, Any], orient: str = "records") -> bytes:
+    """JSON body of a non-streamed frame_response, rendered on the worker pool."""
+    return dumps(content, orient)
+
+async def frame_response(
+    content: Dict[str, Any],
+    orient: str = "records",
+    response: Optional[Response] = None,
+    stream_key: Optional[str] = None
+) -> Response:
+    """
+    Render an endpoint result with orjson instead of validating it against the response model.
     
-    for attempt in range(max_retries + 1):
-        try:
-            logger.info(f"Calling Gemini API (attempt {attempt + 1}/{max_retries + 1})")
-            response = model.generate_content(prompt)
-            
-            if response.text:
-                return response.text.strip()
-            else:
-                raise Exception("Empty response from Gemini API")
-                
-        except Exception as e:
-            logger.error(f"Gemini API call failed (attempt {attempt + 1}): {str(e)}")
-            if attempt == max_retries:
-                raise HTTPException(
-                    status_code=500, 
-                    detail=f"Failed to get response from AI service after {max_retries + 1} attempts: {str(e)}"
-                )
+    DataFrames in content are written directly, as row objects or, with
+    orient="columns", as one array per column. With stream_key the body is
+    streamed as NDJSON instead: the rest of the body on the first line, then
+    the rows of the DataFrame under stream_key. A single document is rendered
+    on the worker pool, so large bodies do not hold up the event loop.
     
-    raise HTTPException(status_code=500, detail="Unexpected error in AI service call")
+    Args:
+        content: Response body; may contain DataFrames, Timestamps and numpy values
+        orient: "records" or "columns"
+        response: The endpoint's injected Response, whose headers are carried over
+        stream_key: Key of the DataFrame to stream, or None for a single JSON document
+    """
+    if stream_key:
+        # Rows are serialized as they are sent, after the headers, so this time is only in the histograms
+        lines = metrics.timed_iterator("serialize", ndjson_lines(content, stream_key, orient))
+        result = StreamingResponse(lines, media_type=NDJSON_MEDIA_TYPE)
+    else:
+        body = await run_cpu(serialize, content, orient)
+        result = Response(content=body, media_type=JSON_MEDIA_TYPE)
+    if response is not None:
+        result.headers.raw.extend(response.headers.raw)
+    return result
+
+def wants_cache_bypass(header_value: Optional[str]) -> bool:
+    """Whether the bypass header asks to skip the LLM response cache."""
+    return (header_value or "").strip().lower() in ("1", "true", "yes")
+
+async def lookup_llm_cache(cache_key: str, bypass: bool = False) -> Optional[str]:
+    """
+    Return a cached model response for cache_key, or None on a miss or bypass.
+    
+    Callers store the response with store_llm_response() once it has been
+    validated, so unparseable answers are never cached. With the SQLite store
+    the lookup runs on a thread, so its disk reads do not stall the event loop.
+    
+    Args:
+        cache_key: Key from fingerprint_prompt_inputs() for the prompt's inputs
+        bypass: Skip the lookup so the model is asked again
+    """
+    if bypass:
+        llm_cache.record_bypass()
+        return None
+    if llm_cache.store:
+        cached = await run_in_threadpool(llm_cache.get, cache_key)
+    else:
+        cached = llm_cache.get(cache_key)
+    if cached is not None:
+        logger.info(f"LLM response cache hit for {cache_key}")
+    return cached
+
+async def store_llm_response(cache_key: str, text: str) -> None:
+    """Cache a validated model response; the SQLite write and pruning run on a thread."""
+    if llm_cache.store:
+        await run_in_threadpool(llm_cache.put, cache_key, text)
+    else:
+        llm_cache.put(cache_key, text)
 
 @app.get("/")
 async def root():
@@ -355,35 +931,58 @@ async def root():
     return {"message": "Chartly Backend Service is running", "status": "healthy"}
 
 @app.post("/api/charts/suggestions", response_model=ChartsResponse)
-async def get_chart_suggestions(request: DataRequest):
+async def get_chart_suggestions(
+    request: DataRequest,
+    response: Response,
+    cache_bypass: Optional[str] = Header(None, alias=LLM_CACHE_BYPASS_HEADER),
+    orient: str = "records",
+    stream: bool = False
+):
     """
     Generate AI-powered chart suggestions based on the provided data.
+    
+    Each suggestion comes back with a "data" array of chart-ready rows
+    computed from the full dataset and the "aggregation" used for them.
+    processedData holds row objects, or one array per column with
+    ?orient=columns. ?stream=true sends NDJSON: the response without
+    processedData first, then its rows.
+    
+    Answers are cached by schema and sample rows; send X-LLM-Cache-Bypass: 1
+    to ask the model again. The X-LLM-Cache response header reports hit, miss
+    or bypass.
+    """
+    check_orient(orient)
+    content = await suggest_charts(request, response, cache_bypass)
+    return await frame_response(content, orient, response, stream_key="processedData" if stream else None)
+
+async def suggest_charts(request: DataRequest, response: Response, cache_bypass: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Chart suggestions response body, with processedData as a DataFrame.
+    
+    Sets the X-LLM-Cache header on response.
     """
     try:
-        # Validate input
-        if not request.data:
-            raise HTTPException(status_code=400, detail="Data cannot be empty")
-        
-        # Preprocess data
-        df = preprocess_data(request.data)
+        # Preprocess data (or reuse the cached result for the same upload)
+        dataset = await load_dataset(request)
+        df = dataset.df
         original_row_count = len(df)
         
-        if df.empty:
-            raise HTTPException(status_code=400, detail="No valid data after preprocessing")
-        
-        # Create visualization-optimized dataset
-        viz_df = aggregate_data_for_visualization(df)
+        # Visualization-optimized dataset is computed once per dataset
+        viz_df = dataset.viz_df
         processed_row_count = len(viz_df)
         
         # Create column info from original dataset
-        column_info = [
-            ColumnInfo(name=col, type=get_column_type(df[col]))
-            for col in df.columns
-        ]
+        column_info = build_column_info(df)
         
         # Generate chart suggestions using AI
-        prompt = create_chart_prompt(df)
-        ai_response = await call_gemini_api(prompt)
+        prompt_inputs = await run_cpu(chart_prompt_inputs, df, viz_df)
+        cache_key = chart_cache_key(prompt_inputs)
+        bypass = wants_cache_bypass(cache_bypass)
+        ai_response = await lookup_llm_cache(cache_key, bypass)
+        cache_status = "hit" if ai_response is not None else "bypass" if bypass else "miss"
+        if ai_response is None:
+            ai_response = await call_gemini_api(render_chart_prompt(prompt_inputs))
+        response.headers["X-LLM-Cache"] = cache_status
         
         # Parse AI response
         try:
@@ -417,18 +1016,24 @@ async def get_chart_suggestions(request: DataRequest):
                     detail="Failed to parse chart suggestions from AI response"
                 )
         
-        # Include processed data for charts that need aggregation
-        processed_data = None
-        if processed_row_count < original_row_count:
-            processed_data = viz_df.to_dict('records')
-        
-        return ChartsResponse(
-            suggestions=suggestions,
-            columnInfo=column_info,
-            processedData=processed_data,
-            originalRowCount=original_row_count,
-            processedRowCount=processed_row_count
-        )
+        if cache_status != "hit":
+            await store_llm_response(cache_key, ai_response)
+        
+        # Chart-ready rows for every suggestion, so the client does not aggregate the full dataset
+        suggestions = await run_cpu(attach_chart_series, df, suggestions)
+        
+        # Include processed data for charts that need aggregation; it is serialized with the response
+        processed_data = viz_df if processed_row_count < original_row_count else None
+        
+        return {
+            "suggestions": suggestions,
+            "columnInfo": column_info,
+            "processedData": processed_data,
+            "originalRowCount": original_row_count,
+            "processedRowCount": processed_row_count,
+            "duplicateRows": dataset.duplicate_rows,
+            "datasetId": dataset.dataset_id,
+        }
         
     except HTTPException:
         raise
@@ -436,52 +1041,77 @@ async def get_chart_suggestions(request: DataRequest):
         logger.error(f"Error in chart suggestions endpoint: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
+class OptimizeRequest(DataRequest):
+    chartType: Optional[str] = None
+    xAxis: Optional[str] = None
+    yAxis: Optional[List[str]] = None
+    maxPoints: int = DEFAULT_MAX_POINTS
+    method: Optional[str] = None
+
 class OptimizedDataResponse(BaseModel):
-    data: List[Dict[str, Any]]
+    data: Union[List[Dict[str, Any]], Dict[str, List[Any]]]
     originalRowCount: int
     optimizedRowCount: int
     aggregationMethod: str
+    duplicateRows: int = 0
+    datasetId: Optional[str] = None
 
 @app.post("/api/data/optimize", response_model=OptimizedDataResponse)
-async def optimize_data_for_chart(request: DataRequest):
+async def optimize_data_for_chart(request: OptimizeRequest, orient: str = "records", stream: bool = False):
     """
     Return optimized data specifically for cleaner chart visualization.
+    
+    Line charts are downsampled with Largest-Triangle-Three-Buckets and area
+    and scatter charts with min/max per bucket, so peaks and outliers are
+    kept; other chart types are aggregated. Pass method ("lttb", "minmax" or
+    "aggregate") to override the choice for chartType, xAxis/yAxis to pick
+    the series (default: first date column against every numeric column)
+    and maxPoints to set the size of the result. data holds row objects, or
+    one array per column with ?orient=columns; ?stream=true sends NDJSON with
+    the other fields on the first line and the rows after it.
     """
     try:
-        # Validate input
-        if not request.data:
-            raise HTTPException(status_code=400, detail="Data cannot be empty")
+        check_orient(orient)
+        if not 3 <= request.maxPoints <= MAX_POINTS_LIMIT:
+            raise HTTPException(status_code=400, detail=f"maxPoints must be between 3 and {MAX_POINTS_LIMIT}")
+        method = request.method or CHART_METHODS.get(request.chartType or "", "aggregate")
+        if method not in DOWNSAMPLE_METHODS + ("aggregate",):
+            raise HTTPException(status_code=400, detail=f"Unknown optimization method '{method}'")
         
-        # Preprocess data
-        df = preprocess_data(request.data)
+        # Preprocess data (or reuse the cached result for the same upload)
+        dataset = await load_dataset(request)
+        df = dataset.df
         original_count = len(df)
         
-        if df.empty:
-            raise HTTPException(status_code=400, detail="No valid data after preprocessing")
-        
-        # Optimize for visualization
-        optimized_df = aggregate_data_for_visualization(df, max_points=50)
+        if method == "aggregate":
+            # Optimize for visualization, reusing the cached result at the default size
+            if request.maxPoints == DEFAULT_MAX_POINTS:
+                optimized_df = dataset.viz_df
+            else:
+                optimized_df = await run_cpu(aggregate_data_for_visualization, df, request.maxPoints)
+            method = await run_cpu(aggregation_method, df)
+        else:
+            _, date_cols, numeric_cols = visualization_columns(df)
+            x_axis = request.xAxis or (date_cols[0] if date_cols else None)
+            y_axis = request.yAxis or [col for col in numeric_cols if col != x_axis]
+            try:
+                optimized_df = await run_cpu(downsample, df, x_axis, y_axis, request.maxPoints, method)
+            except ValueError as e:
+                raise HTTPException(status_code=400, detail=str(e))
         optimized_count = len(optimized_df)
         
         # Determine aggregation method used
-        method = "none"
-        if optimized_count < original_count:
-            date_cols = [col for col in df.columns if get_column_type(df[col]) == "date"]
-            categorical_cols = [col for col in df.columns if get_column_type(df[col]) == "categorical" and df[col].nunique() <= 20]
-            
-            if date_cols:
-                method = "time_aggregation"
-            elif categorical_cols:
-                method = "categorical_aggregation"
-            else:
-                method = "statistical_sampling"
+        if optimized_count >= original_count:
+            method = "none"
         
-        return OptimizedDataResponse(
-            data=optimized_df.to_dict('records'),
-            originalRowCount=original_count,
-            optimizedRowCount=optimized_count,
-            aggregationMethod=method
-        )
+        return await frame_response({
+            "data": optimized_df,
+            "originalRowCount": original_count,
+            "optimizedRowCount": optimized_count,
+            "aggregationMethod": method,
+            "duplicateRows": dataset.duplicate_rows,
+            "datasetId": dataset.dataset_id,
+        }, orient, stream_key="data" if stream else None)
         
     except HTTPException:
         raise
@@ -490,26 +1120,37 @@ async def optimize_data_for_chart(request: DataRequest):
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
 @app.post("/api/insights", response_model=InsightsResponse)
-async def get_insights(request: DataRequest):
+async def get_insights(
+    request: DataRequest,
+    response: Response,
+    cache_bypass: Optional[str] = Header(None, alias=LLM_CACHE_BYPASS_HEADER)
+):
     """
     Generate AI-powered textual insights from the provided data.
+    
+    Answers are cached per dataset; send X-LLM-Cache-Bypass: 1 to ask the
+    model again.
     """
     try:
-        # Validate input
-        if not request.data:
-            raise HTTPException(status_code=400, detail="Data cannot be empty")
-        
-        # Preprocess data
-        df = preprocess_data(request.data)
-        
-        if df.empty:
-            raise HTTPException(status_code=400, detail="No valid data after preprocessing")
+        # Preprocess data (or reuse the cached result for the same upload)
+        dataset = await load_dataset(request)
         
         # Generate insights using AI
-        prompt = create_insights_prompt(df)
-        insights_text = await call_gemini_api(prompt)
+        # The digest is derived from the cleaned dataset, which the dataset id identifies, and its size budget
+        cache_key = fingerprint_prompt_inputs("insights", GEMINI_MODEL, {
+            "dataset": dataset.dataset_id,
+            "digestBudget": INSIGHTS_DIGEST_BUDGET_BYTES,
+        })
+        bypass = wants_cache_bypass(cache_bypass)
+        insights_text = await lookup_llm_cache(cache_key, bypass)
+        cache_status = "hit" if insights_text is not None else "bypass" if bypass else "miss"
+        if insights_text is None:
+            prompt = await run_cpu(create_insights_prompt, dataset.df, INSIGHTS_DIGEST_BUDGET_BYTES)
+            insights_text = await call_gemini_api(prompt)
+            await store_llm_response(cache_key, insights_text)
+        response.headers["X-LLM-Cache"] = cache_status
         
-        return InsightsResponse(insights=insights_text)
+        return InsightsResponse(insights=insights_text, duplicateRows=dataset.duplicate_rows, datasetId=dataset.dataset_id)
         
     except HTTPException:
         raise
@@ -517,6 +1158,175 @@ async def get_insights(request: DataRequest):
         logger.error(f"Error in insights endpoint: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
+@app.post("/api/datasets", response_model=DatasetResponse)
+async def upload_dataset(request: DataRequest):
+    """
+    Clean and store a dataset once, returning an id for the dataset endpoints.
+    """
+    try:
+        dataset = await ingest_records(request.data, request.dedupColumns)
+        return await store_dataset(dataset)
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error in dataset upload endpoint: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
+
+@app.post("/api/datasets/import", response_model=DatasetResponse)
+async def import_dataset(
+    request: Request,
+    stream: Optional[bool] = None,
+    dedup_columns: Optional[List[str]] = Query(None, alias="dedupColumns")
+):
+    """
+    Store a dataset sent as raw CSV, columnar JSON, Arrow IPC or Parquet.
+    
+    The body is parsed column-wise by pandas/pyarrow readers, skipping
+    per-row pydantic validation. The format is taken from the Content-Type
+    header (text/csv, application/json, application/vnd.apache.arrow.stream,
+    application/vnd.apache.arrow.file or application/vnd.apache.parquet).
+    Pass ?stream=true to force chunked preprocessing for smaller bodies, and
+    repeat ?dedupColumns=name to detect duplicate rows by those columns only.
+    """
+    body = None
+    try:
+        content_type = request.headers.get("content-type", "")
+        body, fingerprint = await spool_upload(request, content_type)
+        dataset = await ingest_body(body, fingerprint, content_type, stream, dedup_columns)
+        return await store_dataset(dataset)
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error in dataset import endpoint: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
+    finally:
+        if isinstance(body, str):
+            os.unlink(body)
+
+@app.post("/api/datasets/{dataset_id}/suggestions", response_model=ChartsResponse)
+async def get_dataset_chart_suggestions(
+    dataset_id: str,
+    response: Response,
+    cache_bypass: Optional[str] = Header(None, alias=LLM_CACHE_BYPASS_HEADER),
+    orient: str = "records",
+    stream: bool = False
+):
+    """Chart suggestions for an uploaded dataset."""
+    return await get_chart_suggestions(DataRequest(datasetId=dataset_id), response, cache_bypass, orient, stream)
+
+@app.post("/api/datasets/{dataset_id}/optimize", response_model=OptimizedDataResponse)
+async def optimize_dataset_for_chart(
+    dataset_id: str,
+    options: Optional[OptimizeRequest] = None,
+    orient: str = "records",
+    stream: bool = False
+):
+    """Visualization-optimized data for an uploaded dataset; the optional body takes the same chart options."""
+    options = options or OptimizeRequest()
+    request = options.model_copy(update={"datasetId": dataset_id, "data": None})
+    return await optimize_data_for_chart(request, orient, stream)
+
+@app.post("/api/datasets/{dataset_id}/insights", response_model=InsightsResponse)
+async def get_dataset_insights(
+    dataset_id: str,
+    response: Response,
+    cache_bypass: Optional[str] = Header(None, alias=LLM_CACHE_BYPASS_HEADER)
+):
+    """AI insights for an uploaded dataset."""
+    return await get_insights(DataRequest(datasetId=dataset_id), response, cache_bypass)
+
+@app.post("/api/datasets/{dataset_id}/query", response_model=FilterQueryResponse)
+async def query_dataset(
+    dataset_id: str,
+    request: FilterQueryRequest,
+    response: Response,
+    cache_bypass: Optional[str] = Header(None, alias=LLM_CACHE_BYPASS_HEADER)
+):
+    """
+    Chart series and column statistics for a filtered view of an uploaded dataset.
+    
+    Filters map a column to the value (or list of values) to keep. Series are
+    re-aggregated from group-level partials built once per dataset, falling
+    back to filtering the cleaned rows for charts the partials cannot answer.
+    The chart suggestions sent with the request are reused; they are only
+    regenerated when they are missing or refer to columns the dataset does
+    not have (schemaChanged).
+    """
+    try:
+        dataset = await get_dataset(dataset_id)
+        df = dataset.df
+        
+        suggestions = [
+            {k: v for k, v in s.items() if k not in ("data", "aggregation")}
+            for s in request.suggestions or []
+        ]
+        schema_changed = any(
+            col not in df.columns for s in suggestions for col in suggestion_columns(s)
+        )
+        if not suggestions or schema_changed:
+            charts = await suggest_charts(DataRequest(datasetId=dataset_id), response, cache_bypass)
+            suggestions = [
+                {k: v for k, v in s.items() if k not in ("data", "aggregation")}
+                for s in charts["suggestions"]
+            ]
+        
+        cube = dataset.filter_cube
+        if cube is None:
+            cube = await run_cpu(FilterCube, df)
+            dataset_cache.attach_filter_cube(dataset, cube)
+        try:
+            result = await run_cpu(query_filtered, cube, request.filters, suggestions)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        
+        return await frame_response({"datasetId": dataset_id, "schemaChanged": schema_changed, **result}, response=response)
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error in dataset query endpoint: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
+
+@app.get("/metrics")
+async def get_metrics():
+    """
+    Prometheus metrics: per-stage and per-route latency histograms, stage peak memory
+    (with METRICS_TRACE_MEMORY) and cache, compaction, worker pool and Gemini client counters.
+    """
+    datasets = dataset_cache.stats()
+    responses = llm_cache.stats()
+    workers = cpu_pool.stats()
+    gemini = gemini_client.stats()
+    compaction = compaction_stats.stats()
+    return PlainTextResponse(metrics.render({
+        "chartly_dataset_cache_bytes": ("gauge", "Bytes of cleaned datasets held in memory.", datasets["bytes"]),
+        "chartly_dataset_cache_entries": ("gauge", "Cleaned datasets held in memory.", datasets["entries"]),
+        "chartly_dataset_cache_hits_total": ("counter", "Dataset cache hits.", datasets["hits"]),
+        "chartly_dataset_cache_misses_total": ("counter", "Dataset cache misses.", datasets["misses"]),
+        "chartly_llm_cache_hits_total": ("counter", "LLM response cache hits.", responses["hits"]),
+        "chartly_llm_cache_misses_total": ("counter", "LLM response cache misses.", responses["misses"]),
+        "chartly_compaction_bytes_before_total": ("counter", "Bytes of cleaned frames before dtype compaction.", compaction["bytesBefore"]),
+        "chartly_compaction_bytes_after_total": ("counter", "Bytes of cleaned frames after dtype compaction.", compaction["bytesAfter"]),
+        "chartly_workers_in_flight": ("gauge", "CPU jobs running or queued.", workers["inFlight"]),
+        "chartly_workers_rejected_total": ("counter", "CPU jobs rejected with 503.", workers["rejected"]),
+        "chartly_gemini_in_flight": ("gauge", "Gemini calls in progress.", gemini["inFlight"]),
+        "chartly_gemini_calls_total": ("counter", "Gemini calls made.", gemini["calls"]),
+        "chartly_gemini_failures_total": ("counter", "Gemini calls that failed after retries.", gemini["failures"]),
+    }), media_type=PROMETHEUS_CONTENT_TYPE)
+
+@app.get("/api/cache/stats")
+async def get_cache_stats():
+    """Report dataset and LLM response cache occupancy, hit/miss counters, memory saved by compaction, worker pool and Gemini client load."""
+    return {
+        "datasets": dataset_cache.stats(),
+        "compaction": compaction_stats.stats(),
+        "llmResponses": llm_cache.stats(),
+        "workers": cpu_pool.stats(),
+        "gemini": gemini_client.stats(),
+    }
+
 if __name__ == "__main__":
     port = int(os.environ.get("PORT", 8000))
     uvicorn.run(app, host="0.0.0.0", port=port)
\ No newline at end of file
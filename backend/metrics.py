@@ -0,0 +1,252 @@
+import cProfile
+import logging
+import os
+import pstats
+import re
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+logger = logging.getLogger(__name__)
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+PROFILE_HEADER = "X-Profile"
+
+DURATION_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+MEMORY_BUCKETS = tuple(float(4 ** power) for power in range(8, 17))   # 64 KB to 4 GB
+
+def _format_value(value: float) -> str:
+    if value == float('inf'):
+        return "+Inf"
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _labels(names: Tuple[str, ...], values: Tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+class Histogram:
+    """Thread-safe Prometheus histogram with cumulative buckets per label set."""
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...], buckets: Tuple[float, ...]):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self.buckets = tuple(sorted(buckets))
+        self._series: Dict[Tuple[str, ...], List[float]] = {}   # labels -> bucket counts, then sum and count
+        self._lock = threading.Lock()
+
+    def observe(self, labels: Tuple[str, ...], value: float) -> None:
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [0.0] * (len(self.buckets) + 2)
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            series = {labels: list(values) for labels, values in sorted(self._series.items())}
+        for labels, values in series.items():
+            for bound, count in zip(self.buckets + (float('inf'),), values[:-2] + [values[-1]]):
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_labels(self.labelnames, labels, le)} {_format_value(count)}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, labels)} {_format_value(values[-2])}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, labels)} {_format_value(values[-1])}")
+        return lines
+
+class RequestTimings:
+    """Stage durations of one request, and its profiles when the request asked to be profiled."""
+
+    def __init__(self, profile: bool = False):
+        self.stages: Dict[str, float] = {}
+        self.profile = profile
+        self.profiles: List[cProfile.Profile] = []
+
+    def add(self, stage: str, seconds: float) -> None:
+        self.stages[stage] = self.stages.get(stage, 0.0) + seconds
+
+    def server_timing(self) -> str:
+        """Server-Timing header value with the milliseconds spent in each stage."""
+        return ", ".join(f"{stage};dur={seconds * 1000:.1f}" for stage, seconds in self.stages.items())
+
+    def profiled(self, func: Callable[..., Any]) -> Callable[..., Any]:
+        """Wrap func so each call is recorded with cProfile into this request's profiles."""
+        if not self.profile:
+            return func
+
+        def run(*args, **kwargs):
+            profiler = cProfile.Profile()
+            try:
+                profiler.enable()
+            except ValueError:  # another profiler is active (Python 3.12+ allows one per process)
+                return func(*args, **kwargs)
+            try:
+                return func(*args, **kwargs)
+            finally:
+                profiler.disable()
+                self.profiles.append(profiler)
+        return run
+
+_current_request: ContextVar[Optional[RequestTimings]] = ContextVar("chartly_request_timings", default=None)
+
+def current_request() -> Optional[RequestTimings]:
+    """Timings of the request being handled, or None outside MetricsMiddleware."""
+    return _current_request.get()
+
+def profiled(func: Callable[..., Any]) -> Callable[..., Any]:
+    """func, recorded with cProfile when the current request is being profiled."""
+    timings = current_request()
+    return timings.profiled(func) if timings else func
+
+class MetricsRegistry:
+    """
+    Per-stage latency and memory histograms, plus per-route request latency.
+
+    Stage peak memory is measured with tracemalloc when trace_memory is set.
+    Tracing slows down allocation-heavy Python code considerably, and the peak
+    covers every thread, so concurrent requests inflate each other's numbers.
+    """
+
+    def __init__(self, trace_memory: bool = False):
+        self.trace_memory = trace_memory
+        self.stage_seconds = Histogram(
+            "chartly_stage_duration_seconds", "Time spent in each pipeline stage.", ("stage",), DURATION_BUCKETS)
+        self.stage_memory = Histogram(
+            "chartly_stage_peak_memory_bytes", "Peak Python memory allocated during each pipeline stage.", ("stage",), MEMORY_BUCKETS)
+        self.request_seconds = Histogram(
+            "chartly_request_duration_seconds", "Time to handle each request, by route.", ("method", "route", "status"), DURATION_BUCKETS)
+        if trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """Time the enclosed block as stage name, for the histograms and the current request."""
+        before = 0
+        if self.trace_memory:
+            before = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            self.stage_seconds.observe((name,), elapsed)
+            if self.trace_memory:
+                self.stage_memory.observe((name,), max(tracemalloc.get_traced_memory()[1] - before, 0))
+            timings = current_request()
+            if timings is not None:
+                timings.add(name, elapsed)
+
+    def timed_iterator(self, name: str, iterable: Iterable[Any]) -> Iterator[Any]:
+        """Yield from iterable, recording the time spent producing items as stage name."""
+        iterator = iter(iterable)
+        elapsed = 0.0
+        try:
+            while True:
+                start = time.perf_counter()
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    break
+                finally:
+                    elapsed += time.perf_counter() - start
+                yield item
+        finally:
+            self.stage_seconds.observe((name,), elapsed)
+
+    def render(self, gauges: Optional[Dict[str, Tuple[str, str, float]]] = None) -> str:
+        """
+        Prometheus text exposition of every histogram.
+
+        Args:
+            gauges: Extra samples as name -> (type, help text, value)
+        """
+        lines = []
+        for histogram in (self.stage_seconds, self.stage_memory, self.request_seconds):
+            lines.extend(histogram.render())
+        for name, (kind, documentation, value) in (gauges or {}).items():
+            lines.extend([f"# HELP {name} {documentation}", f"# TYPE {name} {kind}", f"{name} {_format_value(value)}"])
+        return "\n".join(lines) + "\n"
+
+class MetricsMiddleware:
+    """
+    Record request latency per route and expose stage timings to the endpoints.
+
+    With server_timing, responses carry a Server-Timing header listing the
+    stages that finished before the response started. With profile_dir set,
+    requests sending "X-Profile: 1" run their CPU stages under cProfile; when
+    such a request takes at least profile_threshold_ms, the combined profile
+    is written to profile_dir as a .prof file (open with pstats or snakeviz).
+
+    Args:
+        app: ASGI application
+        registry: Histograms to record into
+        server_timing: Add Server-Timing headers to responses
+        profile_dir: Directory for profiles of slow requests, or None to ignore X-Profile
+        profile_threshold_ms: Smallest request duration worth writing a profile for
+    """
+
+    def __init__(self, app: ASGIApp, registry: MetricsRegistry, server_timing: bool = False,
+                 profile_dir: Optional[str] = None, profile_threshold_ms: float = 1000):
+        self.app = app
+        self.registry = registry
+        self.server_timing = server_timing
+        self.profile_dir = profile_dir
+        self.profile_threshold_ms = profile_threshold_ms
+        if profile_dir:
+            os.makedirs(profile_dir, exist_ok=True)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        profile = bool(self.profile_dir) and Headers(scope=scope).get(PROFILE_HEADER, "").strip().lower() in ("1", "true", "yes")
+        timings = RequestTimings(profile=profile)
+        token = _current_request.set(timings)
+        start = time.perf_counter()
+        status = 500
+
+        async def send_with_timing(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if self.server_timing:
+                    timings.add("total", time.perf_counter() - start)
+                    MutableHeaders(scope=message).append("Server-Timing", timings.server_timing())
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current_request.reset(token)
+            elapsed = time.perf_counter() - start
+            route = getattr(scope.get("route"), "path", "unmatched")
+            self.registry.request_seconds.observe((scope["method"], route, str(status)), elapsed)
+            if timings.profiles and elapsed * 1000 >= self.profile_threshold_ms:
+                self.write_profile(timings, scope["method"], route, elapsed)
+
+    def write_profile(self, timings: RequestTimings, method: str, route: str, elapsed: float) -> None:
+        """Merge a request's profiles into one .prof file named after the route and duration."""
+        slug = re.sub(r"[^A-Za-z0-9]+", "-", route).strip("-") or "root"
+        path = os.path.join(self.profile_dir, f"{time.strftime('%Y%m%d-%H%M%S')}-{method}-{slug}-{elapsed * 1000:.0f}ms.prof")
+        stats = pstats.Stats(timings.profiles[0])
+        for profiler in timings.profiles[1:]:
+            stats.add(profiler)
+        stats.dump_stats(path)
+        logger.warning(f"Slow request {method} {route} took {elapsed * 1000:.0f} ms; profile written to {path}")
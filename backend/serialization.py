@@ -0,0 +1,109 @@
+from typing import Any, Dict, Iterator, List, Union
+
+import numpy as np
+import orjson
+import pandas as pd
+from pydantic import BaseModel
+
+ORIENTS = ('records', 'columns')
+JSON_MEDIA_TYPE = "application/json"
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+NDJSON_CHUNK_ROWS = 5000
+
+# NaN and infinities come out as null; numpy arrays and scalars are written natively
+ORJSON_OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+def _datetime_strings(series: pd.Series) -> np.ndarray:
+    """ISO 8601 strings as datetime.isoformat() writes them, with None for missing dates."""
+    if series.dt.tz is not None:
+        return np.array([None if pd.isna(v) else v.isoformat() for v in series], dtype=object)
+    values = series.to_numpy(dtype='datetime64[ns]')
+    missing = np.isnat(values)
+    nanos = values[~missing].astype('int64')
+    unit = 's' if (nanos % 1_000_000_000 == 0).all() else 'us' if (nanos % 1000 == 0).all() else 'ns'
+    strings = np.datetime_as_string(values, unit=unit).astype(object)
+    strings[missing] = None
+    return strings
+
+def column_values(series: pd.Series) -> np.ndarray:
+    """
+    One column as an array orjson can write directly.
+
+    Plain numeric and boolean columns stay numpy arrays; dates become ISO
+    strings and everything else Python objects, with missing values as None.
+    """
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return _datetime_strings(series)
+    if isinstance(series.dtype, np.dtype) and series.dtype.kind in 'iufb':
+        # orjson only writes C-contiguous arrays natively; a column of a 2-D block is strided
+        return np.ascontiguousarray(series.to_numpy())
+    return series.astype(object).where(series.notna(), None).to_numpy()
+
+def frame_payload(df: pd.DataFrame, orient: str = 'records') -> Union[List[Dict[str, Any]], Dict[str, Any]]:
+    """
+    JSON-ready form of a DataFrame without going through to_dict.
+
+    Args:
+        df: Frame to serialize
+        orient: 'records' for a list of row objects (the to_dict('records')
+            layout) or 'columns' for one array per column
+
+    Returns:
+        List of row dicts, or a dict of column name -> array
+    """
+    if orient not in ORIENTS:
+        raise ValueError(f"Unknown orient '{orient}'. Supported: {', '.join(ORIENTS)}")
+    names = [str(col) for col in df.columns]
+    columns = [column_values(df.iloc[:, i]) for i in range(df.shape[1])]
+    if orient == 'columns':
+        return dict(zip(names, columns))
+    return [dict(zip(names, row)) for row in zip(*(values.tolist() for values in columns))]
+
+def _default(obj: Any) -> Any:
+    """Types orjson does not know natively."""
+    if obj is pd.NaT:
+        return None
+    if isinstance(obj, pd.Timestamp):
+        return obj.isoformat()
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if isinstance(obj, np.ndarray):
+        # Object arrays and dtypes orjson has no native writer for
+        return obj.tolist()
+    if isinstance(obj, pd.DataFrame):
+        return frame_payload(obj)
+    if isinstance(obj, BaseModel):
+        return obj.model_dump()
+    return str(obj)
+
+def dumps(content: Any, orient: str = 'records') -> bytes:
+    """Serialize content to JSON bytes, writing any DataFrame in it with the given orient."""
+    def default(obj: Any) -> Any:
+        if isinstance(obj, pd.DataFrame):
+            return frame_payload(obj, orient)
+        return _default(obj)
+    return orjson.dumps(content, default=default, option=ORJSON_OPTIONS)
+
+def ndjson_lines(content: Dict[str, Any], rows_key: str, orient: str = 'records',
+                 chunk_rows: int = NDJSON_CHUNK_ROWS) -> Iterator[bytes]:
+    """
+    Newline-delimited JSON for a response body holding a DataFrame under rows_key.
+
+    The first line is the body without rows_key. Then come the rows, one
+    object per row, or with orient='columns' one object of column arrays per
+    chunk of up to chunk_rows rows. Rows are serialized a chunk at a time, so
+    the first bytes go out before the whole frame is converted.
+    """
+    frame = content.get(rows_key)
+    yield dumps({key: value for key, value in content.items() if key != rows_key}) + b"\n"
+    if frame is None:
+        return
+    for start in range(0, len(frame), chunk_rows):
+        payload = frame_payload(frame.iloc[start:start + chunk_rows], orient)
+        if orient == 'columns':
+            yield orjson.dumps(payload, default=_default, option=ORJSON_OPTIONS | orjson.OPT_APPEND_NEWLINE)
+        else:
+            yield b"".join(
+                orjson.dumps(row, default=_default, option=ORJSON_OPTIONS | orjson.OPT_APPEND_NEWLINE)
+                for row in payload
+            )
@@ -0,0 +1,341 @@
+import logging
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from inference import (
+    CATEGORY_MAX_UNIQUE,
+    CATEGORY_UNIQUE_RATIO,
+    DATETIME_RATIO,
+    MISSING_NUMERIC_RATIO,
+    NUMERIC_RATIO,
+    ColumnProfile,
+    apply_profiles,
+    detect_datetime_format,
+    parse_datetime,
+    parse_numeric,
+)
+
+logger = logging.getLogger(__name__)
+
+MISSING_COLUMN_RATIO = 0.6    # columns with more missing values than this are dropped
+TOP_K = 256                   # counters kept per column for the approximate mode
+DISTINCT_SKETCH_SIZE = 1024   # hashes kept per column for the distinct-count estimate
+PROBE_ROWS = 1000             # rows read up front to estimate bytes per row
+
+# A callable that opens a fresh pass over the input in chunks of the given size
+ChunkOpener = Callable[[int], Iterator[pd.DataFrame]]
+
+class TopKCounter:
+    """
+    Mergeable Misra-Gries summary of the most frequent values.
+
+    Counts are exact while a column has at most `capacity` distinct values;
+    beyond that they are lower bounds and the heaviest values are kept.
+    """
+
+    def __init__(self, capacity: int = TOP_K):
+        self.capacity = capacity
+        self.counts = pd.Series(dtype='int64')
+
+    def update(self, values: pd.Series) -> None:
+        chunk_counts = values.value_counts(dropna=True)
+        if chunk_counts.empty:
+            return
+        merged = self.counts.add(chunk_counts, fill_value=0) if not self.counts.empty else chunk_counts
+        if len(merged) > self.capacity:
+            merged = merged.sort_values(ascending=False)
+            merged = merged.iloc[:self.capacity] - merged.iloc[self.capacity]
+            merged = merged[merged > 0]
+        self.counts = merged.astype('int64')
+
+    def mode(self) -> Optional[Any]:
+        """Most frequent value, breaking ties by the smallest value like Series.mode()."""
+        if self.counts.empty:
+            return None
+        top = self.counts[self.counts == self.counts.max()]
+        try:
+            return sorted(top.index)[0]
+        except TypeError:
+            return top.index[0]
+
+    def values(self) -> List[Any]:
+        return list(self.counts.index)
+
+class DistinctSketch:
+    """K-minimum-values sketch estimating the number of distinct values."""
+
+    def __init__(self, size: int = DISTINCT_SKETCH_SIZE):
+        self.size = size
+        self.hashes = np.empty(0, dtype=np.uint64)
+
+    def update(self, values: pd.Series) -> None:
+        values = values.dropna()
+        if values.empty:
+            return
+        if pd.api.types.is_numeric_dtype(values) and not pd.api.types.is_bool_dtype(values):
+            # Chunks of the same column may arrive as int or float
+            values = values.astype('float64')
+        hashes = pd.util.hash_pandas_object(values, index=False).to_numpy()
+        self.hashes = np.unique(np.concatenate([self.hashes, hashes]))[:self.size]
+
+    def estimate(self) -> int:
+        if len(self.hashes) < self.size:
+            return len(self.hashes)
+        kth = float(self.hashes[-1]) / float(np.iinfo(np.uint64).max)
+        return int((self.size - 1) / kth)
+
+class ColumnStats:
+    """Statistics for one column gathered incrementally over chunks."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.rows = 0
+        self.null_count = 0
+        self.numeric_count = 0
+        self.numeric_sum = 0.0
+        self.all_whole = True
+        self.datetime_format: Optional[str] = None
+        self.datetime_checked = False
+        self.datetime_count = 0
+        self.top_k = TopKCounter()
+        self.distinct = DistinctSketch()
+
+    def update(self, series: pd.Series) -> None:
+        self.rows += len(series)
+        self.null_count += int(series.isna().sum())
+
+        numeric = parse_numeric(series).dropna()
+        self.numeric_count += len(numeric)
+        if len(numeric):
+            numeric = numeric.astype('float64')
+            self.numeric_sum += float(numeric.sum())
+            self.all_whole = self.all_whole and bool(np.isfinite(numeric).all() and (np.mod(numeric, 1) == 0).all())
+
+        if not self.datetime_checked and series.notna().any():
+            # The first chunk with values decides the format, like the sample does
+            self.datetime_checked = True
+            if not pd.api.types.is_numeric_dtype(series):
+                self.datetime_format = detect_datetime_format(series)
+        if self.datetime_format is not None or pd.api.types.is_datetime64_any_dtype(series):
+            self.datetime_count += int(self._as_datetime(series).notna().sum())
+
+        self.top_k.update(series)
+        self.distinct.update(series)
+
+    def _as_datetime(self, series: pd.Series) -> pd.Series:
+        if pd.api.types.is_datetime64_any_dtype(series):
+            return series
+        return parse_datetime(series, self.datetime_format)
+
+    def to_profile(self) -> ColumnProfile:
+        """Turn the gathered statistics into the profile the cleaning pipeline applies."""
+        n = self.rows
+        non_null = n - self.null_count
+        unique_count = self.distinct.estimate()
+
+        fill_strategy, fill_value = None, None
+        fill_is_numeric = fill_is_datetime = False
+        if self.null_count > 0:
+            if non_null and self.numeric_count / non_null > MISSING_NUMERIC_RATIO:
+                fill_strategy, fill_value = 'mean', self.numeric_sum / self.numeric_count
+            else:
+                fill_value = self.top_k.mode()
+                if fill_value is not None:
+                    fill_strategy = 'mode'
+                    fill_sample = pd.Series([fill_value])
+                    fill_is_numeric = bool(parse_numeric(fill_sample).notna().any())
+                    fill_is_datetime = bool(self._as_datetime(fill_sample).notna().any())
+                else:
+                    fill_strategy, fill_value = 'constant', "Unknown"
+
+        def make_profile(kind: str) -> ColumnProfile:
+            return ColumnProfile(
+                name=self.name,
+                kind=kind,
+                null_count=self.null_count,
+                numeric_count=self.numeric_count,
+                unique_count=unique_count,
+                fill_strategy=fill_strategy,
+                fill_value=fill_value,
+                datetime_format=self.datetime_format if kind == 'datetime' else None,
+            )
+
+        if fill_strategy == 'mean':
+            numeric_after_fill = n
+            fill_is_whole = float(fill_value).is_integer()
+        else:
+            numeric_after_fill = self.numeric_count + (self.null_count if fill_is_numeric else 0)
+            fill_is_whole = fill_strategy is None or float(pd.to_numeric(fill_value, errors='coerce')).is_integer()
+
+        if n and numeric_after_fill / n > NUMERIC_RATIO:
+            if numeric_after_fill == n and self.all_whole and fill_is_whole:
+                return make_profile('integer')
+            return make_profile('numeric')
+
+        datetime_count = self.datetime_count + (self.null_count if fill_is_datetime else 0)
+        if n and datetime_count / n > DATETIME_RATIO:
+            return make_profile('datetime')
+
+        if n and unique_count / n < CATEGORY_UNIQUE_RATIO and unique_count < CATEGORY_MAX_UNIQUE:
+            return make_profile('categorical')
+        return make_profile('text')
+
+class UnknownColumnsError(ValueError):
+    """Raised when duplicate detection is asked to compare columns the dataset does not have."""
+
+def check_dedup_columns(columns: List[Any], subset: Optional[List[str]]) -> None:
+    """Reject a duplicate-detection subset that names columns missing from the raw data."""
+    unknown = [col for col in subset or [] if col not in columns]
+    if unknown:
+        raise UnknownColumnsError(f"Unknown duplicate detection columns: {unknown}")
+
+class RowHashDeduplicator:
+    """
+    Drops rows whose 64-bit hash was already seen in this or an earlier chunk.
+
+    Each row is hashed once with pd.util.hash_pandas_object, over every
+    column (exact mode) or only the subset given. Passing the raw missing-value
+    mask makes the hash cover which values were imputed, so a row whose gap
+    was filled with the mean is not taken for a row that held that value.
+    """
+
+    def __init__(self, subset: Optional[List[str]] = None):
+        self.subset = list(subset) if subset else None
+        self.seen = np.empty(0, dtype=np.uint64)
+        self.duplicates = 0
+
+    def row_hashes(self, chunk: pd.DataFrame, missing: Optional[pd.DataFrame] = None) -> np.ndarray:
+        """64-bit hash of every row over the compared columns."""
+        columns = [col for col in self.subset if col in chunk.columns] if self.subset else list(chunk.columns)
+        hashes = pd.util.hash_pandas_object(chunk[columns], index=False).to_numpy(copy=True)
+        if missing is not None:
+            gaps = missing[columns].to_numpy(dtype=bool)
+            imputed = gaps.any(axis=1)
+            if imputed.any():
+                # Only rows with gaps change, so rows without any keep the same hash in every chunk
+                hashes[imputed] ^= pd.util.hash_pandas_object(pd.DataFrame(gaps[imputed]), index=False).to_numpy()
+        return hashes
+
+    def filter(self, chunk: pd.DataFrame, missing: Optional[pd.DataFrame] = None) -> pd.DataFrame:
+        """
+        Rows of chunk not seen before, in order.
+
+        Args:
+            chunk: Cleaned rows
+            missing: Raw missing-value mask of the same rows and columns, if imputation ran
+        """
+        hashes = self.row_hashes(chunk, missing)
+        duplicate = pd.Series(hashes).duplicated().to_numpy(copy=True)
+        if len(self.seen):
+            # seen stays sorted, so membership is a binary search instead of np.isin re-sorting it per chunk
+            positions = np.searchsorted(self.seen, hashes).clip(max=len(self.seen) - 1)
+            duplicate |= self.seen[positions] == hashes
+        self.duplicates += int(duplicate.sum())
+        self.seen = np.concatenate([self.seen, np.sort(hashes[~duplicate])])
+        # Timsort merges the two sorted runs in linear time
+        self.seen.sort(kind='stable')
+        return chunk[~duplicate]
+
+def new_deduplicator(subset: Optional[List[str]], kept: List[Any]) -> Optional[RowHashDeduplicator]:
+    """
+    Deduplicator over the subset columns that survived cleaning, or over whole rows without a subset.
+
+    Returns None when every subset column was dropped for missing values, as
+    there is nothing left to compare.
+    """
+    if not subset:
+        return RowHashDeduplicator()
+    remaining = [col for col in subset if col in kept]
+    if not remaining:
+        logger.warning(f"Skipping duplicate removal: columns {subset} were dropped for missing values")
+        return None
+    return RowHashDeduplicator(remaining)
+
+def rows_per_chunk(probe: pd.DataFrame, memory_limit: int) -> int:
+    """
+    Pick a chunk size so a raw chunk and its cleaned copies fit in the memory ceiling.
+
+    Cleaning holds the raw chunk, parsed intermediates and the cleaned chunk at
+    once, so a quarter of the ceiling is budgeted for the raw rows.
+    """
+    bytes_per_row = max(probe.memory_usage(deep=True).sum() / max(len(probe), 1), 1)
+    return max(PROBE_ROWS, int(memory_limit / 4 / bytes_per_row))
+
+def gather_stats(chunks: Iterator[pd.DataFrame]) -> Dict[str, ColumnStats]:
+    """First pass: collect per-column statistics without keeping any chunk."""
+    stats: Dict[str, ColumnStats] = {}
+    for chunk in chunks:
+        for col in chunk.columns:
+            if col not in stats:
+                stats[col] = ColumnStats(col)
+            stats[col].update(chunk[col])
+    return stats
+
+def stream_preprocess(
+    open_chunks: ChunkOpener,
+    memory_limit: int,
+    dedup_columns: Optional[List[str]] = None
+) -> Tuple[pd.DataFrame, Dict[str, ColumnProfile], int]:
+    """
+    Clean a dataset that is read in chunks, keeping at most one raw chunk in memory.
+
+    The input is read twice. The first pass gathers null counts, running sums
+    for means, top-k counters for modes, distinct-count sketches and datetime
+    formats. The second pass imputes and coerces each chunk with the
+    resulting profiles and drops duplicate rows by row hash, across chunks.
+
+    Only the raw side is bounded: the cleaned chunks are all kept and joined
+    at the end, so peak memory is about twice the cleaned DataFrame plus one
+    raw chunk and its intermediates.
+
+    Args:
+        open_chunks: Callable returning a new iterator of raw chunks of the given size
+        memory_limit: Memory ceiling in bytes for the raw chunk and its cleaning intermediates (not the result)
+        dedup_columns: Columns that identify a duplicate row, or None to compare whole rows
+
+    Returns:
+        Tuple of the cleaned DataFrame, the column profiles and the number of
+        duplicate rows removed
+    """
+    probe = next(open_chunks(PROBE_ROWS), None)
+    if probe is None or probe.empty:
+        raise ValueError("Data is empty")
+    chunk_rows = rows_per_chunk(probe, memory_limit)
+    logger.info(f"Streaming preprocessing in chunks of {chunk_rows} rows")
+
+    stats = gather_stats(open_chunks(chunk_rows))
+    check_dedup_columns(list(stats), dedup_columns)
+    total_rows = max(s.rows for s in stats.values())
+
+    # Remove columns with >60% missing values (columns absent from a chunk count as missing)
+    kept = [col for col, s in stats.items() if (s.null_count + total_rows - s.rows) / total_rows <= MISSING_COLUMN_RATIO]
+    dropped = [col for col in stats if col not in kept]
+    if dropped:
+        logger.info(f"Dropping columns with >60% missing values: {dropped}")
+
+    profiles = {col: stats[col].to_profile() for col in kept}
+    categories = {
+        col: pd.CategoricalDtype(sorted(stats[col].top_k.values(), key=str))
+        for col, profile in profiles.items() if profile.kind == 'categorical'
+    }
+
+    deduplicator = new_deduplicator(dedup_columns, kept)
+    cleaned_chunks = []
+    for chunk in open_chunks(chunk_rows):
+        chunk = chunk.reindex(columns=kept)
+        cleaned = apply_profiles(chunk, profiles)
+        for col, dtype in categories.items():
+            # Every chunk shares one set of categories so they concatenate as categoricals
+            cleaned[col] = cleaned[col].astype(object).astype(dtype)
+        if deduplicator:
+            cleaned = deduplicator.filter(cleaned, chunk.isna())
+        cleaned_chunks.append(cleaned)
+
+    df = pd.concat(cleaned_chunks, ignore_index=True)
+    duplicates = deduplicator.duplicates if deduplicator else 0
+    if duplicates:
+        logger.info(f"Removed {duplicates} duplicate rows")
+    logger.info(f"Final DataFrame shape: {df.shape}")
+    return df, profiles, duplicates
@@ -0,0 +1,73 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from main import aggregate_data_for_visualization, most_frequent_by_group
+
+def mode_by_group(df: pd.DataFrame, keys: pd.Series, columns):
+    """The per-group lambda most_frequent_by_group replaced."""
+    return pd.DataFrame({
+        col: df.groupby(keys, observed=True)[col].agg(lambda x: x.mode().iloc[0] if not x.mode().empty else np.nan)
+        for col in columns
+    })
+
+CASES = {
+    "ties go to the smallest value": pd.DataFrame({
+        "k": [1, 1, 2, 2, 2, 2, 3],
+        "v": ["b", "a", "z", "y", "y", "z", "q"],
+    }),
+    "numeric ties": pd.DataFrame({"k": [1, 1, 1, 2, 2], "v": [3.0, 1.0, 2.0, 5.0, 4.0]}),
+    "category order": pd.DataFrame({
+        "k": [1, 1, 2, 2, 2],
+        "v": pd.Categorical(["low", "high", "high", "low", "mid"], categories=["mid", "low", "high"]),
+    }),
+    "mixed object types": pd.DataFrame({
+        "k": [1, 1, 1, 2, 2, 3, 3],
+        "v": pd.Series([1, "a", "a", 2, "b", 7, "x"], dtype=object),
+    }),
+    "all-missing group": pd.DataFrame({
+        "k": [1, 1, 2, 2, 3],
+        "v": pd.Series([None, None, "x", None, np.nan], dtype=object),
+    }),
+    "unused key categories": pd.DataFrame({
+        "k": pd.Categorical(["a", "a", "b"], categories=["a", "b", "empty"]),
+        "v": ["x", "y", "y"],
+    }),
+}
+
+@pytest.mark.parametrize("case", CASES)
+def test_matches_series_mode(case):
+    df = CASES[case]
+    pd.testing.assert_frame_equal(
+        most_frequent_by_group(df, df["k"], ["v"]),
+        mode_by_group(df, df["k"], ["v"]),
+        check_dtype=False,
+        check_categorical=False,
+    )
+
+def sales(rows: int) -> pd.DataFrame:
+    rng = np.random.default_rng(0)
+    return pd.DataFrame({
+        "date": pd.Timestamp("2023-01-01") + pd.to_timedelta(rng.integers(0, 500, rows), unit="D"),
+        # Two values per group often tie, so the tie-breaking rule is exercised
+        "region": pd.Categorical(rng.choice(["West", "East"], rows), categories=["West", "East"]),
+        "channel": rng.choice(["online", "store", "phone"], rows),
+        "sales": rng.normal(100, 10, rows),
+    })
+
+def test_time_strategy_keeps_the_mode_of_each_period():
+    df = sales(2000)
+    aggregated = aggregate_data_for_visualization(df, 50)
+    periods = df["date"].dt.to_period("M")
+    expected = mode_by_group(df, periods, ["region", "channel"])
+    assert len(aggregated) == len(expected)
+    assert aggregated["date"].tolist() == expected.index.start_time.tolist()
+    for col in ("region", "channel"):
+        assert aggregated[col].astype(object).tolist() == expected[col].astype(object).tolist()
+
+def test_categorical_strategy_keeps_the_mode_of_each_category():
+    df = sales(2000).drop(columns="date")
+    aggregated = aggregate_data_for_visualization(df, 50).set_index("region")
+    expected = mode_by_group(df, df["region"], ["channel"])
+    assert aggregated["channel"].astype(object).to_dict() == expected["channel"].astype(object).to_dict()
+    assert aggregated["sales"].to_dict() == pytest.approx(df.groupby("region", observed=True)["sales"].mean().to_dict())
@@ -0,0 +1,57 @@
+import pickle
+
+import numpy as np
+import pandas as pd
+from fastapi.testclient import TestClient
+
+import main
+from compaction import CompactionStats, compact_frame, compact_series
+from dataset_cache import DatasetCache
+from dataset_store import ParquetDatasetStore
+
+RECORDS = [{"date": f"2024-01-{day:02d}", "region": ["North", "South"][day % 2], "sales": day * 10} for day in range(1, 29)]
+
+def test_integers_take_the_smallest_width_that_fits():
+    assert compact_series(pd.Series([0, 100, -5])).dtype == np.int8
+    assert compact_series(pd.Series([0, 40000])).dtype == np.int32
+
+def test_floats_are_narrowed_only_when_exact():
+    assert compact_series(pd.Series([0.5, 1.25, np.nan])).dtype == np.float32
+    assert compact_series(pd.Series([0.1, 0.2])).dtype == np.float64
+
+def test_repetitive_text_is_dictionary_encoded():
+    assert isinstance(compact_series(pd.Series(["a", "b", "a", "a"], dtype=object)).dtype, pd.CategoricalDtype)
+    assert not isinstance(compact_series(pd.Series(["a", "b", "c"], dtype=object)).dtype, pd.CategoricalDtype)
+
+def test_compaction_keeps_values_and_column_order():
+    df = pd.DataFrame({
+        "units": np.arange(1000),
+        "price": np.linspace(0, 10, 1000).round(1),
+        "region": np.array(["North", "South"] * 500, dtype=object),
+        "date": pd.date_range("2024-01-01", periods=1000, freq="D"),
+        "ratio": np.random.default_rng(0).random(1000),
+    })
+    compacted, report = compact_frame(df)
+    assert list(compacted.columns) == list(df.columns)
+    assert report.bytes_after < report.bytes_before
+    assert set(report.changes) == {"units", "region"}
+    for col in df.columns:
+        assert compacted[col].astype(object).tolist() == df[col].astype(object).tolist()
+
+def test_compaction_report_survives_a_process_worker():
+    df = main.compact_cleaned(pd.DataFrame({"units": np.arange(100)}))
+    report = pickle.loads(pickle.dumps(df)).attrs[main.COMPACTION_REPORT_ATTR]
+    assert report.bytes_after < report.bytes_before
+
+def test_compaction_bytes_are_counted(monkeypatch, tmp_path):
+    monkeypatch.setattr(main, "dataset_cache", DatasetCache())
+    monkeypatch.setattr(main, "compaction_stats", CompactionStats())
+    monkeypatch.setattr(main, "dataset_store", ParquetDatasetStore(str(tmp_path)))
+    client = TestClient(main.app)
+    dataset_id = client.post("/api/datasets", json={"data": RECORDS}).json()["datasetId"]
+    assert main.COMPACTION_REPORT_ATTR not in main.dataset_cache.get(dataset_id).df.attrs
+
+    stats = client.get("/api/cache/stats").json()["compaction"]
+    assert stats["frames"] == 1
+    assert 0 < stats["bytesAfter"] < stats["bytesBefore"]
+    assert f"chartly_compaction_bytes_after_total {stats['bytesAfter']}" in client.get("/metrics").text
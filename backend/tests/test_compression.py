@@ -0,0 +1,94 @@
+import gzip
+import zlib
+
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from fastapi.testclient import TestClient
+
+import compression
+from compression import CompressionMiddleware, accepted_encodings
+
+BODY = "row,value\n" * 500
+
+def make_client(**kwargs) -> TestClient:
+    app = FastAPI()
+    app.add_middleware(CompressionMiddleware, **kwargs)
+
+    @app.get("/large")
+    def large():
+        return PlainTextResponse(BODY)
+
+    @app.get("/small")
+    def small():
+        return PlainTextResponse("tiny")
+
+    @app.get("/stream")
+    def stream():
+        return StreamingResponse((f"{i}\n" * 400 for i in range(5)), media_type="application/x-ndjson")
+
+    @app.get("/encoded")
+    def encoded():
+        return PlainTextResponse(gzip.compress(BODY.encode()), headers={"Content-Encoding": "gzip"})
+
+    @app.get("/events")
+    def events():
+        return PlainTextResponse(BODY, media_type="text/event-stream")
+
+    return TestClient(app)
+
+def raw_get(client: TestClient, path: str, accept: str):
+    """Response without httpx decoding the body, so the encoded bytes can be checked."""
+    with client.stream("GET", path, headers={"Accept-Encoding": accept}) as response:
+        return response, b"".join(response.iter_raw())
+
+def test_accepted_encodings_ignores_refused_codings():
+    assert accepted_encodings("br;q=0, gzip;q=0.5, identity") == {"gzip", "identity"}
+    assert accepted_encodings(None) == set()
+
+def test_large_response_is_gzipped():
+    response, body = raw_get(make_client(), "/large", "gzip")
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert int(response.headers["content-length"]) == len(body)
+    assert gzip.decompress(body).decode() == BODY
+
+def test_small_and_unaccepted_responses_are_sent_as_is():
+    client = make_client()
+    response, body = raw_get(client, "/small", "gzip")
+    assert "content-encoding" not in response.headers and body == b"tiny"
+
+    response, body = raw_get(client, "/large", "identity")
+    assert "content-encoding" not in response.headers and body.decode() == BODY
+    assert response.headers["vary"] == "Accept-Encoding"
+
+def test_streamed_response_is_flushed_per_chunk():
+    response, body = raw_get(make_client(minimum_size=10), "/stream", "gzip")
+    assert response.headers["content-encoding"] == "gzip"
+    assert "content-length" not in response.headers
+    assert gzip.decompress(body).decode() == "".join(f"{i}\n" * 400 for i in range(5))
+
+def test_gzip_chunks_decode_before_the_stream_ends():
+    encoder = compression.GzipEncoder()
+    decoder = zlib.decompressobj(16 + zlib.MAX_WBITS)
+    assert decoder.decompress(encoder.compress(b"first chunk", more_body=True)) == b"first chunk"
+    assert decoder.decompress(encoder.compress(b"last", more_body=False)) == b"last"
+
+def test_encoded_and_excluded_responses_pass_through():
+    client = make_client()
+    response, body = raw_get(client, "/encoded", "gzip")
+    assert gzip.decompress(body).decode() == BODY
+
+    response, body = raw_get(client, "/events", "gzip")
+    assert "content-encoding" not in response.headers and body.decode() == BODY
+
+def test_brotli_is_preferred_when_installed():
+    brotli = pytest.importorskip("brotli")
+    response, body = raw_get(make_client(), "/large", "gzip, br")
+    assert response.headers["content-encoding"] == "br"
+    assert brotli.decompress(body).decode() == BODY
+
+def test_gzip_is_used_without_brotli(monkeypatch):
+    monkeypatch.setattr(compression, "brotli", None)
+    response, body = raw_get(make_client(), "/large", "gzip, br")
+    assert response.headers["content-encoding"] == "gzip"
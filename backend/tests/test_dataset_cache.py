@@ -0,0 +1,86 @@
+import pandas as pd
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+from dataset_cache import CachedDataset, DatasetCache, DatasetTooLargeError, fingerprint_records
+from dataset_store import ParquetDatasetStore
+
+RECORDS = [{"date": f"2024-01-{day:02d}", "region": ["North", "South"][day % 2], "sales": day * 10} for day in range(1, 29)]
+
+def entry(dataset_id: str, nbytes: int) -> CachedDataset:
+    df = pd.DataFrame({"a": [1]})
+    return CachedDataset(dataset_id=dataset_id, df=df, profiles={}, viz_df=df, nbytes=nbytes)
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(main, "dataset_cache", DatasetCache())
+    return TestClient(main.app)
+
+def test_least_recently_used_entry_is_evicted_first():
+    cache = DatasetCache(max_entries=2)
+    cache.put(entry("a", 10))
+    cache.put(entry("b", 10))
+    cache.get("a")
+    cache.put(entry("c", 10))
+    assert cache.get("b") is None
+    assert cache.get("a") is not None and cache.get("c") is not None
+    assert cache.evictions == 1
+
+def test_entries_are_evicted_to_stay_within_max_bytes():
+    cache = DatasetCache(max_bytes=100)
+    cache.put(entry("a", 60))
+    cache.put(entry("b", 60))
+    assert cache.get("a") is None
+    assert cache.stats()["bytes"] == 60
+
+def test_expired_entries_are_dropped():
+    cache = DatasetCache(ttl_seconds=-1)
+    cache.put(entry("a", 10))
+    assert cache.get("a") is None
+
+def test_dataset_larger_than_the_cache_is_rejected():
+    cache = DatasetCache(max_bytes=100)
+    cache.put(entry("a", 60))
+    with pytest.raises(DatasetTooLargeError):
+        cache.put(entry("b", 101))
+    assert cache.get("a") is not None
+    assert cache.stats()["bytes"] == 60
+
+def test_upload_too_large_to_cache_gets_413(client, monkeypatch):
+    monkeypatch.setattr(main.dataset_cache, "max_bytes", 100)
+    response = client.post("/api/datasets", json={"data": RECORDS})
+    assert response.status_code == 413
+    assert "DATASET_CACHE_MAX_BYTES" in response.json()["detail"]
+
+def test_identical_uploads_share_a_dataset_id(client):
+    first = client.post("/api/datasets", json={"data": RECORDS}).json()
+    second = client.post("/api/datasets", json={"data": RECORDS}).json()
+    assert first["datasetId"] == second["datasetId"]
+    assert main.dataset_cache.stats()["hits"] == 1
+
+def test_evicted_dataset_is_restored_from_the_store(client, monkeypatch, tmp_path):
+    monkeypatch.setattr(main, "dataset_store", ParquetDatasetStore(str(tmp_path)))
+    dataset_id = client.post("/api/datasets", json={"data": RECORDS}).json()["datasetId"]
+    main.dataset_cache.clear()
+
+    response = client.post(f"/api/datasets/{dataset_id}/optimize", json={"method": "aggregate"})
+    assert response.status_code == 200
+    assert response.json()["originalRowCount"] == len(RECORDS)
+    assert main.dataset_cache.get(dataset_id).profiles == {}
+
+def test_unknown_dataset_id_is_404(client):
+    assert client.post("/api/datasets/missing/optimize", json={}).status_code == 404
+
+def test_column_order_is_part_of_the_fingerprint():
+    ab = [{"a": 1, "b": 2}, {"a": 3, "b": 4}]
+    ba = [{"b": 2, "a": 1}, {"b": 4, "a": 3}]
+    assert fingerprint_records(ab) != fingerprint_records(ba)
+    # Key order within later records does not change the columns
+    assert fingerprint_records(ab) == fingerprint_records([{"a": 1, "b": 2}, {"b": 4, "a": 3}])
+
+def test_uploads_differing_in_column_order_keep_their_order(client):
+    ab = client.post("/api/datasets", json={"data": [{"a": "x", "b": 1}, {"a": "y", "b": 2}]}).json()
+    ba = client.post("/api/datasets", json={"data": [{"b": 1, "a": "x"}, {"b": 2, "a": "y"}]}).json()
+    assert ab["datasetId"] != ba["datasetId"]
+    assert [col["name"] for col in ba["columnInfo"]] == ["b", "a"]
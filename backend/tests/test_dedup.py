@@ -0,0 +1,59 @@
+import numpy as np
+import orjson
+import pandas as pd
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+from benchmarks.fake_gemini import FakeGenerativeModel
+from dataset_cache import DatasetCache
+from gemini_client import GeminiClient
+from streaming import RowHashDeduplicator, UnknownColumnsError
+
+def frame(rows: int) -> pd.DataFrame:
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({
+        "order_id": rng.integers(0, rows // 2, rows),
+        "store": rng.choice(["a", "b", "c"], rows),
+        "amount": rng.integers(0, 5, rows).astype(float),
+    })
+    return pd.concat([df, df.sample(frac=0.2, random_state=0)], ignore_index=True)
+
+def chunked(deduplicator: RowHashDeduplicator, df: pd.DataFrame, chunk_rows: int) -> pd.DataFrame:
+    return pd.concat([deduplicator.filter(df.iloc[i:i + chunk_rows]) for i in range(0, len(df), chunk_rows)])
+
+@pytest.mark.parametrize("subset", [None, ["order_id"], ["store", "amount"]])
+@pytest.mark.parametrize("chunk_rows", [97, 10_000])
+def test_matches_drop_duplicates_across_chunks(subset, chunk_rows):
+    df = frame(2000)
+    deduplicator = RowHashDeduplicator(subset)
+    kept = chunked(deduplicator, df, chunk_rows)
+    expected = df.drop_duplicates(subset)
+    assert kept.index.tolist() == expected.index.tolist()
+    assert deduplicator.duplicates == len(df) - len(expected)
+
+def test_imputed_value_is_not_a_duplicate_of_a_real_one():
+    df = pd.DataFrame({"a": [1.0, 1.0], "b": [2.0, 2.0]})
+    missing = pd.DataFrame({"a": [False, True], "b": [False, False]})
+    assert len(RowHashDeduplicator().filter(df, missing)) == 2
+
+def test_preprocessing_reports_duplicate_rows():
+    records = [{"id": i % 5, "value": (i % 5) * 1.5} for i in range(20)]
+    df, _, duplicates = main.preprocess_data_with_profiles(records)
+    assert len(df) == 5 and duplicates == 15
+
+def test_unknown_subset_column_is_rejected():
+    with pytest.raises(UnknownColumnsError):
+        main.preprocess_data_with_profiles([{"id": 1}, {"id": 2}], ["missing"])
+
+def test_optimize_and_insights_report_duplicate_rows(monkeypatch):
+    monkeypatch.setattr(main, "dataset_cache", DatasetCache())
+    monkeypatch.setattr(main, "gemini_client", GeminiClient(lambda: FakeGenerativeModel(latency=0.0)))
+    monkeypatch.setattr(main, "GEMINI_API_KEY", "test")
+    client = TestClient(main.app)
+    records = [{"id": i % 5, "value": (i % 5) * 1.5} for i in range(20)]
+
+    assert client.post("/api/data/optimize", json={"data": records}).json()["duplicateRows"] == 15
+    streamed = client.post("/api/data/optimize?stream=true", json={"data": records})
+    assert orjson.loads(streamed.text.splitlines()[0])["duplicateRows"] == 15
+    assert client.post("/api/insights", json={"data": records}).json()["duplicateRows"] == 15
@@ -0,0 +1,33 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from downsample import downsample
+
+def wide_series(rows: int, columns: int) -> pd.DataFrame:
+    rng = np.random.default_rng(0)
+    data = {"t": np.arange(rows)}
+    data.update({f"y{i}": rng.normal(size=rows) for i in range(columns)})
+    return pd.DataFrame(data)
+
+@pytest.mark.parametrize("columns", [1, 3, 24, 40])
+@pytest.mark.parametrize("max_points", [3, 4, 10, 50])
+def test_minmax_stays_within_max_points(columns, max_points):
+    df = wide_series(5000, columns)
+    result = downsample(df, "t", [f"y{i}" for i in range(columns)], max_points, "minmax")
+    assert 0 < len(result) <= max_points
+    assert result["t"].iloc[0] == 0
+    assert result["t"].iloc[-1] == 4999
+
+def test_minmax_keeps_spikes():
+    df = wide_series(10000, 1)
+    df.loc[1234, "y0"] = 100.0
+    df.loc[8765, "y0"] = -100.0
+    result = downsample(df, "t", ["y0"], 50, "minmax")
+    assert {100.0, -100.0} <= set(result["y0"])
+
+def test_lttb_returns_max_points_in_x_order():
+    df = wide_series(10000, 2).sample(frac=1, random_state=0)
+    result = downsample(df, "t", ["y0", "y1"], 100, "lttb")
+    assert len(result) == 100
+    assert result["t"].is_monotonic_increasing
@@ -0,0 +1,92 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from dataset_cache import CachedDataset, DatasetCache
+from filter_cube import FilterCube, query_filtered, rows_column_stats
+
+SUGGESTIONS = [
+    {"chartType": "pie", "nameKey": "product", "valueKey": "units"},
+    {"chartType": "bar", "xAxis": "region", "yAxis": ["units", "price"]},
+    {"chartType": "line", "xAxis": "date", "yAxis": ["price"]},
+]
+
+def sales(rows: int, days: int) -> pd.DataFrame:
+    rng = np.random.default_rng(0)
+    return pd.DataFrame({
+        "date": pd.Timestamp("2024-01-01") + pd.to_timedelta(rng.integers(0, days, rows), unit="D"),
+        "region": rng.choice(["North", "South", "East", "West"], rows),
+        "product": rng.choice(["a", "b", "c", "d", "e"], rows),
+        "units": rng.integers(0, 100, rows),
+        "price": rng.random(rows),
+    })
+
+def from_rows(df: pd.DataFrame, filters):
+    """The same query answered without partials."""
+    cube = FilterCube(df)
+    cube.partials = None
+    return query_filtered(cube, filters, SUGGESTIONS)
+
+@pytest.mark.parametrize("days", [30, 180, 1000])
+def test_partials_match_the_rows(days):
+    df = sales(3000, days)
+    cube = FilterCube(df)
+    assert cube.available
+
+    result = query_filtered(cube, {"region": ["North", "East"]}, SUGGESTIONS)
+    expected = from_rows(df, {"region": ["North", "East"]})
+    assert result["source"] in ("partials", "mixed")
+    assert result["rowCount"] == expected["rowCount"]
+    assert result["columnStats"]["units"] == expected["columnStats"]["units"]
+    assert result["columnStats"]["price"] == pytest.approx(expected["columnStats"]["price"])
+    for got, want in zip(result["suggestions"], expected["suggestions"]):
+        pd.testing.assert_frame_equal(pd.DataFrame(got["data"]), pd.DataFrame(want["data"]), check_dtype=False)
+
+def test_daily_dates_with_two_categories_keep_category_partials():
+    # 180 days x 4 regions x 5 products is more groups than half the rows
+    cube = FilterCube(sales(3000, 180))
+    assert cube.available
+    assert cube.date_dim is None
+    assert query_filtered(cube, {"product": "a"}, SUGGESTIONS[:2])["source"] == "partials"
+
+def test_integer_stats_stay_integers():
+    df = sales(3000, 30)
+    stats = query_filtered(FilterCube(df), {"region": "North"}, [])["columnStats"]["units"]
+    assert all(isinstance(stats[key], int) for key in ("sum", "count", "min", "max"))
+    assert stats == rows_column_stats(df[df["region"] == "North"], ["units"])["units"]
+
+def test_cube_memory_counts_against_the_cache():
+    df = sales(3000, 30)
+    cache = DatasetCache()
+    entry = CachedDataset(dataset_id="a", df=df, profiles={}, viz_df=df.head())
+    cache.put(entry)
+    before = cache.stats()["bytes"]
+
+    cube = FilterCube(df)
+    cache.attach_filter_cube(entry, cube)
+    assert cube.nbytes > 0
+    assert entry.filter_cube is cube
+    assert cache.stats()["bytes"] == before + cube.nbytes == entry.nbytes
+
+def test_cube_that_does_not_fit_is_not_kept():
+    df = sales(3000, 30)
+    entry = CachedDataset(dataset_id="a", df=df, profiles={}, viz_df=df.head())
+    cache = DatasetCache(max_bytes=entry.nbytes)
+    cache.put(entry)
+
+    cache.attach_filter_cube(entry, FilterCube(df))
+    assert entry.filter_cube is None
+    assert cache.get("a") is entry
+
+@pytest.mark.parametrize("partials", [True, False])
+def test_filters_accept_the_raw_upload_form(partials):
+    df = sales(3000, 30)
+    # A categorical column whose uploaded values were whole numbers, and a boolean one
+    df["tier"] = pd.Series(np.resize([1.0, 2.0, 3.0], len(df))).astype("category")
+    df["returned"] = np.resize([True, False, False], len(df))
+    cube = FilterCube(df)
+    if not partials:
+        cube.partials = None
+    for raw, cleaned in [({"tier": "1"}, {"tier": "1.0"}), ({"returned": "true"}, {"returned": "True"})]:
+        count = query_filtered(cube, raw, [])["rowCount"]
+        assert count == query_filtered(cube, cleaned, [])["rowCount"] == 1000
@@ -0,0 +1,107 @@
+import asyncio
+
+import pytest
+
+from benchmarks.fake_gemini import FakeGenerativeModel, FakeResponse
+from gemini_client import GeminiClient, GeminiError
+
+class FlakyModel(FakeGenerativeModel):
+    """Fails the first `failures` calls, then answers."""
+
+    def __init__(self, failures: int):
+        super().__init__(latency=0.0)
+        self.failures = failures
+
+    async def generate_content_async(self, prompt: str) -> FakeResponse:
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise RuntimeError("Simulated upstream failure")
+        return FakeResponse(text=self._answer(prompt))
+
+def client_for(model, **kwargs) -> GeminiClient:
+    kwargs.setdefault("base_delay", 0.001)
+    kwargs.setdefault("max_delay", 0.01)
+    return GeminiClient(lambda: model, **kwargs)
+
+def test_identical_prompts_share_one_call():
+    model = FakeGenerativeModel(latency=0.05)
+    client = client_for(model)
+
+    async def run():
+        return await asyncio.gather(*(client.generate("same prompt") for _ in range(5)))
+
+    answers = asyncio.run(run())
+    assert len(set(answers)) == 1
+    assert model.calls == 1
+    assert client.coalesced == 4
+    assert client.stats()["inFlight"] == 0
+
+def test_distinct_prompts_are_not_coalesced():
+    model = FakeGenerativeModel(latency=0.01)
+    client = client_for(model)
+
+    async def run():
+        return await asyncio.gather(*(client.generate(f"prompt {i}") for i in range(3)))
+
+    asyncio.run(run())
+    assert model.calls == 3
+    assert client.coalesced == 0
+
+def test_concurrent_calls_are_capped():
+    model = FakeGenerativeModel(latency=0.02)
+    client = client_for(model, max_concurrency=3)
+
+    async def run():
+        return await asyncio.gather(*(client.generate(f"prompt {i}") for i in range(12)))
+
+    asyncio.run(run())
+    assert model.calls == 12
+    assert model.max_concurrent == 3
+
+def test_failed_attempts_are_retried():
+    model = FlakyModel(failures=2)
+    client = client_for(model)
+
+    answer = asyncio.run(client.generate("prompt", max_retries=2))
+    assert answer
+    assert client.calls == 3
+    assert client.retries == 2
+    assert client.failures == 0
+
+def test_backoff_waits_grow_and_are_capped(monkeypatch):
+    waits = []
+
+    async def no_sleep(seconds):
+        waits.append(seconds)
+
+    # Full jitter draws from [0, bound]; take the bound itself to check the schedule
+    monkeypatch.setattr("gemini_client.random.uniform", lambda low, high: high)
+    monkeypatch.setattr("gemini_client.asyncio.sleep", no_sleep)
+    client = client_for(FlakyModel(failures=4), base_delay=1.0, max_delay=3.0)
+
+    asyncio.run(client.generate("prompt", max_retries=4))
+    assert waits == [1.0, 2.0, 3.0, 3.0]
+
+def test_exhausted_retries_raise_gemini_error():
+    model = FakeGenerativeModel(latency=0.0, failure_rate=1.0)
+    client = client_for(model)
+
+    with pytest.raises(GeminiError, match="after 3 attempts"):
+        asyncio.run(client.generate("prompt", max_retries=2))
+    assert model.calls == 3
+    assert client.retries == 2
+    assert client.failures == 1
+    assert client.stats()["inFlight"] == 0
+
+def test_coalesced_callers_share_the_failure():
+    model = FakeGenerativeModel(latency=0.02, failure_rate=1.0)
+    client = client_for(model)
+
+    async def run():
+        return await asyncio.gather(*(client.generate("prompt", max_retries=0) for _ in range(3)),
+                                    return_exceptions=True)
+
+    results = asyncio.run(run())
+    assert all(isinstance(result, GeminiError) for result in results)
+    assert model.calls == 1
+    assert client.failures == 1
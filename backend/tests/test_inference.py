@@ -0,0 +1,35 @@
+import pandas as pd
+import pytest
+
+from inference import clean_dataframe, datetime_format_cache
+
+@pytest.fixture(autouse=True)
+def empty_format_cache():
+    datetime_format_cache.clear()
+    yield
+    datetime_format_cache.clear()
+
+def upload(dates):
+    """A JSON-style upload: every column has object dtype."""
+    return pd.DataFrame({"date": pd.Series(dates, dtype=object), "sales": pd.Series([1, 2, 3], dtype=object)})
+
+def test_cached_format_is_redetected_when_values_change():
+    first, _ = clean_dataframe(upload(["01/05/2024", "02/05/2024", "03/05/2024"]))
+    assert pd.api.types.is_datetime64_any_dtype(first["date"])
+
+    second, profiles = clean_dataframe(upload(["2024-02-05", "2024-02-06", "2024-02-07"]))
+    assert pd.api.types.is_datetime64_any_dtype(second["date"])
+    assert second["date"].iloc[0] == pd.Timestamp("2024-02-05")
+    assert profiles["date"].datetime_format != "%m/%d/%Y"
+
+def test_column_without_dates_does_not_disable_detection():
+    first, _ = clean_dataframe(upload(["n/a", "n/a", "n/a"]))
+    assert not pd.api.types.is_datetime64_any_dtype(first["date"])
+
+    second, _ = clean_dataframe(upload(["2024-02-05", "2024-02-06", "2024-02-07"]))
+    assert pd.api.types.is_datetime64_any_dtype(second["date"])
+
+def test_matching_cached_format_is_reused():
+    clean_dataframe(upload(["2024-02-05", "2024-02-06", "2024-02-07"]))
+    _, profiles = clean_dataframe(upload(["2024-03-01", "2024-03-02", "2024-03-03"]))
+    assert profiles["date"].datetime_format == "%Y-%m-%d"
@@ -0,0 +1,72 @@
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+from benchmarks.fake_gemini import FakeGenerativeModel
+from dataset_cache import DatasetCache
+from gemini_client import GeminiClient
+from llm_cache import LLMResponseCache, SQLiteResponseStore
+
+RECORDS = [{"date": f"2024-01-{day:02d}", "region": ["North", "South"][day % 2], "sales": day * 10} for day in range(1, 29)]
+
+@pytest.fixture
+def model():
+    return FakeGenerativeModel(latency=0.0)
+
+@pytest.fixture
+def client(monkeypatch, tmp_path, model):
+    store = SQLiteResponseStore(str(tmp_path / "responses.db"))
+    monkeypatch.setattr(main, "llm_cache", LLMResponseCache(store=store))
+    monkeypatch.setattr(main, "dataset_cache", DatasetCache())
+    monkeypatch.setattr(main, "gemini_client", GeminiClient(lambda: model))
+    monkeypatch.setattr(main, "GEMINI_API_KEY", "test")
+    yield TestClient(main.app)
+    store.close()
+
+def insights(client):
+    response = client.post("/api/insights", json={"data": RECORDS})
+    assert response.status_code == 200
+    return response.headers["X-LLM-Cache"]
+
+def test_insights_are_cached(client, model):
+    assert insights(client) == "miss"
+    assert insights(client) == "hit"
+    assert model.calls == 1
+
+def test_insights_cache_key_covers_the_digest_budget(client, model, monkeypatch):
+    insights(client)
+    monkeypatch.setattr(main, "INSIGHTS_DIGEST_BUDGET_BYTES", main.INSIGHTS_DIGEST_BUDGET_BYTES // 2)
+    assert insights(client) == "miss"
+    assert model.calls == 2
+
+def test_sqlite_store_is_used_off_the_event_loop(client, monkeypatch):
+    store = main.llm_cache.store
+    calls = []
+
+    def on_loop() -> bool:
+        try:
+            asyncio.get_running_loop()
+            return True
+        except RuntimeError:
+            return False
+
+    def recording(method):
+        def run(*args):
+            calls.append((method.__name__, on_loop()))
+            return method(*args)
+        return run
+
+    monkeypatch.setattr(store, "get", recording(store.get))
+    monkeypatch.setattr(store, "put", recording(store.put))
+    insights(client)
+    assert client.post("/api/charts/suggestions", json={"data": RECORDS}).status_code == 200
+    assert {name for name, _ in calls} == {"get", "put"}
+    assert not any(loop for _, loop in calls)
+
+def test_responses_survive_a_restart(client, model, tmp_path):
+    insights(client)
+    main.llm_cache.clear()
+    assert insights(client) == "hit"
+    assert main.llm_cache.stats()["diskHits"] == 1
@@ -0,0 +1,70 @@
+import logging
+
+import numpy as np
+import pandas as pd
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+from dataset_cache import DatasetCache
+from ingest import iter_upload_chunks, read_upload
+from streaming import stream_preprocess
+
+def sales_csv(rows: int) -> bytes:
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({
+        "date": pd.date_range("2024-01-01", periods=rows, freq="h").strftime("%Y-%m-%d %H:%M"),
+        "region": rng.choice(["North", "South", "East"], rows),
+        "sales": rng.normal(100, 10, rows).round(2),
+        "units": rng.integers(0, 50, rows).astype(float),
+    })
+    df.loc[rng.choice(rows, rows // 20, replace=False), "units"] = np.nan
+    # Repeat a tenth of the rows further down, so duplicates span chunks
+    df = pd.concat([df, df.iloc[: rows // 10]], ignore_index=True)
+    return df.to_csv(index=False).encode()
+
+@pytest.fixture
+def client(monkeypatch, tmp_path):
+    monkeypatch.setattr(main, "dataset_cache", DatasetCache())
+    monkeypatch.setattr(main, "STREAMING_THRESHOLD_BYTES", 4096)
+    monkeypatch.setattr(main, "STREAMING_MEMORY_LIMIT_BYTES", 64 * 1024)
+    monkeypatch.setattr(main.tempfile, "tempdir", str(tmp_path))
+    return TestClient(main.app)
+
+def test_chunked_cleaning_matches_whole_frame_cleaning():
+    body = sales_csv(5000)
+    streamed, _, streamed_duplicates = stream_preprocess(
+        lambda chunk_rows: iter_upload_chunks(body, "text/csv", chunk_rows), 64 * 1024)
+    whole, _, whole_duplicates = main.preprocess_dataframe(read_upload(body, "text/csv"))
+
+    assert streamed_duplicates == whole_duplicates == 500
+    assert len(streamed) == len(whole) == 5000
+    assert list(streamed.columns) == list(whole.columns)
+    assert streamed["sales"].sum() == pytest.approx(whole["sales"].sum())
+
+def test_large_upload_is_spooled_and_streamed(client, tmp_path, caplog):
+    body = sales_csv(5000)
+    with caplog.at_level(logging.INFO):
+        response = client.post("/api/datasets/import", content=body, headers={"Content-Type": "text/csv"})
+    assert "Spooled" in caplog.text and "Streaming preprocessing" in caplog.text
+    assert response.status_code == 200
+    assert response.json()["rowCount"] == 5000
+    assert response.json()["duplicateRows"] == 500
+    # The spooled body is removed once the dataset is cleaned
+    assert list(tmp_path.iterdir()) == []
+
+def test_spooled_upload_keeps_the_body_fingerprint(client):
+    body = sales_csv(5000)
+    streamed = client.post("/api/datasets/import", content=body, headers={"Content-Type": "text/csv"}).json()
+    main.dataset_cache.clear()
+    whole = client.post("/api/datasets/import?stream=false", content=body, headers={"Content-Type": "text/csv"}).json()
+    assert streamed["datasetId"] == whole["datasetId"]
+    assert streamed["rowCount"] == whole["rowCount"]
+
+def test_small_upload_stays_in_memory(client, tmp_path):
+    response = client.post("/api/datasets/import", content=b"a,b\n1,2\n3,4\n", headers={"Content-Type": "text/csv"})
+    assert response.status_code == 200
+    assert response.json()["rowCount"] == 2
+
+def test_empty_upload_is_rejected(client):
+    assert client.post("/api/datasets/import", content=b"", headers={"Content-Type": "text/csv"}).status_code == 400
@@ -0,0 +1,76 @@
+import asyncio
+import functools
+import logging
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+class WorkerPoolFull(Exception):
+    """Raised when a job is submitted while every worker and queue slot is taken."""
+
+class WorkerPool:
+    """
+    Runs CPU-bound functions in a thread or process pool instead of on the event loop.
+
+    At most max_workers jobs run at once and at most max_queue more wait for a
+    worker. Further submissions fail immediately with WorkerPoolFull so the
+    caller can shed load instead of letting latency grow without bound.
+
+    In process mode the function and its arguments must be picklable, and
+    anything they return is copied back to the server process.
+    """
+
+    def __init__(self, kind: str = "thread", max_workers: int = 4, max_queue: int = 16):
+        if kind not in ("thread", "process"):
+            raise ValueError(f"Unknown worker pool kind: {kind}")
+        self.kind = kind
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.in_flight = 0
+        self.rejected = 0
+        self.completed = 0
+        self._executor: Optional[Executor] = None
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            if self.kind == "process":
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+            else:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="chartly-cpu")
+        return self._executor
+
+    async def run(self, func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """
+        Run func(*args, **kwargs) on a worker and await its result.
+
+        Raises:
+            WorkerPoolFull: If max_workers + max_queue jobs are already in flight
+        """
+        # Only the event loop thread touches the counter, so no lock is needed
+        if self.in_flight >= self.max_workers + self.max_queue:
+            self.rejected += 1
+            raise WorkerPoolFull(f"{self.in_flight} jobs already in flight")
+
+        self.in_flight += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._get_executor(), functools.partial(func, *args, **kwargs))
+        finally:
+            self.in_flight -= 1
+            self.completed += 1
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "kind": self.kind,
+            "maxWorkers": self.max_workers,
+            "maxQueue": self.max_queue,
+            "inFlight": self.in_flight,
+            "completed": self.completed,
+            "rejected": self.rejected,
+        }
@@ -9,14 +9,15 @@ export async function POST(request: Request) {
   try {
     const body = await request.json();
     
-    // URL of your running Python backend service
-    const pythonBackendUrl = `${process.env.NEXT_PUBLIC_API_URL}/charts/suggestions`;
+    // URL of your running Python backend service; ?orient and ?stream are passed on
+    const pythonBackendUrl = `${process.env.NEXT_PUBLIC_API_URL}/charts/suggestions${new URL(request.url).search}`;
 
     const response = await fetch(pythonBackendUrl, {
       method: 'POST',
       headers: {
         'Content-Type': 'application/json',
-        'Accept': 'application/json'
+        'Accept': 'application/json, application/x-ndjson',
+        'Accept-Encoding': 'br, gzip'
       },
       body: JSON.stringify(body),
     });
@@ -31,8 +32,15 @@ export async function POST(request: Request) {
       );
     }
 
-    const data = await response.json();
-    return NextResponse.json(data);
+    // Stream the body through instead of parsing and re-serializing it. fetch has
+    // already decoded any gzip/brotli encoding, so only the content type is kept.
+    return new Response(response.body, {
+      status: response.status,
+      headers: {
+        'Content-Type': response.headers.get('Content-Type') ?? 'application/json',
+        ...(response.headers.get('X-LLM-Cache') ? { 'X-LLM-Cache': response.headers.get('X-LLM-Cache')! } : {}),
+      },
+    });
 
   } catch (error: any) {
     console.error('Failed to forward request to Python backend:', error);
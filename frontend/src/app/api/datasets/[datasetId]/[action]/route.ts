@@ -0,0 +1,64 @@
+import { NextResponse } from 'next/server';
+
+// Proxy for the id-based dataset endpoints of the Python backend.
+// Only the dataset id (and optional chart options such as maxPoints) travels
+// over the network; the rows stay on the server.
+
+const ACTIONS = ['suggestions', 'optimize', 'insights', 'query'];
+
+export async function POST(
+  request: Request,
+  { params }: { params: Promise<{ datasetId: string; action: string }> }
+) {
+  const { datasetId, action } = await params;
+  if (!ACTIONS.includes(action)) {
+    return NextResponse.json({ error: `Unknown dataset action: ${action}` }, { status: 404 });
+  }
+
+  try {
+    // URL of your running Python backend service; query options such as ?orient=columns or ?stream=true are passed on
+    const pythonBackendUrl = `${process.env.NEXT_PUBLIC_API_URL}/datasets/${encodeURIComponent(datasetId)}/${action}${new URL(request.url).search}`;
+
+    // Forward an optional JSON body, e.g. { chartType, xAxis, yAxis, maxPoints } for optimize
+    // or { filters, suggestions } for query
+    const body = await request.text();
+
+    const response = await fetch(pythonBackendUrl, {
+      method: 'POST',
+      headers: {
+        'Accept': 'application/json, application/x-ndjson',
+        'Accept-Encoding': 'br, gzip',
+        ...(body ? { 'Content-Type': 'application/json' } : {})
+      },
+      body: body || undefined,
+    });
+
+    if (!response.ok) {
+      // Pass the backend error message (including 404 for expired datasets) to the frontend
+      const errorData = await response.text();
+      console.error(`Backend error: ${response.status} ${errorData}`);
+      return NextResponse.json(
+        { error: `Backend service failed to process dataset ${action}.`, details: errorData },
+        { status: response.status }
+      );
+    }
+
+    // Stream the body through instead of parsing and re-serializing it. fetch has
+    // already decoded any gzip/brotli encoding, so only the content type is kept.
+    return new Response(response.body, {
+      status: response.status,
+      headers: {
+        'Content-Type': response.headers.get('Content-Type') ?? 'application/json',
+        ...(response.headers.get('X-LLM-Cache') ? { 'X-LLM-Cache': response.headers.get('X-LLM-Cache')! } : {}),
+      },
+    });
+
+  } catch (error: any) {
+    console.error('Failed to forward request to Python backend:', error);
+    // Handle network errors or other issues when trying to contact the Python service
+    return NextResponse.json(
+      { error: 'Failed to connect to the backend service.', details: error.message },
+      { status: 500 }
+    );
+  }
+}
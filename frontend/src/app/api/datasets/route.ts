@@ -0,0 +1,44 @@
+import { NextResponse } from 'next/server';
+
+// Proxy for uploading a dataset once to the Python backend.
+// The backend cleans and stores the rows and returns a `datasetId` that the
+// `/api/datasets/[datasetId]/*` routes use instead of re-sending the rows.
+
+export async function POST(request: Request) {
+  try {
+    const body = await request.json();
+
+    // URL of your running Python backend service
+    const pythonBackendUrl = `${process.env.NEXT_PUBLIC_API_URL}/datasets`;
+
+    const response = await fetch(pythonBackendUrl, {
+      method: 'POST',
+      headers: {
+        'Content-Type': 'application/json',
+        'Accept': 'application/json'
+      },
+      body: JSON.stringify(body),
+    });
+
+    if (!response.ok) {
+      // Pass the backend error message to the frontend for better debugging
+      const errorData = await response.text();
+      console.error(`Backend error: ${response.status} ${errorData}`);
+      return NextResponse.json(
+        { error: 'Backend service failed to store the dataset.', details: errorData },
+        { status: response.status }
+      );
+    }
+
+    const data = await response.json();
+    return NextResponse.json(data);
+
+  } catch (error: any) {
+    console.error('Failed to forward request to Python backend:', error);
+    // Handle network errors or other issues when trying to contact the Python service
+    return NextResponse.json(
+      { error: 'Failed to connect to the backend service.', details: error.message },
+      { status: 500 }
+    );
+  }
+}
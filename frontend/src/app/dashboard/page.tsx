@@ -33,8 +33,26 @@ type ChartSuggestionResponse = {
   processedData?: any[];
   originalRowCount?: number;
   processedRowCount?: number;
+  datasetId?: string;
 };
 
+// Upload the rows once so later requests can refer to them by id.
+async function uploadDataset(data: any[]): Promise<string | null> {
+  try {
+    const response = await fetch('/api/datasets', {
+      method: 'POST',
+      headers: { 'Content-Type': 'application/json' },
+      body: JSON.stringify({ data }),
+    });
+    if (!response.ok) return null;
+    const result = await response.json();
+    return result.datasetId ?? null;
+  } catch (error) {
+    console.error('Failed to upload dataset', error);
+    return null;
+  }
+}
+
 function KpiCard({ title, value, icon: Icon, description }: KpiCardProps) {
     return (
         <Card>
@@ -54,6 +72,7 @@ export default function DashboardPage() {
   const [originalData, setOriginalData] = React.useState<ParsedData | null>(null);
   const [chartResponse, setChartResponse] = React.useState<ChartSuggestionResponse | null>(null);
   const [filteredData, setFilteredData] = React.useState<any[] | null>(null);
+  const [datasetId, setDatasetId] = React.useState<string | null>(null);
   const [fileName, setFileName] = React.useState<string>('');
   const [filters, setFilters] = React.useState<Record<string, string>>({});
   const [isLoadingCharts, setIsLoadingCharts] = React.useState(false);
@@ -61,18 +80,25 @@ export default function DashboardPage() {
   const { toast } = useToast();
   const router = useRouter();
 
-  const fetchChartSuggestions = React.useCallback(async (data: any[]) => {
+  const fetchChartSuggestions = React.useCallback(async (data: any[], id?: string | null) => {
     if (data.length === 0) {
       setChartResponse(cr => cr ? {...cr, suggestions: []} : null);
       return;
     }
     setIsLoadingCharts(true);
     try {
-      const response = await fetch('/api/charts/suggestions', {
-        method: 'POST',
-        headers: { 'Content-Type': 'application/json' },
-        body: JSON.stringify({ data }),
-      });
+      let response: Response | null = null;
+      if (id) {
+        response = await fetch(`/api/datasets/${id}/suggestions`, { method: 'POST' });
+      }
+      // Fall back to sending the rows when there is no handle or it has expired
+      if (!response || response.status === 404) {
+        response = await fetch('/api/charts/suggestions', {
+          method: 'POST',
+          headers: { 'Content-Type': 'application/json' },
+          body: JSON.stringify({ data }),
+        });
+      }
       if (!response.ok) throw new Error('Failed to get chart suggestions.');
       const result: ChartSuggestionResponse = await response.json();
       setChartResponse(result);
@@ -88,13 +114,43 @@ export default function DashboardPage() {
       setIsLoadingCharts(false);
     }
   }, [toast]);
+
+  // Re-aggregate the current charts for a filter on the server. Returns false when
+  // the dataset handle is missing or expired so the caller can send the rows instead.
+  const queryFilteredCharts = React.useCallback(async (id: string | null, newFilters: Record<string, string>) => {
+    if (!id) return false;
+    setIsLoadingCharts(true);
+    try {
+      const response = await fetch(`/api/datasets/${id}/query`, {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify({ filters: newFilters, suggestions: chartResponse?.suggestions }),
+      });
+      if (!response.ok) return false;
+      const result = await response.json();
+      setChartResponse(cr => cr ? {
+        ...cr,
+        suggestions: result.suggestions,
+        processedData: undefined,
+        processedRowCount: result.rowCount,
+        originalRowCount: result.rowCount,
+      } : cr);
+      return true;
+    } catch (error) {
+      return false;
+    } finally {
+      setIsLoadingCharts(false);
+    }
+  }, [chartResponse]);
   
-  const processData = React.useCallback((data: ParsedData, name: string) => {
+  const processData = React.useCallback(async (data: ParsedData, name: string) => {
     setOriginalData(data);
     setFilteredData(data.data);
     setFileName(name);
     setFilters({});
-    fetchChartSuggestions(data.data);
+    const id = await uploadDataset(data.data);
+    setDatasetId(id);
+    fetchChartSuggestions(data.data, id);
   }, [fetchChartSuggestions]);
 
   React.useEffect(() => {
@@ -126,13 +182,17 @@ export default function DashboardPage() {
     }
     setFilters(newFilters);
 
+    // Slicer values are the uploaded ones; the server matches its cleaned rows against this raw form too
     let dataToFilter = originalData?.data || [];
     Object.entries(newFilters).forEach(([key, val]) => {
       dataToFilter = dataToFilter.filter(row => row[key]?.toString() === val);
     });
 
     setFilteredData(dataToFilter);
-    fetchChartSuggestions(dataToFilter);
+    // Charts are re-aggregated from the uploaded dataset; the filtered rows are only sent if that fails
+    queryFilteredCharts(datasetId, newFilters).then(ok => {
+      if (!ok) fetchChartSuggestions(dataToFilter, Object.keys(newFilters).length === 0 ? datasetId : null);
+    });
   };
   
   const handleReset = () => {
@@ -140,6 +200,7 @@ export default function DashboardPage() {
     setFilteredData(null);
     setFileName('');
     setFilters({});
+    setDatasetId(null);
     setChartResponse(null);
     router.replace('/dashboard', { scroll: false });
   };
@@ -267,7 +328,10 @@ export default function DashboardPage() {
             </div>
           )}
           
-          <AIInsights data={filteredData || []} />
+          <AIInsights
+            data={filteredData || []}
+            datasetId={Object.keys(filters).length === 0 ? datasetId : null}
+          />
 
           {showOptimizationIndicator && (
               <div className="p-3 bg-blue-50 border border-blue-200 rounded-lg">
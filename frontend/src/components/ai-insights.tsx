@@ -10,9 +10,10 @@ import { useToast } from '@/hooks/use-toast';
 
 interface AIInsightsProps {
   data: any[];
+  datasetId?: string | null;
 }
 
-export function AIInsights({ data }: AIInsightsProps) {
+export function AIInsights({ data, datasetId }: AIInsightsProps) {
   const [isLoading, setIsLoading] = React.useState(false);
   const [insights, setInsights] = React.useState<string | null>(null);
   const { toast } = useToast();
@@ -21,13 +22,20 @@ export function AIInsights({ data }: AIInsightsProps) {
     setIsLoading(true);
     setInsights(null);
     try {
-      const response = await fetch('/api/insights', {
-        method: 'POST',
-        headers: {
-          'Content-Type': 'application/json',
-        },
-        body: JSON.stringify({ data }),
-      });
+      let response: Response | null = null;
+      if (datasetId) {
+        response = await fetch(`/api/datasets/${datasetId}/insights`, { method: 'POST' });
+      }
+      // Fall back to sending the rows when there is no handle or it has expired
+      if (!response || response.status === 404) {
+        response = await fetch('/api/insights', {
+          method: 'POST',
+          headers: {
+            'Content-Type': 'application/json',
+          },
+          body: JSON.stringify({ data }),
+        });
+      }
 
       if (!response.ok) {
         throw new Error('Failed to generate insights.');
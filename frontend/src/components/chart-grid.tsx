@@ -80,7 +80,7 @@ export function ChartGrid({ data, suggestions, isLoading }: ChartGridProps) {
               </CardHeader>
               <CardContent>
                 <ChartComponent 
-                  data={data}
+                  data={suggestion.data ?? data}
                   config={suggestion}
                 />
               </CardContent>
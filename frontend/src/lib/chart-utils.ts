@@ -17,6 +17,9 @@ export type ChartSuggestion = {
   valueKey?: string;
   categoryKey?: string;
   indexKey?: string;
+  // Chart-ready rows computed by the backend from the full dataset
+  data?: any[];
+  aggregation?: string;
 };
 
 export function isDate(value: any): boolean {